@@ -0,0 +1,127 @@
+"""
+Runs `AsyncDrive.list_items` and `AsyncValues.get` against a local stub server that answers after a
+simulated latency, sequentially and with `asyncio.gather`, through `AsyncSession(base_urls=...)`.
+The stub pages Drive listings and checks the results, so the numbers reflect the asyncio client
+rather than the Google backends.
+
+Usage: PYTHONPATH=. python benchmarks/async_client.py [--requests 100] [--latency 0.05] [--max-concurrency 50]
+"""
+import argparse
+import asyncio
+import json
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from gutils.services.aio import AsyncSession
+
+FILES_PER_FOLDER = 25
+PAGE_SIZE = 10
+
+
+def _files(folder_id: str) -> list:
+    return [{"id": f"{folder_id}-{index}", "name": f"file {index}", "parents": [folder_id]}
+            for index in range(FILES_PER_FOLDER)]
+
+
+def _server(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def _send_json(self, status: int, content: dict) -> None:
+            body = json.dumps(content).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None: # pylint: disable=invalid-name
+            time.sleep(latency)
+            url = urllib.parse.urlsplit(self.path)
+            params = dict(urllib.parse.parse_qsl(url.query))
+            if url.path == "/drive/v3/files":
+                folder_id = re.search(r"'([^']+)' in parents", params.get("q", "")).group(1)
+                start = int(params.get("pageToken") or 0)
+                content = {"files": _files(folder_id)[start:start + PAGE_SIZE]}
+                if start + PAGE_SIZE < FILES_PER_FOLDER:
+                    content["nextPageToken"] = f"{start + PAGE_SIZE}"
+                self._send_json(200, content)
+                return
+            match = re.fullmatch(r"/sheets/v4/spreadsheets/([^/]+)/values/([^/]+)", url.path)
+            if match:
+                sheet_range = urllib.parse.unquote(match.group(2))
+                self._send_json(200, {"range": sheet_range, "majorDimension": "ROWS",
+                                      "values": [[sheet_range, row] for row in range(10)]})
+                return
+            self._send_json(404, {"error": {"code": 404, "message": f"{url.path} is not stubbed."}})
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _run(root_url: str, requests: int, max_concurrency: int) -> None:
+    base_urls = {"drive": f"{root_url}drive/v3/", "sheets": f"{root_url}sheets/v4/"}
+    async with AsyncSession(base_urls=base_urls, max_concurrency=max_concurrency) as session:
+        drive = session.get_resource("drive", "v3")
+        values = session.get_resource("sheets", "v4").values
+        folders = [f"folder-{index}" for index in range(requests)]
+        ranges = [f"Sheet1!A{index + 1}:B{index + 10}" for index in range(requests)]
+
+        def list_folder(folder_id):
+            return drive.list_items(f"'{folder_id}' in parents")
+
+        def get_range(sheet_range):
+            return values.get("benchmark", sheet_range)
+
+        def check_listing(folder_id, items):
+            assert [item["id"] for item in items] == [item["id"] for item in _files(folder_id)], folder_id
+
+        def check_range(sheet_range, value_range):
+            assert value_range.values[0][0] == sheet_range, sheet_range
+
+        print(f"{'call':<28}{'mode':>12}{'requests':>10}{'seconds':>10}{'requests/s':>12}")
+        cases = [("AsyncDrive.list_items", list_folder, check_listing, folders, -(-FILES_PER_FOLDER // PAGE_SIZE)),
+                 ("AsyncValues.get", get_range, check_range, ranges, 1)]
+        for name, call, check, arguments, requests_per_call in cases:
+            started = time.perf_counter()
+            for argument in arguments:
+                check(argument, await call(argument))
+            sequential = time.perf_counter() - started
+
+            started = time.perf_counter()
+            results = await asyncio.gather(*[call(argument) for argument in arguments])
+            concurrent = time.perf_counter() - started
+            for argument, result in zip(arguments, results):
+                check(argument, result)
+
+            total = len(arguments) * requests_per_call
+            print(f"{name:<28}{'sequential':>12}{total:>10}{sequential:>10.2f}{total / sequential:>12.0f}")
+            print(f"{name:<28}{'gather':>12}{total:>10}{concurrent:>10.2f}{total / concurrent:>12.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100, help="calls of each method")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds the server takes per request")
+    parser.add_argument("--max-concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    server = _server(args.latency)
+    try:
+        print(f"{args.requests} calls of each method, {args.latency * 1000:.0f} ms per request, "
+              f"at most {args.max_concurrency} in flight")
+        asyncio.run(_run(f"http://127.0.0.1:{server.server_port}/", args.requests, args.max_concurrency))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
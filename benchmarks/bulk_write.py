@@ -0,0 +1,85 @@
+"""
+Measures the cells per second written by `Values.bulk_write` against a local server that accepts
+`values.batchUpdate` requests after a simulated latency, so the numbers reflect chunking,
+serialization and request pipelining rather than the Sheets backend.
+
+Usage: PYTHONPATH=. python benchmarks/bulk_write.py [--rows 200000] [--columns 10] [--latency 0.2]
+"""
+import argparse
+import copy
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from google.auth.credentials import AnonymousCredentials
+
+from gutils.services.api_client import GoogleApiClient
+from gutils.services.discovery_cache import DiscoveryCache
+
+
+class _LocalDiscoveryCache(DiscoveryCache):
+    """
+    Points the Sheets discovery document at the local server.
+    """
+    def __init__(self, root_url: str) -> None:
+        super().__init__()
+        self.root_url = root_url
+
+    def get(self, service_name: str, version: str) -> dict:
+        document = copy.deepcopy(super().get(service_name, version))
+        document["rootUrl"] = self.root_url
+        document["baseUrl"] = self.root_url + document["servicePath"]
+        return document
+
+
+def _server(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_POST(self) -> None: # pylint: disable=invalid-name
+            body = json.loads(self.rfile.read(int(self.headers.get("content-length"))))
+            time.sleep(latency)
+            cells = sum(len(row) for data in body["data"] for row in data["values"])
+            content = json.dumps({"spreadsheetId": "benchmark", "totalUpdatedCells": cells}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds the server takes per request")
+    parser.add_argument("--max-request-bytes", type=int, default=None)
+    args = parser.parse_args()
+
+    server = _server(args.latency)
+    root_url = f"http://127.0.0.1:{server.server_port}/"
+    try:
+        print(f"{args.rows} rows x {args.columns} columns, {args.latency * 1000:.0f} ms per request")
+        print(f"{'workers':>8}{'requests':>10}{'seconds':>10}{'cells/s':>14}")
+        for workers in (1, 2, 4, 8):
+            client = GoogleApiClient(scopes=[], discovery_cache=_LocalDiscoveryCache(root_url), thread_safe=workers > 1)
+            client.credentials = AnonymousCredentials()
+            values = client.get_resource("sheets", "v4").values
+            rows = ([f"r{row}c{column}" for column in range(args.columns)] for row in range(args.rows))
+            report = values.bulk_write("benchmark", "Sheet1", rows, max_workers=workers,
+                                       max_request_bytes=args.max_request_bytes)
+            print(f"{workers:>8}{report.requests:>10}{report.seconds:>10.2f}{report.cells_per_second:>14.0f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
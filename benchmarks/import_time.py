@@ -0,0 +1,82 @@
+"""
+Measures the import time of the entry modules and fails when a module pulls in a dependency
+that should only be loaded on first use.
+
+Usage: PYTHONPATH=. python benchmarks/import_time.py [--rounds 5] [--budget 150]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Entry modules and the modules they must not import eagerly.
+GUARDS = {
+    "gutils.services.api_client": [
+        "google_auth_oauthlib",
+        "google.auth.transport.requests",
+        "google.oauth2.service_account",
+        "googleapiclient.discovery",
+        "httplib2",
+        "asyncio",
+        "pydantic",
+    ],
+    "gutils.services.sheets.v4.spreadsheets": [
+        "pydantic",
+        "googleapiclient.discovery",
+    ],
+    "gutils.services.sheets.v4.spreadsheets.values": [
+        "gutils.services.sheets.v4.objects.spreadsheets",
+        "gutils.services.sheets.v4.objects.cells",
+    ],
+}
+
+
+def _import_time(module: str) -> tuple:
+    """
+    Imports `module` in a fresh interpreter and returns its cumulative import time in
+    milliseconds along with the names of all modules it imported.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            env=env, capture_output=True, text=True, check=True)
+    cumulative, imported = 0, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        if not total.strip().isdigit():
+            continue
+        imported.add(name.strip())
+        if name.strip() == module:
+            cumulative = int(total) / 1000
+    return cumulative, imported
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=None,
+                        help="Fail when a module takes longer than this many milliseconds to import.")
+    args = parser.parse_args()
+
+    failures = list()
+    print(f"{'module':<50}{'median ms':>12}")
+    for module, forbidden in GUARDS.items():
+        samples, imported = list(), set()
+        for _ in range(args.rounds):
+            cumulative, imported = _import_time(module)
+            samples.append(cumulative)
+        median = statistics.median(samples)
+        print(f"{module:<50}{median:>12.2f}")
+        failures.extend(f"{module} imports {name}" for name in forbidden if name in imported)
+        if args.budget is not None and median > args.budget:
+            failures.append(f"{module} took {median:.2f}ms to import, budget is {args.budget:.2f}ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
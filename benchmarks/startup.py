@@ -0,0 +1,64 @@
+"""
+Compares cold and warm construction of Google API services.
+
+Usage: PYTHONPATH=. python benchmarks/startup.py [--rounds 20]
+"""
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+
+from google.auth.credentials import AnonymousCredentials
+from googleapiclient import discovery
+
+from gutils.services.discovery_cache import DiscoveryCache
+
+SERVICES = [("sheets", "v4"), ("drive", "v3")]
+
+
+def _timed(func, rounds: int) -> float:
+    samples = list()
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    credentials = AnonymousCredentials()
+    cache_dir = tempfile.mkdtemp(prefix="gutils-bench-")
+    cache = DiscoveryCache(cache_dir=cache_dir)
+
+    def uncached(name, version):
+        return discovery.build(name, version, credentials=credentials, cache_discovery=False)
+
+    def cold(name, version):
+        DiscoveryCache.clear_memory()
+        cache.clear_disk()
+        return discovery.build_from_document(cache.get(name, version), credentials=credentials)
+
+    def disk(name, version):
+        DiscoveryCache.clear_memory()
+        return discovery.build_from_document(cache.get(name, version), credentials=credentials)
+
+    def warm(name, version):
+        return discovery.build_from_document(cache.get(name, version), credentials=credentials)
+
+    try:
+        print(f"{'service':<12}{'uncached':>12}{'cold':>12}{'disk':>12}{'warm':>12}  (median ms)")
+        for name, version in SERVICES:
+            results = [_timed(lambda f=func: f(name, version), args.rounds)
+                       for func in (uncached, cold, disk, warm)]
+            print(f"{name + '.' + version:<12}" + "".join(f"{result:>12.2f}" for result in results))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,14 @@
 """
 Oauth configuration file for Google APIs.
 """
+import contextlib
 import json
 import os
-import pickle
-import tempfile
 import typing
 
 # pylint: disable=import-error
 from gutils.creds import Secret
+from gutils.creds.locking import atomic_write, file_lock, is_private_dir, owned, private_dir, user_cache_dir
 
 
 class Oauth2Creds:
@@ -36,54 +36,68 @@ class Oauth2Creds:
 
 
 class Oauth2Token:
-    _temp_dir = os.path.join(tempfile.gettempdir())
-    _oauth_cred_dir = os.path.join(_temp_dir, "gutils/creds/google/oauth")
+    # Tokens hold the client secret and the refresh token, they are persisted in a private directory
+    # of the current user and only read back from files the user owns.
+    _oauth_cred_dir = user_cache_dir("creds/google/oauth")
     def __init__(self, client_id: str = None, client_secret: str = None,
-                 token: str = None, refresh_token: str = None, token_file: str = "token.json.pickle") -> None:
+                 token: str = None, refresh_token: str = None, token_file: str = "token.json",
+                 expiry: str = None) -> None:
         self.client_id = client_id if client_id else Secret(environment_variable="GCP_OAUTH_CLIENT_ID", required=False)
         self.client_secret = client_secret if client_secret else Secret(environment_variable="GCP_OAUTH_CLIENT_SECRET", required=False)
         self.token = token if token else Secret(environment_variable="GCP_OAUTH_AUTH_TOKEN", required=False)
         self.refresh_token = refresh_token if refresh_token else Secret(environment_variable="GCP_OAUTH_REFRESH_TOKEN", required=False)
         self.token_uri = "https://oauth2.googleapis.com/token"
+        self.expiry = expiry
         self._token_file = token_file
 
+    @property
+    def _token_path(self) -> str:
+        return os.path.join(self._oauth_cred_dir, self._token_file)
+
     def _build_token(self) -> dict:
-        return {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
+        return {k: v for k, v in self.__dict__.items() if not k.startswith("_") and v is not None}
 
     def _is_mandatory_keys_set(self) -> bool:
         return True if self.refresh_token and self.client_id and self.client_secret else False
-            
+
     def get_token(self) -> typing.Union[dict, None]:
-        if os.path.exists(f"{self._oauth_cred_dir}/{self._token_file}"):
+        if os.path.exists(self._token_path) and is_private_dir(os.path.dirname(self._token_path)) and owned(self._token_path):
             try:
-                with open(f"{self._oauth_cred_dir}/{self._token_file}", "rb") as pickled_file:
-                    token = json.loads(pickle.load(pickled_file))
+                with open(self._token_path, "r") as token_file:
+                    token = json.load(token_file)
                 if token.get("client_id") == self.client_id:
                     return token
-            except (Exception, EOFError):
-                os.remove(f"{self._oauth_cred_dir}/{self._token_file}")
-                pass
+            except (OSError, ValueError):
+                with contextlib.suppress(OSError):
+                    os.remove(self._token_path)
         self.set_token() if self._is_mandatory_keys_set() else None
         return self._build_token() if self._is_mandatory_keys_set() else None
 
     def set_token(self) -> typing.Union[dict, None]:
-        if self._is_mandatory_keys_set():
-            if os.path.exists(f"{self._oauth_cred_dir}/{self._token_file}"):
-                print(self._oauth_cred_dir)
-                try:
-                    with open(f"{self._oauth_cred_dir}/{self._token_file}", "wb") as pickled_file:
-                        pickled_file.write(pickle.dumps(self._build_token()))
-                    return self._build_token()
-                except (Exception, EOFError):
-                    os.remove(f"{self._oauth_cred_dir}/{self._token_file}")
-                    pass
-        return None
+        """
+        Persists the token atomically while holding a file lock, so concurrent writers
+        in other threads or processes never leave a partial file behind.
+        Persisting is best effort, the token is returned even if it could not be written.
+        """
+        if not self._is_mandatory_keys_set():
+            return None
+        token = self._build_token()
+        try:
+            private_dir(os.path.dirname(self._token_path))
+            with file_lock(f"{self._token_path}.lock"):
+                atomic_write(self._token_path, json.dumps(token))
+        except OSError:
+            pass
+        return token
 
     @classmethod
     def remove_tokens(cls) -> None:
         """
         Removes all tokens stored
         """
-        [os.remove(f"{cls._oauth_cred_dir}/{content.name}")
-         for content in os.scandir(cls._oauth_cred_dir)
-         if content.is_file() and content.name.endswith(".pickle")]
+        if not os.path.isdir(cls._oauth_cred_dir):
+            return
+        for content in os.scandir(cls._oauth_cred_dir):
+            if content.is_file() and content.name.endswith((".json", ".pickle")):
+                with contextlib.suppress(OSError):
+                    os.remove(content.path)
@@ -0,0 +1,102 @@
+"""
+Proactive, single flight refresh of Google credentials.
+"""
+import datetime
+import threading
+import typing
+
+from gutils.creds.google.token_cache import SharedTokenCache
+
+
+# pylint: disable=line-too-long
+class CredentialsRefresher:
+    """
+    Makes every refresh of a credentials object single flight and optionally refreshes it in the
+    background `margin` seconds before it expires, so requests never wait on the token endpoint.
+
+    Once installed, all refreshes go through the refresher, including the ones triggered by
+    `google-auth` transports on expiry or on a 401 response. Callers that waited on a refresh
+    in progress reuse its result instead of refreshing again. With a `SharedTokenCache` the
+    token is also shared with other processes.
+    """
+    def __init__(self, credentials: object, margin: float = 300,
+                 on_refresh: typing.Callable[[object], None] = None,
+                 token_cache: SharedTokenCache = None) -> None:
+        self.credentials = credentials
+        self.margin = margin
+        self.on_refresh = on_refresh
+        self.token_cache = token_cache
+        self._refresh = credentials.refresh
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._stopped = threading.Event()
+        self._thread = None
+        credentials.refresh = self.refresh
+
+    def refresh(self, request: object = None) -> None:
+        """
+        Refreshes the credentials unless another caller completed a refresh while this one waited.
+        """
+        generation = self._generation
+        with self._lock:
+            if generation != self._generation:
+                return
+            if request is None:
+                # pylint: disable=import-outside-toplevel
+                from google.auth.transport.requests import Request
+                request = Request()
+            if self.token_cache is not None:
+                self.token_cache.refresh(self.credentials, lambda: self._refresh(request))
+            else:
+                self._refresh(request)
+            self._generation += 1
+        if self.on_refresh:
+            self.on_refresh(self.credentials)
+
+    def ensure_fresh(self) -> None:
+        """
+        Refreshes the credentials when they are invalid or expire within the margin.
+        """
+        if self.seconds_until_refresh() <= 0:
+            self.refresh()
+
+    def seconds_until_refresh(self) -> float:
+        if not self.credentials.token or not self.credentials.valid:
+            return 0.0
+        expiry = self.credentials.expiry
+        if expiry is None:
+            return float("inf")
+        # google-auth keeps expiry as a naive UTC datetime.
+        remaining = (expiry - datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)).total_seconds()
+        return max(remaining - self.margin, 0.0)
+
+    def start(self) -> 'CredentialsRefresher':
+        """
+        Starts the background refresh thread.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="gutils-credentials-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops the background refresh thread.
+        """
+        self._stopped.set()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            delay = self.seconds_until_refresh()
+            if delay == float("inf"):
+                return
+            if delay > 0:
+                self._stopped.wait(delay)
+                continue
+            try:
+                self.refresh()
+            except Exception: # pylint: disable=broad-except
+                # Requests still refresh on demand, the next attempt is made after the pause below.
+                pass
+            self._stopped.wait(min(self.margin, 30))
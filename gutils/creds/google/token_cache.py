@@ -0,0 +1,89 @@
+"""
+Access token cache shared by all processes of the current user.
+"""
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import typing
+
+from gutils.creds.locking import atomic_write, file_lock, owned, private_dir, user_cache_dir
+
+
+# pylint: disable=line-too-long
+class SharedTokenCache:
+    """
+    Shares access tokens across processes through files keyed by (client_email, scopes, subject).
+    A process that needs a token takes the file lock and reuses the cached token when it is still
+    valid for `min_ttl` seconds. Otherwise it mints a new one and stores it for the other processes,
+    so a fleet of workers makes one token request per expiry instead of one per process.
+    Tokens are shared by the processes of the current user only: they are kept in the user's
+    runtime or cache directory, the directory is refused when other users can write to it and
+    files owned by other users are ignored.
+    """
+    _default_cache_dir = (os.path.join(os.environ["XDG_RUNTIME_DIR"], "gutils/tokens") if os.environ.get("XDG_RUNTIME_DIR")
+                          else user_cache_dir("tokens"))
+
+    def __init__(self, cache_dir: str = None, min_ttl: float = 300) -> None:
+        self.cache_dir = cache_dir if cache_dir else self._default_cache_dir
+        self.min_ttl = min_ttl
+
+    @staticmethod
+    def key(credentials: object) -> str:
+        """
+        Returns the cache key of a credentials object.
+        """
+        identity = [
+            getattr(credentials, "service_account_email", None) or getattr(credentials, "client_id", None),
+            sorted(getattr(credentials, "scopes", None) or []),
+            getattr(credentials, "_subject", None),
+        ]
+        return hashlib.sha256(json.dumps(identity).encode()).hexdigest()
+
+    def _path(self, credentials: object) -> str:
+        return os.path.join(self.cache_dir, f"{self.key(credentials)}.json")
+
+    @staticmethod
+    def _read(path: str) -> typing.Union[dict, None]:
+        if not owned(path):
+            return None
+        try:
+            with open(path, "r") as token_file:
+                return json.load(token_file)
+        except (OSError, ValueError):
+            return None
+
+    def refresh(self, credentials: object, refresh: typing.Callable[[], None]) -> bool:
+        """
+        Loads a shared token into `credentials` or calls `refresh` and shares its result.
+        Returns True when a cached token was reused.
+        """
+        private_dir(self.cache_dir)
+        path = self._path(credentials)
+        with file_lock(f"{path}.lock"):
+            cached = self._read(path)
+            # A caller holding the cached token already asks for a replacement, e.g. after a 401.
+            if cached and cached.get("token") != credentials.token:
+                # google-auth keeps expiry as a naive UTC datetime.
+                expiry = datetime.datetime.strptime(cached["expiry"], "%Y-%m-%dT%H:%M:%S")
+                if (expiry - datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)).total_seconds() > self.min_ttl:
+                    credentials.token = cached["token"]
+                    credentials.expiry = expiry
+                    return True
+            refresh()
+            if credentials.token and credentials.expiry:
+                atomic_write(path, json.dumps({"token": credentials.token,
+                                               "expiry": credentials.expiry.strftime("%Y-%m-%dT%H:%M:%S")}))
+        return False
+
+    def clear(self) -> None:
+        """
+        Removes all shared tokens.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+        for content in os.scandir(self.cache_dir):
+            if content.is_file() and content.name.endswith(".json"):
+                with contextlib.suppress(OSError):
+                    os.remove(content.path)
@@ -0,0 +1,101 @@
+"""
+File locking, atomic writes and per-user directories for credentials and state persisted to disk.
+"""
+import contextlib
+import os
+import tempfile
+import typing
+
+try:
+    import fcntl
+except ImportError: # pragma: no cover
+    fcntl = None
+    import msvcrt
+
+
+@contextlib.contextmanager
+def file_lock(path: str) -> typing.Generator[None, None, None]:
+    """
+    Holds an exclusive lock on `path` for the duration of the block. The lock is advisory and
+    shared across processes of the same host.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a+") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else: # pragma: no cover
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else: # pragma: no cover
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write(path: str, content: str) -> None:
+    """
+    Writes `content` to `path` so that readers see either the old or the new file, never a partial one.
+    The file is only readable by the current user.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w") as temp_file:
+            temp_file.write(content)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+
+def user_cache_dir(*parts: str) -> str:
+    """
+    Returns a path in the current user's cache directory, `$XDG_CACHE_HOME` or `~/.cache`.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "gutils", *parts)
+
+
+def owned(path: str) -> bool:
+    """
+    Whether `path` belongs to the current user. Always true where ownership is not available.
+    """
+    if not hasattr(os, "getuid"):
+        return True
+    try:
+        return os.stat(path).st_uid == os.getuid()
+    except OSError:
+        return False
+
+
+def is_private_dir(path: str) -> bool:
+    """
+    Whether `path` is a directory of the current user that no other user can write to.
+    """
+    if not os.path.isdir(path):
+        return False
+    if not hasattr(os, "getuid"):
+        return True
+    status = os.stat(path)
+    return status.st_uid == os.getuid() and not status.st_mode & 0o022
+
+
+def private_dir(path: str) -> str:
+    """
+    Creates `path` readable by the current user only, unless it exists, and returns it.
+    Raises `PermissionError` when the directory belongs to another user or others can write to it,
+    as they could then plant or swap the files kept in it.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not is_private_dir(path):
+        raise PermissionError(f"'{path}' is owned by another user or writable by others. "
+                              "Remove it or use another directory.")
+    return path
@@ -0,0 +1,183 @@
+"""
+This module contains the shared HTTP session used by the asyncio resources.
+Requires the optional `aiohttp` dependency, `pip install gutils-python[async]`.
+"""
+import asyncio
+import json
+import time
+import typing
+from importlib import import_module
+
+import httplib2
+from google.auth.transport.requests import Request
+from googleapiclient.errors import HttpError
+
+from gutils.services.instrumentation import Instrumentation, RequestEvent, set_last_request
+from gutils.services.rate_limit import RateLimiter
+from gutils.services.retry import RetryPolicy
+
+try:
+    import aiohttp
+except ImportError: # pragma: no cover
+    aiohttp = None
+
+
+# pylint: disable=line-too-long
+class AsyncSession:
+    """
+    A keep-alive HTTP session shared by all asyncio resources created from it.
+    At most `max_concurrency` requests are in flight at a time, any number of callers may wait for a slot.
+    """
+    default_base_urls = {
+        "drive": "https://www.googleapis.com/drive/v3/",
+        "sheets": "https://sheets.googleapis.com/v4/",
+    }
+    resources = {
+        ("drive", "v3"): ("gutils.services.drive.v3.drive.aio", "AsyncDrive"),
+        ("sheets", "v4"): ("gutils.services.sheets.v4.spreadsheets.aio", "AsyncSpreadsheets"),
+    }
+
+    def __init__(self, credentials: object = None, max_concurrency: int = 100,
+                 timeout: float = 60, base_urls: dict = None, retry_policy: RetryPolicy = None,
+                 rate_limiter: RateLimiter = None, instrumentation: Instrumentation = None) -> None:
+        if aiohttp is None:
+            raise ImportError("The asyncio client requires `aiohttp`. Install it with `pip install gutils-python[async]`")
+        self.credentials = credentials
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.instrumentation = instrumentation
+        self.base_urls = dict(self.default_base_urls)
+        if base_urls:
+            self.base_urls.update(base_urls)
+        self._session = None
+        self._semaphore = None
+        self._refresh_lock = None
+
+    async def __aenter__(self) -> 'AsyncSession':
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """
+        Opens the underlying connection pool. Must be called from within the event loop.
+        """
+        if self._session is not None:
+            return
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._refresh_lock = asyncio.Lock()
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        self._session = aiohttp.ClientSession(connector=connector,
+                                              timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+    async def close(self) -> None:
+        """
+        Closes the underlying connection pool.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def get_resource(self, service_name: str, version: str) -> typing.Union[object, None]:
+        """
+        Returns the asyncio resource for the given service and version.
+        """
+        path = self.resources.get((service_name.lower(), version))
+        if not path:
+            return None
+        return getattr(import_module(path[0]), path[1])(session=self)
+
+    async def _authorization(self) -> dict:
+        """
+        Returns the authorization header, refreshing the credentials once when they are not valid.
+        """
+        if self.credentials is None:
+            return {}
+        if not self.credentials.valid:
+            async with self._refresh_lock:
+                if not self.credentials.valid:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(None, self.credentials.refresh, Request())
+        return {"Authorization": f"Bearer {self.credentials.token}"}
+
+    @staticmethod
+    def _params(params: dict) -> list:
+        query = list()
+        for key, value in (params or {}).items():
+            if value is None:
+                continue
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for item in values:
+                if isinstance(item, bool):
+                    item = str(item).lower()
+                query.append((key, f"{item}"))
+        return query
+
+    async def request(self, service_name: str, method: str, path: str,
+                      params: dict = None, body: dict = None, method_id: str = None) -> dict:
+        """
+        Sends a request to the given service and returns the decoded JSON response.
+        Raises `googleapiclient.errors.HttpError` for non 2xx responses, same as the synchronous resources.
+        `method_id` is the discovery method name, e.g. `sheets.spreadsheets.values.append`, used by the retry policy.
+        """
+        if self._session is None:
+            await self.open()
+        url = f"{self.base_urls[service_name]}{path}"
+        if self.instrumentation is not None and self.instrumentation.enabled:
+            return await self._request_measured(method, url, params, body, method_id)
+        if self.retry_policy is None:
+            return await self._send(method, url, params, body, method_id)
+        return await self.retry_policy.call_async(lambda: self._send(method, url, params, body, method_id), method_id=method_id)
+
+    async def _request_measured(self, method: str, url: str, params: dict = None, body: dict = None,
+                                method_id: str = None) -> dict:
+        """
+        Sends a request like `request` and reports it to the instrumentation.
+        """
+        event = RequestEvent(method_id, method)
+        event.request_bytes = len(json.dumps(body)) if body is not None else 0
+        attempts = 0
+
+        def send():
+            nonlocal attempts
+            attempts += 1
+            return self._send(method, url, params, body, method_id, event)
+
+        started = time.perf_counter()
+        try:
+            if self.retry_policy is None:
+                return await send()
+            return await self.retry_policy.call_async(send, method_id=method_id)
+        except Exception as exception:
+            event.error = type(exception).__name__
+            raise
+        finally:
+            event.latency = time.perf_counter() - started
+            event.retries = max(attempts - 1, 0)
+            self.instrumentation.emit(event)
+            set_last_request(self.instrumentation, event.method_id)
+
+    async def _send(self, method: str, url: str, params: dict = None, body: dict = None, method_id: str = None,
+                    event: RequestEvent = None) -> dict:
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(method_id, method)
+        async with self._semaphore:
+            headers = await self._authorization()
+            try:
+                async with self._session.request(method, url, params=self._params(params),
+                                                 json=body, headers=headers) as response:
+                    content = await response.read()
+                    if event is not None:
+                        event.status = response.status
+                        event.response_bytes = len(content)
+                    if response.status >= 300:
+                        info = {key.lower(): value for key, value in response.headers.items()}
+                        info["status"] = response.status
+                        raise HttpError(httplib2.Response(info), content, uri=str(response.url))
+            except aiohttp.ClientConnectionError as exception:
+                raise ConnectionError(f"{exception}") from exception
+        return json.loads(content) if content else {}
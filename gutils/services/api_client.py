@@ -1,23 +1,53 @@
 """
 This module contains the necessay methods for services that require auth to access them.
 """
+import functools
 import json
+import threading
 import typing
 from importlib import import_module
 from pathlib import Path
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials as OauthCredentials
-from google.oauth2.service_account import Credentials as ServiceCredentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient import discovery
-from httplib2 import Credentials
-
 from gutils.creds.google.oauth import Oauth2Creds, Oauth2Token
+from gutils.creds.google.refresh import CredentialsRefresher
 from gutils.creds.google.service_account import ServiceAccountCreds
-# pylint: disable=wildcard-import
-# pylint: disable=unused-wildcard-import
-from gutils.services.enums import *
+from gutils.creds.google.token_cache import SharedTokenCache
+from gutils.services.discovery_cache import DiscoveryCache
+from gutils.services.enums import LoginType
+from gutils.services.instrumentation import Instrumentation
+from gutils.services.rate_limit import RateLimiter
+from gutils.services.retry import RetryPolicy
+
+# The Google client libraries are imported where they are first needed, which keeps importing
+# this module cheap for short lived processes that only use part of the client.
+if typing.TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials as OauthCredentials
+    from httplib2 import Credentials
+
+    from gutils.services.transport import TransportPool
+
+
+@functools.lru_cache(maxsize=None)
+def _service_registry() -> dict:
+    """
+    Loads `services.json` once and indexes the services by name and version.
+    """
+    with open(Path(__file__).parent.absolute().joinpath("services.json"), mode="r") as json_doc:
+        services = json.load(json_doc)
+    return {(name, attributes.get("version")): attributes for name, attributes in services.items()}
+
+
+@functools.lru_cache(maxsize=None)
+def _resource_class(service_name: str, version: str) -> typing.Union[type, None]:
+    """
+    Imports and returns the wrapper class registered for a service and version.
+    """
+    attributes = _service_registry().get((service_name, version))
+    if not attributes:
+        return None
+    path = f"gutils.services.{attributes.get('module')}.{attributes.get('version')}.{attributes.get('resource')}"
+    module = import_module(path)
+    return getattr(module, f"{attributes.get('class')}")
 
 
 class GoogleApiClient:
@@ -27,12 +57,30 @@ class GoogleApiClient:
     oauth_revoked: bool = False
     
     def __init__(self, scopes: list = None, config: typing.Union[Oauth2Creds, ServiceAccountCreds] = None,
-                 token: Oauth2Token = None, login_type: LoginType = LoginType.OAUTH2) -> None:
+                 token: Oauth2Token = None, login_type: LoginType = LoginType.OAUTH2,
+                 discovery_cache: DiscoveryCache = None, thread_safe: bool = False,
+                 max_connections: int = 10, retry_policy: RetryPolicy = None,
+                 rate_limiter: RateLimiter = None, refresh_margin: float = 300,
+                 background_refresh: bool = False, shared_token_cache: SharedTokenCache = None,
+                 instrumentation: Instrumentation = None) -> None:
 
         self.token = None
         self.config = None
         self.scopes = scopes
         self.credentials = None
+        self.discovery_cache = discovery_cache if discovery_cache else DiscoveryCache()
+        self._resources = dict()
+        self._resources_lock = threading.Lock()
+        self.thread_safe = thread_safe
+        self.max_connections = max_connections
+        self._pool = None
+        self.retry_policy = retry_policy if retry_policy else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.refresh_margin = refresh_margin
+        self.background_refresh = background_refresh
+        self.refresher = None
+        self.shared_token_cache = shared_token_cache
+        self.instrumentation = instrumentation if instrumentation else Instrumentation()
         if login_type in list(LoginType.__members__):
             self.login_type = login_type
         else:
@@ -68,13 +116,17 @@ class GoogleApiClient:
         """
         Sets the authorization token.
         """
-        token = Oauth2Token(client_id, client_secret, token, refresh_token)
+        token = Oauth2Token(client_id, client_secret, token, refresh_token, expiry=kwargs.get("expiry"))
         self.token = token.set_token()
 
-    def oauth2_login(self, trigger_new_flow: bool=False) -> Credentials:
+    def oauth2_login(self, trigger_new_flow: bool=False) -> 'Credentials':
         """
         Authenticates the user using Oauth2 and saves the credentials to a pickle file.
         """
+        # pylint: disable=import-outside-toplevel
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials as OauthCredentials
+
         credentials = None
         token = None
 
@@ -86,27 +138,52 @@ class GoogleApiClient:
         if token:
             credentials = OauthCredentials.from_authorized_user_info(token, self.scopes)
         if not credentials or not credentials.valid:
-            if credentials and credentials.expired and credentials.refresh_token:
+            if credentials and credentials.refresh_token:
                 credentials.refresh(Request())
             else:
                 if not self.config:
                     raise ValueError("""Missing client config for Oauth2 login. Please check if the following is set.
                                      > `client_id`, `client_secret`, `refresh_token`""")
+                # pylint: disable=import-outside-toplevel
+                from google_auth_oauthlib.flow import InstalledAppFlow
                 flow = InstalledAppFlow.from_client_config(self.config, scopes = self.scopes)
                 credentials = flow.run_local_server(port=0)
 
-            creds = json.loads(credentials.to_json())
-
-            self.set_authz_token(**creds)
+            self._persist_oauth_token(credentials)
 
+        self._install_refresher(credentials, on_refresh=self._persist_oauth_token)
         self.credentials = credentials
         self.oauth_revoked = False
         return credentials
 
-    def service_account_auth(self) -> Credentials:
+    def _persist_oauth_token(self, credentials: 'OauthCredentials') -> None:
+        """
+        Saves refreshed Oauth credentials to the token cache.
+        """
+        creds = json.loads(credentials.to_json())
+        self.set_authz_token(**creds)
+
+    def _install_refresher(self, credentials: 'Credentials', on_refresh: typing.Callable = None,
+                           token_cache: SharedTokenCache = None) -> CredentialsRefresher:
+        """
+        Routes every refresh of the credentials through a single flight refresher and starts
+        refreshing them ahead of expiry when `background_refresh` is enabled.
+        """
+        if self.refresher:
+            self.refresher.stop()
+        self.refresher = CredentialsRefresher(credentials, margin=self.refresh_margin,
+                                              on_refresh=on_refresh, token_cache=token_cache)
+        if self.background_refresh:
+            self.refresher.start()
+        return self.refresher
+
+    def service_account_auth(self) -> 'Credentials':
         """
         Authenticates the user using Service Account and returns the credentials.
         """
+        # pylint: disable=import-outside-toplevel
+        from google.oauth2.service_account import Credentials as ServiceCredentials
+
         credentials = None
         if not self.config:
             raise ValueError("Missing client config for service account")
@@ -116,6 +193,7 @@ class GoogleApiClient:
         except OSError as exception:
             raise OSError from exception
 
+        self._install_refresher(credentials, token_cache=self.shared_token_cache)
         self.credentials = credentials
         return credentials
             
@@ -123,23 +201,103 @@ class GoogleApiClient:
         """
         Creates and returns a Google API service Resource object that has necessary methods
         to interact with the services.
+        Resources are cached per service, version and credentials until invalidated.
         """
+        key = (service_name.lower(), version, self._credentials_identity())
+        resource = self._resources.get(key)
+        if resource:
+            return resource
+        client = _resource_class(service_name.lower(), version)
+        if not client:
+            return None
         service = self.create_service(service_name, version)
-        if service:
-            with open(Path(__file__).parent.absolute().joinpath("services.json"), mode="r") as json_doc:
-                services = json.load(json_doc)
-            for name, attributes in services.items():
-                if name == service_name.lower() and attributes.get("version") == version:
-                    path = f"gutils.services.{attributes.get('module')}.{attributes.get('version')}.{attributes.get('resource')}"
-                    module = import_module(path)
-                    client = getattr(module, f"{attributes.get('class')}")
-                    return client(service=service)
-        return None
+        if not service:
+            return None
+        with self._resources_lock:
+            return self._resources.setdefault(key, client(service=service))
+
+    def invalidate_resources(self) -> None:
+        """
+        Drops all cached resources so that they are rebuilt with the current credentials.
+        """
+        with self._resources_lock:
+            self._resources.clear()
+
+    def _credentials_identity(self) -> int:
+        """
+        Identifies the credentials a resource is bound to. Cached resources keep their
+        credentials alive, so the object id cannot be reused while the entry exists.
+        """
+        return id(self.credentials)
 
     def create_service(self, service_name: str, version: str) -> typing.Union[object, None]:
-        service = discovery.build(service_name, version, credentials=self.credentials,
-                                       cache_discovery=False)
+        """
+        Builds a Google API service from a cached discovery document.
+        """
+        # pylint: disable=import-outside-toplevel
+        from googleapiclient import discovery
+
+        from gutils.services.transport import RequestContext
+
+        document = self.discovery_cache.get(service_name, version)
+        context = RequestContext(pool=self._transport_pool(), retry_policy=self.retry_policy,
+                                 rate_limiter=self.rate_limiter, instrumentation=self.instrumentation)
+        service = discovery.build_from_document(document, credentials=self.credentials,
+                                                requestBuilder=context.build_request)
         return service if service else None
+
+    def async_session(self, max_concurrency: int = 100, **kwargs) -> object:
+        """
+        Returns an `AsyncSession` that exposes asyncio variants of the resources.
+        Requires the optional `aiohttp` dependency.
+        """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.aio import AsyncSession
+        kwargs.setdefault("retry_policy", self.retry_policy)
+        kwargs.setdefault("rate_limiter", self.rate_limiter)
+        kwargs.setdefault("instrumentation", self.instrumentation)
+        return AsyncSession(credentials=self.credentials, max_concurrency=max_concurrency, **kwargs)
+
+    def add_instrumentation_sink(self, sink: typing.Callable) -> None:
+        """
+        Registers a sink that receives a `RequestEvent` for every executed request, e.g. a
+        `HistogramCollector` or a `LoggingSink`. Requests are not measured while no sink is registered.
+        """
+        self.instrumentation.add_sink(sink)
+
+    @property
+    def retry_metrics(self) -> dict:
+        """
+        Returns the retry counts and time spent backing off, in total and per method.
+        """
+        return self.retry_policy.metrics.snapshot()
+
+    def _transport_pool(self) -> typing.Union['TransportPool', None]:
+        """
+        Returns the transport pool for the current credentials when running thread safe.
+        """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.transport import TransportPool
+
+        if not self.thread_safe:
+            return None
+        with self._resources_lock:
+            if self._pool is None or self._pool.credentials is not self.credentials:
+                self._pool = TransportPool(self.credentials, size=self.max_connections)
+            return self._pool
+
+    def execute_many(self, requests: list, max_workers: int = None,
+                     return_exceptions: bool = False) -> list:
+        """
+        Executes requests or callables concurrently and returns the results in order.
+        Requires the client to be created with `thread_safe=True`.
+        """
+        if not self.thread_safe:
+            raise ValueError("Concurrent execution requires the client to be created with `thread_safe=True`")
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.transport import execute_many
+        return execute_many(requests, max_workers=max_workers if max_workers else self.max_connections,
+                            return_exceptions=return_exceptions)
     
     def add_scopes(self, scopes: list) -> None:
         """
@@ -152,6 +310,7 @@ class GoogleApiClient:
             for scope in scopes:
                 if scope not in self.scopes:
                     self.scopes.append(scope)
+            self.invalidate_resources()
             if self.login_type == LoginType.OAUTH2:
                 self.oauth2_login(trigger_new_flow=True)
             elif self.login_type == LoginType.SERVICE_ACCOUNT:
@@ -168,6 +327,7 @@ class GoogleApiClient:
             for scope in scopes:
                 if scope in self.scopes:
                     self.scopes.remove(scope)
+            self.invalidate_resources()
             if not reauth:
                 return
             if self.login_type == LoginType.OAUTH2:
@@ -0,0 +1,144 @@
+"""
+This module contains the batching context that groups requests into multipart batch requests.
+"""
+import time
+import typing
+
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+
+from gutils.services.instrumentation import RequestEvent
+
+
+# pylint: disable=line-too-long
+class Batch:
+    """
+    Collects unexecuted requests and sends them as multipart batch requests of up to `batch_size` calls.
+    Results are correlated to the key each request was added with. Sub-requests that fail with a
+    retryable error are retried individually through the client's retry policy.
+
+    with Batch(drive.service) as batch:
+        for file_id in file_ids:
+            batch.add(drive.service.files().get(fileId=file_id), key=file_id)
+    batch.results  # {file_id: metadata or exception}
+    """
+    max_batch_size = 100
+
+    def __init__(self, service: object, batch_size: int = 100, retry_failed: bool = True) -> None:
+        if not 1 <= batch_size <= self.max_batch_size:
+            raise ValueError(f"batch_size must be between 1 and {self.max_batch_size}. {batch_size} was provided.")
+        self.service = service
+        self.batch_size = batch_size
+        self.retry_failed = retry_failed
+        self.results = dict()
+        self._requests = list()
+
+    def __enter__(self) -> 'Batch':
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        if exc_type is None:
+            self.execute()
+
+    def add(self, request: HttpRequest, key: typing.Hashable = None) -> typing.Hashable:
+        """
+        Adds a request to the batch and returns the key its result is stored under.
+        Defaults to the position of the request in the batch.
+        """
+        key = len(self._requests) if key is None else key
+        self._requests.append((key, request))
+        return key
+
+    def execute(self) -> dict:
+        """
+        Sends all pending requests and returns the results keyed by request key.
+        Failed requests hold the raised exception as their result.
+        """
+        pending, self._requests = self._requests, list()
+        for start in range(0, len(pending), self.batch_size):
+            self._execute_chunk(pending[start:start + self.batch_size])
+        return self.results
+
+    def _execute_chunk(self, chunk: list) -> None:
+        responses = dict()
+
+        def callback(request_id, response, exception):
+            responses[int(request_id)] = exception if exception is not None else response
+
+        batch = self.service.new_batch_http_request(callback=callback)
+        for index, (_, request) in enumerate(chunk):
+            batch.add(request, request_id=f"{index}")
+        self._send(batch, [request for _, request in chunk])
+
+        retries = list()
+        for index, (key, request) in enumerate(chunk):
+            result = responses.get(index)
+            delay = self._retry_delay(request, result) if self.retry_failed else None
+            if delay is not None:
+                retries.append((key, request, delay))
+            self.results[key] = result
+
+        # Retries run in order of their delay, so one long `Retry-After` does not hold up the others.
+        started = time.monotonic()
+        for key, request, delay in sorted(retries, key=lambda retry: retry[2]):
+            remaining = delay - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+            try:
+                self.results[key] = request.execute()
+            except Exception as exception: # pylint: disable=broad-except
+                self.results[key] = exception
+
+    @staticmethod
+    def _send(batch: object, requests: list) -> None:
+        """
+        Sends a batch through the context of its requests, applying the rate limiter per
+        sub-request and the retry policy to the batch as a whole.
+        """
+        context = getattr(requests[0], "context", None)
+        if context is None:
+            batch.execute()
+            return
+        if context.rate_limiter is not None:
+            for request in requests:
+                context.rate_limiter.acquire(request.methodId, request.method)
+
+        event = None
+        if context.instrumentation is not None and context.instrumentation.enabled:
+            event = RequestEvent("batch", "POST")
+            event.request_bytes = sum(len(request.body) for request in requests if request.body)
+
+        def attempt():
+            if event is not None:
+                event.retries += 1
+            with context.transport() as transport:
+                batch.execute(http=transport)
+
+        started = time.perf_counter()
+        try:
+            if context.retry_policy is None:
+                attempt()
+                return
+            idempotent = all(context.retry_policy.is_idempotent(request.methodId) for request in requests)
+            context.retry_policy.call(attempt, method_id="batch", idempotent=idempotent)
+        except Exception as exception:
+            if event is not None:
+                event.status = exception.resp.status if isinstance(exception, HttpError) else None
+                event.error = type(exception).__name__
+            raise
+        finally:
+            if event is not None:
+                event.latency = time.perf_counter() - started
+                event.retries = max(event.retries - 1, 0)
+                event.status = event.status if event.error else 200
+                context.instrumentation.emit(event)
+
+    @staticmethod
+    def _retry_delay(request: HttpRequest, result: typing.Any) -> typing.Union[float, None]:
+        """
+        Returns the backoff before a failed sub-request is retried on its own or None if it should not be.
+        """
+        context = getattr(request, "context", None)
+        if not isinstance(result, HttpError) or context is None or context.retry_policy is None:
+            return None
+        return context.retry_policy.next_delay(result, request.methodId, 1, time.monotonic())
@@ -0,0 +1,164 @@
+"""
+This module contains a two layered cache for Google API discovery documents.
+"""
+import glob
+import json
+import os
+import tempfile
+import threading
+import typing
+
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import UnknownApiNameOrVersion
+
+from gutils.creds.locking import is_private_dir, owned, private_dir, user_cache_dir
+
+
+# pylint: disable=line-too-long
+class DiscoveryCache:
+    """
+    Caches discovery documents in memory for the lifetime of the process and on disk keyed
+    by service, version and revision.
+    Documents bundled with `google-api-python-client` are used on a cold start, so building
+    a service does not require a network round trip.
+    A discovery document decides where requests and their credentials are sent, so documents are
+    cached in a per-user directory, which is not used when other users can write to it, and files
+    owned by other users are ignored.
+    """
+    _default_cache_dir = user_cache_dir("discovery")
+    _documents: dict = dict()
+    _lock = threading.Lock()
+
+    def __init__(self, cache_dir: str = None, use_bundled: bool = True, timeout: int = 30) -> None:
+        self.cache_dir = cache_dir if cache_dir else self._default_cache_dir
+        self.use_bundled = use_bundled
+        self.timeout = timeout
+
+    def get(self, service_name: str, version: str) -> dict:
+        """
+        Returns the parsed discovery document for the given service and version.
+        Lookup order is memory, disk and bundled documents, of which the later revision is used,
+        and finally the discovery service.
+        """
+        key = (service_name.lower(), version)
+        document = self._documents.get(key)
+        if document:
+            return document
+        with self._lock:
+            document = self._documents.get(key)
+            if document:
+                return document
+            document = self._read_disk(*key)
+            if self.use_bundled:
+                # An upgraded `google-api-python-client` may bundle a later revision than the one on disk.
+                bundled = self._read_bundled(*key)
+                if bundled and (not document or self._revision(bundled) > self._revision(document)):
+                    document = bundled
+                    self._write_disk(document)
+            if not document:
+                document = self._fetch(*key)
+                self._write_disk(document)
+            self._documents[key] = document
+        return document
+
+    def refresh(self, service_name: str, version: str) -> dict:
+        """
+        Fetches the latest revision of a discovery document from the discovery service
+        and replaces the cached copy.
+        """
+        key = (service_name.lower(), version)
+        document = self._fetch(*key)
+        with self._lock:
+            self._write_disk(document)
+            self._documents[key] = document
+        return document
+
+    @classmethod
+    def clear_memory(cls) -> None:
+        """
+        Drops all discovery documents held in memory.
+        """
+        with cls._lock:
+            cls._documents.clear()
+
+    def clear_disk(self) -> None:
+        """
+        Removes all discovery documents persisted to the cache directory.
+        """
+        for path in glob.glob(os.path.join(self.cache_dir, "*.json")):
+            self._remove(path)
+
+    def _path(self, service_name: str, version: str, revision: str) -> str:
+        return os.path.join(self.cache_dir, f"{service_name}.{version}.{revision}.json")
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _revision(document: dict) -> int:
+        try:
+            return int(document.get("revision", 0))
+        except (TypeError, ValueError):
+            return -1
+
+    def _read_disk(self, service_name: str, version: str) -> typing.Union[dict, None]:
+        """
+        Returns the latest cached revision available on disk, compared by the revision the
+        documents hold. Unreadable documents are removed, documents owned by other users ignored.
+        """
+        latest = None
+        if not is_private_dir(self.cache_dir):
+            return latest
+        for path in glob.glob(os.path.join(self.cache_dir, f"{service_name}.{version}.*.json")):
+            if not owned(path):
+                continue
+            try:
+                with open(path, mode="r") as json_doc:
+                    document = json.load(json_doc)
+            except (OSError, ValueError):
+                self._remove(path)
+                continue
+            if (not isinstance(document, dict) or document.get("name", "").lower() != service_name
+                    or document.get("version") != version):
+                continue
+            if latest is None or self._revision(document) > self._revision(latest):
+                latest = document
+        return latest
+
+    def _write_disk(self, document: dict) -> None:
+        """
+        Atomically persists a discovery document to the cache directory.
+        Failures are ignored as the disk layer is only an optimisation.
+        """
+        path = self._path(document.get("name"), document.get("version"), document.get("revision", "0"))
+        if os.path.exists(path) and owned(path):
+            return
+        try:
+            private_dir(self.cache_dir)
+            with tempfile.NamedTemporaryFile(mode="w", dir=self.cache_dir, suffix=".tmp", delete=False) as temp_file:
+                json.dump(document, temp_file)
+            os.replace(temp_file.name, path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _read_bundled(service_name: str, version: str) -> typing.Union[dict, None]:
+        content = get_static_doc(service_name, version)
+        return json.loads(content) if content else None
+
+    def _fetch(self, service_name: str, version: str) -> dict:
+        # Only needed on a cache miss, so they are not imported with the cache.
+        # pylint: disable=import-outside-toplevel
+        import httplib2
+        from googleapiclient import discovery
+
+        http = httplib2.Http(timeout=self.timeout)
+        for uri in (discovery.DISCOVERY_URI, discovery.V2_DISCOVERY_URI):
+            response, content = http.request(uri.format(api=service_name, apiVersion=version))
+            if response.status == 200:
+                return json.loads(content)
+        raise UnknownApiNameOrVersion(f"name: {service_name}  version: {version}")
@@ -0,0 +1,152 @@
+"""
+This module contains the incremental sync of Drive contents through the changes feed.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import time
+import typing
+
+from gutils.creds.locking import atomic_write
+from gutils.services.drive.v3.drive import Drive
+from gutils.services.enums import MimeType
+
+
+class PageTokenStore:
+    """
+    Keeps the page token of every change feed on disk, so the next run continues where the last one stopped.
+    Tokens are kept in the user's state directory rather than the temp directory, which is cleaned
+    on reboot, as a lost token can not be recovered without missing changes.
+    """
+    _user_state_dir = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    _default_cache_dir = os.path.join(_user_state_dir, "gutils/drive/changes")
+
+    def __init__(self, cache_dir: str = None) -> None:
+        self.cache_dir = cache_dir if cache_dir else self._default_cache_dir
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{hashlib.sha256(key.encode()).hexdigest()}.json")
+
+    def get(self, key: str) -> typing.Union[str, None]:
+        """
+        Returns the stored page token of a feed or None.
+        """
+        try:
+            with open(self._path(key), "r") as token_file:
+                return json.load(token_file).get("page_token")
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, page_token: str) -> None:
+        atomic_write(self._path(key), json.dumps({"key": key, "page_token": page_token, "updated": time.time()}))
+
+    def remove(self, key: str) -> None:
+        with contextlib.suppress(OSError):
+            os.remove(self._path(key))
+
+
+# pylint: disable=line-too-long
+class ChangeFeed:
+    """
+    Yields the items changed or removed since the last run, read from `changes.list` instead of
+    listing every file. The page token is stored after every page the caller has consumed, so an
+    interrupted run repeats at most one page of changes and never misses one.
+    The first run of a feed passes `start_fresh=True` and only records the current position. Later
+    runs raise `ValueError` when the stored token is missing instead of silently starting over and
+    skipping the changes made in between.
+
+    feed = ChangeFeed(drive, name="reports")
+    for change in feed.sync(start_fresh=first_run):
+        if ChangeFeed.is_removed(change):
+            forget(change["fileId"])
+        else:
+            update(change["file"])
+    """
+    default_file_fields = "id, name, mimeType, parents, modifiedTime, md5Checksum, size, trashed"
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, drive: Drive, name: str = "default", drive_id: str = None, fields: str = None,
+                 store: PageTokenStore = None, page_size: int = 1000) -> None:
+        self.drive = drive
+        self.name = name
+        self.drive_id = drive_id
+        self.fields = fields if fields else self.default_file_fields
+        self.store = store if store else PageTokenStore()
+        self.page_size = page_size
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}:{self.drive_id if self.drive_id else 'user'}"
+
+    @staticmethod
+    def is_removed(change: dict) -> bool:
+        """
+        Checks if a change removed its file, either deleted, trashed or no longer shared with the user.
+        """
+        return change.get("removed", False) or change.get("file", dict()).get("trashed", False)
+
+    def start_page_token(self) -> str:
+        """
+        Returns the page token of the current position of the feed.
+        """
+        arguments = dict(supportsAllDrives=True)
+        if self.drive_id:
+            arguments["driveId"] = self.drive_id
+        return self.drive.service.changes().getStartPageToken(**arguments).execute().get("startPageToken")
+
+    def reset(self) -> None:
+        """
+        Forgets the stored position, the next sync starts over from the current position.
+        """
+        self.store.remove(self.key)
+
+    def iter_changes(self, page_token: str) -> typing.Generator[typing.Tuple[dict, typing.Union[str, None]], None, None]:
+        """
+        Yields every change after `page_token` with the token to continue from once it is processed.
+        The token is None for all but the last change of a page.
+        """
+        arguments = dict(fields=f"nextPageToken, newStartPageToken, changes(changeType, removed, fileId, time, file({self.fields}))",
+                         pageSize=self.page_size, includeRemoved=True, spaces="drive",
+                         supportsAllDrives=True, includeItemsFromAllDrives=True)
+        if self.drive_id:
+            arguments["driveId"] = self.drive_id
+
+        def list_request(next_page_token):
+            return self.drive.service.changes().list(pageToken=next_page_token if next_page_token else page_token, **arguments)
+
+        for response in self.drive._iter_pages(list_request): # pylint: disable=protected-access
+            changes = response.get("changes", [])
+            next_token = response.get("nextPageToken", response.get("newStartPageToken"))
+            for index, change in enumerate(changes):
+                yield change, next_token if index == len(changes) - 1 else None
+            if not changes:
+                yield None, next_token
+
+    def sync(self, start_fresh: bool = False) -> typing.Generator[dict, None, None]:
+        """
+        Yields the changes since the last sync of this feed and stores the new position as they are consumed.
+        Changed folders are dropped from the folder path cache of the Drive resource.
+        Without a stored position, `start_fresh` records the current one and yields nothing,
+        otherwise `ValueError` is raised.
+        """
+        page_token = self.store.get(self.key)
+        if page_token is None:
+            if not start_fresh:
+                raise ValueError(f"No page token is stored for change feed {self.key!r}. Changes since the feed was last read "
+                                 "can not be recovered, pass start_fresh=True to continue from the current position.")
+            self.store.put(self.key, self.start_page_token())
+            return
+        for change, next_token in self.iter_changes(page_token):
+            if change is not None:
+                self._invalidate(change)
+                yield change
+            if next_token:
+                self.store.put(self.key, next_token)
+
+    def _invalidate(self, change: dict) -> None:
+        resolver = self.drive._path_resolver # pylint: disable=protected-access
+        if resolver is None:
+            return
+        if change.get("removed", False) or change.get("file", dict()).get("mimeType") == MimeType.APPLICATION_GDRIVE_FOLDER.value:
+            resolver.forget(change.get("fileId"))
@@ -0,0 +1,114 @@
+"""
+This module contains a crawler that walks Drive folder trees with concurrent listings.
+"""
+import collections
+import typing
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from gutils.services.drive.v3.drive import Drive
+from gutils.services.drive.v3.query import Expression, any_of
+from gutils.services.enums import MimeType, Operator, QueryFields
+from gutils.services.transport import uses_pool
+
+
+# pylint: disable=line-too-long
+class FolderCrawler:
+    """
+    Walks a folder tree from a root folder and yields `(path, file)` records as listings complete.
+    The children of up to `max_workers` folders are listed concurrently with `'<id>' in parents`
+    queries. Concurrent listings require a client created with `thread_safe=True`, otherwise the
+    folders are listed one at a time.
+
+    crawler = FolderCrawler(drive, max_workers=16)
+    for path, file_ in crawler.walk(root_id, max_depth=3, mime_types=[MimeType.TEXT_CSV]):
+        print(path, file_["id"])
+    """
+    required_fields = ("id", "name", "mimeType")
+    default_fields = "id, name, mimeType, parents"
+
+    def __init__(self, drive: Drive, max_workers: int = 16, drive_id: str = None) -> None:
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1. {max_workers} was provided.")
+        self.drive = drive
+        self.max_workers = max_workers
+        self.drive_id = drive_id
+
+    @classmethod
+    def _fields(cls, fields: typing.Union[str, None]) -> str:
+        if not fields:
+            return cls.default_fields
+        requested = [field.strip() for field in fields.split(",")]
+        return ", ".join([field for field in cls.required_fields if field not in requested] + requested)
+
+    @staticmethod
+    def _query(mime_types: typing.Union[frozenset, None]) -> typing.Union[Expression, None]:
+        """
+        Restricts listings to folders and the wanted mime types, folders are always needed to descend.
+        """
+        if not mime_types:
+            return None
+        return any_of(QueryFields.MIME_TYPE, Operator.EQUALS, sorted(mime_types | {MimeType.APPLICATION_GDRIVE_FOLDER.value}))
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def walk(self, root_id: str, max_depth: int = None,
+             mime_types: typing.Iterable[typing.Union[MimeType, str]] = None,
+             fields: str = None, root_path: str = "") -> typing.Generator[typing.Tuple[str, dict], None, None]:
+        """
+        Yields `(path, file)` for every item below `root_id`. `path` is the slash separated path of
+        the item relative to the root. Items of depth 1 are the direct children of the root and
+        folders are not descended below `max_depth`. When `mime_types` is given, only items of those
+        types are yielded, folders are still crawled.
+        """
+        if max_depth is not None and max_depth < 1:
+            return
+        mime_types = frozenset(f"{getattr(mime_type, 'value', mime_type)}" for mime_type in mime_types) if mime_types else None
+        fields = self._fields(fields)
+        query = self._query(mime_types)
+        visited = {root_id}
+        pending = collections.deque([(root_id, root_path, 1)])
+        max_workers = self.max_workers if uses_pool(self.drive.service) else 1
+
+        def list_children(folder_id):
+            return list(self.drive.iter_children(folder_id, query=query, drive_id=self.drive_id,
+                                                 fields=fields, prefetch=False))
+
+        if max_workers == 1:
+            while pending:
+                folder_id, path, depth = pending.popleft()
+                yield from self._records(list_children(folder_id), path, depth, max_depth, mime_types, visited, pending)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gutils-crawler")
+        running = dict()
+        try:
+            while pending or running:
+                while pending and len(running) < max_workers:
+                    folder_id, path, depth = pending.popleft()
+                    running[executor.submit(list_children, folder_id)] = (path, depth)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, depth = running.pop(future)
+                    yield from self._records(future.result(), path, depth, max_depth, mime_types, visited, pending)
+        finally:
+            for future in running:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def _records(children: list, path: str, depth: int, max_depth: typing.Union[int, None],
+                 mime_types: typing.Union[frozenset, None], visited: set,
+                 pending: collections.deque) -> typing.Generator[typing.Tuple[str, dict], None, None]:
+        """
+        Yields the records of a listed folder and queues its subfolders.
+        """
+        for child in children:
+            child_path = f"{path}/{child.get('name')}" if path else child.get('name')
+            if child.get('mimeType') == MimeType.APPLICATION_GDRIVE_FOLDER.value:
+                # Items may have several parents, so a folder can be reached more than once.
+                if child.get('id') in visited:
+                    continue
+                visited.add(child.get('id'))
+                if max_depth is None or depth < max_depth:
+                    pending.append((child.get('id'), child_path, depth + 1))
+            if mime_types is None or child.get('mimeType') in mime_types:
+                yield child_path, child
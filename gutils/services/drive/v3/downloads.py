@@ -0,0 +1,231 @@
+"""
+This module contains the bulk download manager for Drive files.
+"""
+import datetime
+import os
+import threading
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+from gutils.services.drive.v3.drive import Drive
+from gutils.services.drive.v3.helpers import md5_checksum
+from gutils.services.drive.v3.query import Query
+from gutils.services.enums import MimeType
+from gutils.services.transport import uses_pool
+
+
+class DownloadResult:
+    """
+    The outcome of downloading one file. `status` is one of `downloaded`, `skipped` or `failed`.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, file_id: str, name: str, path: str, status: str, size: int = 0,
+                 seconds: float = 0.0, error: Exception = None, reason: str = None) -> None:
+        self.file_id = file_id
+        self.name = name
+        self.path = path
+        self.status = status
+        self.size = size
+        self.seconds = seconds
+        self.error = error
+        self.reason = reason
+
+    @property
+    def throughput(self) -> float:
+        """
+        Bytes per second of this download.
+        """
+        return self.size / self.seconds if self.seconds else 0.0
+
+    def __repr__(self) -> str:
+        return f"DownloadResult(file_id={self.file_id!r}, path={self.path!r}, status={self.status!r}, size={self.size})"
+
+
+class DownloadReport:
+    """
+    Per file results and totals of a bulk download.
+    """
+    def __init__(self, results: typing.List[DownloadResult], seconds: float) -> None:
+        self.results = results
+        self.seconds = seconds
+
+    def _with_status(self, status: str) -> typing.List[DownloadResult]:
+        return [result for result in self.results if result.status == status]
+
+    @property
+    def downloaded(self) -> typing.List[DownloadResult]:
+        return self._with_status("downloaded")
+
+    @property
+    def skipped(self) -> typing.List[DownloadResult]:
+        return self._with_status("skipped")
+
+    @property
+    def failed(self) -> typing.List[DownloadResult]:
+        return self._with_status("failed")
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(result.size for result in self.downloaded)
+
+    @property
+    def throughput(self) -> float:
+        """
+        Bytes per second downloaded over the whole run.
+        """
+        return self.total_bytes / self.seconds if self.seconds else 0.0
+
+    def __repr__(self) -> str:
+        return (f"DownloadReport(downloaded={len(self.downloaded)}, skipped={len(self.skipped)}, "
+                f"failed={len(self.failed)}, bytes={self.total_bytes}, seconds={self.seconds:.2f})")
+
+
+# pylint: disable=line-too-long
+class BulkDownloader:
+    """
+    Downloads many Drive files into a directory with up to `max_workers` downloads in flight.
+    Every file is written to a part file and renamed once complete, so a file under its final name
+    is always complete and a failed download resumes from its part file on the next run. Files whose
+    local copy matches the remote modification time or MD5 checksum are skipped, which makes
+    repeated runs only fetch what changed.
+    Concurrent downloads require a client created with `thread_safe=True`, otherwise files are
+    downloaded one at a time.
+
+    report = BulkDownloader(drive, "exports", max_workers=8).download(query)
+    for result in report.failed:
+        print(result.file_id, result.error)
+    """
+    metadata_fields = "id, name, mimeType, md5Checksum, modifiedTime, size"
+    export_formats = {
+        MimeType.APPLICATION_GDOCS.value: (MimeType.APPLICATION_DOCX.value, ".docx"),
+        MimeType.APPLICATION_GSHEETS.value: (MimeType.APPLICATION_XLSX.value, ".xlsx"),
+        MimeType.APPLICATION_GSLIDES.value: (MimeType.APPLICATION_PPTX.value, ".pptx"),
+        MimeType.APPLICATION_GDRAWING.value: (MimeType.IMAGE_PNG.value, ".png"),
+        MimeType.APPLICATION_GAPP_SCRIPT.value: ("application/vnd.google-apps.script+json", ".json"),
+    }
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, drive: Drive, target_dir: str, max_workers: int = 8, chunk_size: int = None,
+                 export_formats: dict = None, verify_md5: bool = True) -> None:
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1. {max_workers} was provided.")
+        self.drive = drive
+        self.target_dir = target_dir
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.verify_md5 = verify_md5
+        if export_formats is not None:
+            self.export_formats = {**self.export_formats, **export_formats}
+
+    def _files(self, files: typing.Union[typing.Iterable[str], Query, str]) -> typing.List[dict]:
+        """
+        Returns the metadata of the files to download, listed by query or fetched with batch requests.
+        """
+        if isinstance(files, (Query, str)):
+            return list(self.drive.iter_items(files, fields=self.metadata_fields))
+        file_ids = list(files)
+        metadata = self.drive.get_files(file_ids, fields=self.metadata_fields, return_exceptions=True)
+        return [file_ if not isinstance(file_, Exception) else {"id": file_id, "error": file_}
+                for file_id, file_ in metadata.items()]
+
+    def _local_names(self, files: typing.List[dict]) -> typing.Dict[str, str]:
+        """
+        Maps file IDs to local file names. Names are made unique with the file ID since Drive allows
+        several files of the same name in one folder.
+        """
+        names, seen = dict(), dict()
+        for file_ in files:
+            name = f"{file_.get('name') or file_.get('id')}".replace("/", "_").replace(os.sep, "_")
+            extension = self.export_formats.get(file_.get("mimeType"), (None, ""))[1]
+            if extension and not name.lower().endswith(extension):
+                name += extension
+            seen[name] = seen.get(name, 0) + 1
+            names[file_.get("id")] = name
+        for file_ in files:
+            name = names[file_.get("id")]
+            if seen[name] > 1:
+                stem, extension = os.path.splitext(name)
+                names[file_.get("id")] = f"{stem} ({file_.get('id')}){extension}"
+        return names
+
+    @staticmethod
+    def _modified_time(file_: dict) -> typing.Union[float, None]:
+        value = file_.get("modifiedTime")
+        if not value:
+            return None
+        return datetime.datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=datetime.timezone.utc).timestamp()
+
+    def is_current(self, file_: dict, path: str) -> bool:
+        """
+        Checks if the local copy at `path` matches the remote file.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if file_.get("size") is not None and int(file_.get("size")) != stat.st_size:
+            return False
+        modified_time = self._modified_time(file_)
+        if modified_time is not None and int(stat.st_mtime) == int(modified_time):
+            return True
+        if self.verify_md5 and file_.get("md5Checksum") and md5_checksum(path) == file_.get("md5Checksum"):
+            if modified_time is not None:
+                os.utime(path, (stat.st_atime, modified_time))
+            return True
+        return False
+
+    def _download(self, file_: dict, path: str,
+                  progress: typing.Union[typing.Callable[[str, int, typing.Union[int, None]], None], None]) -> DownloadResult:
+        file_id, name = file_.get("id"), file_.get("name")
+        if file_.get("error") is not None:
+            return DownloadResult(file_id, name, path, "failed", error=file_.get("error"))
+        mime_type = file_.get("mimeType", "")
+        export_mime_type = None
+        if mime_type.startswith(self.drive.google_apps_mime_type_prefix):
+            if mime_type not in self.export_formats:
+                return DownloadResult(file_id, name, path, "skipped", reason=f"{mime_type} can not be downloaded")
+            export_mime_type = self.export_formats[mime_type][0]
+        if self.is_current(file_, path):
+            return DownloadResult(file_id, name, path, "skipped", size=os.path.getsize(path), reason="up to date")
+
+        started = time.perf_counter()
+        try:
+            self.drive.download(file_id, export_mime_type, output_file=path, chunk_size=self.chunk_size, metadata=file_,
+                                progress=(lambda downloaded, total: progress(file_id, downloaded, total)) if progress else None)
+            modified_time = self._modified_time(file_)
+            if modified_time is not None:
+                os.utime(path, (time.time(), modified_time))
+        except Exception as exception: # pylint: disable=broad-except
+            return DownloadResult(file_id, name, path, "failed", seconds=time.perf_counter() - started, error=exception)
+        return DownloadResult(file_id, name, path, "downloaded", size=os.path.getsize(path),
+                              seconds=time.perf_counter() - started)
+
+    def download(self, files: typing.Union[typing.Iterable[str], Query, str],
+                 progress: typing.Callable[[str, int, typing.Union[int, None]], None] = None,
+                 on_result: typing.Callable[[DownloadResult], None] = None) -> DownloadReport:
+        """
+        Downloads the files with the given IDs or matching the given query and returns a report.
+        Failures are reported per file instead of being raised. `progress(file_id, downloaded, total)`
+        and `on_result(result)` are called from the downloading threads.
+        """
+        started = time.perf_counter()
+        os.makedirs(self.target_dir, exist_ok=True)
+        files = [file_ for file_ in self._files(files)
+                 if file_.get("mimeType") != MimeType.APPLICATION_GDRIVE_FOLDER.value]
+        names = self._local_names(files)
+        lock = threading.Lock()
+
+        def run(file_):
+            result = self._download(file_, os.path.join(self.target_dir, names[file_.get("id")]), progress)
+            if on_result:
+                with lock:
+                    on_result(result)
+            return result
+
+        if self.max_workers == 1 or not uses_pool(self.drive.service):
+            results = [run(file_) for file_ in files]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="gutils-download") as executor:
+                results = list(executor.map(run, files))
+        return DownloadReport(results, time.perf_counter() - started)
@@ -1,14 +1,31 @@
 """
 The Drive module contains methods that let interact programmatically with Google Drive.
 """
-import io
-import shutil
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
+import glob
+import hashlib
+import itertools
+import os
+import typing
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload
 
 # pylint: disable=wildcard-import
 # pylint: disable=unused-wildcard-import
-from gutils.services.drive.v3.query import Query
+from gutils.services.batch import Batch
+from gutils.services.drive.v3.query import Query, as_expression
 from gutils.services.enums import *
+from gutils.services.transport import uses_pool
+
+if typing.TYPE_CHECKING:
+    from gutils.services.drive.v3.changes import PageTokenStore
+    from gutils.services.drive.v3.downloads import DownloadReport
+    from gutils.services.drive.v3.index import MetadataIndex
+    from gutils.services.drive.v3.paths import FolderPathResolver
+    from gutils.services.drive.v3.sync import SyncReport
+    from gutils.services.drive.v3.uploads import UploadSessionStore
 
 # pylint: disable=line-too-long
 # pylint: disable=no-member
@@ -18,9 +35,17 @@ class Drive:
     """
     resource_name = "drive"
     version = "v3"
+    default_item_fields = "id, name, parents"
+    chunk_size_multiple = 256 * 1024
+    default_chunk_size = 40 * chunk_size_multiple
+    simple_upload_limit = 5 * 1024 * 1024
+    google_apps_mime_type_prefix = "application/vnd.google-apps."
+    max_query_workers = 8
     
     def __init__(self, service: object) -> None:
         self.service = service
+        self._path_resolver = None
+        self.index: typing.Union['MetadataIndex', None] = None
 
     def list_drives(self) -> list:
         """
@@ -40,14 +65,25 @@ class Drive:
                 break
         return drives
 
+    # pylint: disable=too-many-arguments,too-many-locals
     def upload(self, title: str = None, filename: str = None, input_mime_type: str = None,
-              upload_mime_type: str = None, parent_folder_id: str = None, meta_body: dict = None) -> dict:
+              upload_mime_type: str = None, parent_folder_id: str = None, meta_body: dict = None,
+              resumable: bool = None, chunk_size: int = None,
+              progress: typing.Callable[[int, int], None] = None,
+              session_store: 'UploadSessionStore' = None, fields: str = None, file_id: str = None) -> dict:
         """
         Creates a new file with the given title in Google Drive.
+        With a `file_id` the content and metadata of that existing file are replaced instead,
+        keeping its ID and parents.
         Requires service to be 'drive'
         Requires one of the folowing scopes,
         - https://www.googleapis.com/auth/drive
         - https://www.googleapis.com/auth/drive.file
+
+        Files larger than `simple_upload_limit` are uploaded resumably in chunks of `chunk_size` bytes,
+        a multiple of 256 KiB, and a failed chunk is resent from the last byte the server received.
+        `progress(uploaded_bytes, total_bytes)` is called after every chunk. With a `session_store`
+        an upload interrupted by a process restart resumes where it stopped.
         """
         if not meta_body:
             meta_body = {
@@ -60,33 +96,162 @@ class Drive:
         meta_body.clear()
         meta_body.update(temp)
 
+        chunk_size = chunk_size if chunk_size else self.default_chunk_size
+        if chunk_size % self.chunk_size_multiple:
+            raise ValueError(f"chunk_size must be a multiple of {self.chunk_size_multiple} bytes. {chunk_size} was provided.")
+        size = os.path.getsize(filename)
+        if resumable is None:
+            resumable = session_store is not None or size > self.simple_upload_limit
+
         media_body = MediaFileUpload(filename,
-            mimetype=input_mime_type if input_mime_type else MimeType.APPLICATION_BINARY.value)
+            mimetype=input_mime_type if input_mime_type else MimeType.APPLICATION_BINARY.value,
+            chunksize=chunk_size, resumable=resumable)
+        if file_id:
+            meta_body.pop('parents', None)
+            request = self.service.files().update(fileId=file_id, body=meta_body, media_body=media_body, fields=fields)
+        else:
+            request = self.service.files().create(body=meta_body, media_body=media_body, fields=fields)
+        if not resumable:
+            response = request.execute()
+            if progress:
+                progress(size, size)
+            return response
+        session_key = session_store.key(filename, dict(meta_body, fileId=file_id) if file_id else meta_body) if session_store else None
+        return self._upload_chunks(request, size, progress, session_store, session_key)
 
-        return self.service.files().create(body=meta_body, media_body=media_body).execute()
+    @staticmethod
+    def _upload_chunks(request: object, size: int, progress: typing.Union[typing.Callable[[int, int], None], None],
+                       session_store: typing.Union['UploadSessionStore', None], key: typing.Union[str, None]) -> dict:
+        """
+        Sends a resumable upload chunk by chunk and keeps its session in the store until it completes.
+        """
+        stored_uri = session_store.get(key) if session_store else None
+        # Chunks are sent with the user's credentials, a session is only resumed on the host the
+        # upload was started on, the `rootUrl` of the service.
+        if stored_uri and urllib.parse.urlsplit(stored_uri)[:2] != urllib.parse.urlsplit(request.uri)[:2]:
+            session_store.remove(key)
+            stored_uri = None
+        if stored_uri:
+            request.resumable_uri = stored_uri
+            # Makes the next chunk ask the server how many bytes it already received.
+            request._in_error_state = True # pylint: disable=protected-access
+        response = None
+        while response is None:
+            try:
+                status, response = request.next_chunk()
+            except HttpError as exception:
+                if stored_uri is None or request.resumable_uri != stored_uri or exception.resp.status not in (404, 410):
+                    raise
+                # The stored session expired, start a new one.
+                session_store.remove(key)
+                stored_uri = None
+                request.resumable_uri = None
+                request.resumable_progress = 0
+                request._in_error_state = False # pylint: disable=protected-access
+                continue
+            if session_store and request.resumable_uri != stored_uri:
+                stored_uri = request.resumable_uri
+                session_store.put(key, stored_uri)
+            if status and progress:
+                progress(status.resumable_progress, size)
+        if session_store:
+            session_store.remove(key)
+        if progress:
+            progress(size, size)
+        return response
+
+    def upload_many(self, uploads: typing.Iterable[typing.Union[str, dict]], parent_folder_id: str = None,
+                    max_workers: int = 4, progress: typing.Callable[[str, int, int], None] = None,
+                    return_exceptions: bool = False, **kwargs) -> list:
+        """
+        Uploads many local files concurrently and returns the created files in the given order.
+        Each upload is either a file name or the keyword arguments of `upload`. Other keyword
+        arguments, e.g. `chunk_size` or `session_store`, apply to every upload.
+        `progress(filename, uploaded_bytes, total_bytes)` is called from the uploading threads.
+        At most `max_workers` files, each holding at most one chunk, are in flight at a time.
+        Concurrent uploads require a client created with `thread_safe=True`, otherwise the files
+        are uploaded one at a time.
+        """
+        def run(upload):
+            arguments = dict(kwargs, parent_folder_id=parent_folder_id)
+            arguments.update(upload if isinstance(upload, dict) else {"filename": upload})
+            filename = arguments.get("filename")
+            if progress:
+                arguments["progress"] = lambda uploaded, total: progress(filename, uploaded, total)
+            try:
+                return self.upload(**arguments)
+            except Exception as exception: # pylint: disable=broad-except
+                if return_exceptions:
+                    return exception
+                raise
+
+        uploads = list(uploads)
+        if not uses_pool(self.service):
+            return [run(upload) for upload in uploads]
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gutils-upload") as executor:
+            return list(executor.map(run, uploads))
+
+    def sync_directory(self, local_dir: str, folder_id: str, max_workers: int = 4, chunk_size: int = None,
+                       progress: typing.Callable[[str, int, int], None] = None) -> 'SyncReport':
+        """
+        Mirrors a local directory into a Drive folder, uploading new files and updating changed ones
+        with up to `max_workers` uploads in flight. Files are compared by size and MD5 checksum.
+        Returns a report with the result of every file. See `DirectorySync`.
+        """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.drive.v3.sync import DirectorySync
+        return DirectorySync(self, max_workers=max_workers, chunk_size=chunk_size).sync(local_dir, folder_id, progress=progress)
+
+    @property
+    def paths(self) -> 'FolderPathResolver':
+        """
+        Returns the folder path resolver of this resource, which caches resolved folder paths.
+        """
+        if self._path_resolver is None:
+            # pylint: disable=import-outside-toplevel
+            from gutils.services.drive.v3.paths import FolderPathResolver
+            self._path_resolver = FolderPathResolver(self)
+        return self._path_resolver
+
+    def find_folder(self, folder_name: str, parent_folder_id: str = None) -> typing.Union[dict, None]:
+        """
+        Returns the first folder with the given name inside the parent folder, which defaults to the My Drive root.
+        With an attached metadata `index` the folder is looked up locally.
+        """
+        if self.index is not None:
+            return self.index.find_folder(folder_name, parent_folder_id if parent_folder_id else "root")
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.drive.v3.paths import folder_name_query
+        for folder in self.iter_children(parent_folder_id if parent_folder_id else "root", query=folder_name_query(folder_name),
+                                         fields="id, name, mimeType, parents", page_size=1, prefetch=False):
+            return folder
+        return None
 
     def create_folder(self, folder_name: str, parent_folder_id: str = None,
                             ignore_duplicates: bool = False) -> dict:
         """
         Creates a new folder in Google Drive. Optionally supports to ignore duplicate folders.
+        Unless duplicates are ignored, an existing folder of the same name in the parent folder is returned instead.
         """
         if ignore_duplicates is False:
-            files = self.list_folders(folder_name)
-            if files:
-                #FIXME: Handle multiple duplicates here. It is highly possible that 2 folders might exist with the same name.
-                return files[0]
+            folder = self.find_folder(folder_name, parent_folder_id)
+            if folder:
+                return folder
 
         meta_body = {
             'name': folder_name,
-            'mimeType': 'application/vnd.google-apps.folder',
+            'mimeType': MimeType.APPLICATION_GDRIVE_FOLDER.value,
             'parents': [parent_folder_id] if parent_folder_id else None
         }
+        meta_body = {k: v for k, v in meta_body.items() if v is not None}
 
-        temp = {k: v for k, v in meta_body.items() if v is not None}
-        meta_body.clear()
-        meta_body.update(temp)
-
-        return self.upload()
+        folder = self.service.files().create(body=meta_body, fields="id, name, mimeType, parents").execute()
+        if self.index is not None:
+            self.index.upsert([folder])
+        if self._path_resolver is not None:
+            self._path_resolver.remember(parent_folder_id if parent_folder_id else self._path_resolver.root_id,
+                                         folder_name, folder.get('id'))
+        return folder
 
     def get_file(self, file_id: str) -> dict:
         """
@@ -94,91 +259,257 @@ class Drive:
         """
         return self.service.files().get(fileId=file_id).execute()
 
-    def list_items(self, query: Query = None, drive_id: str = None) -> list:
+    # pylint: disable=too-many-arguments
+    def iter_items(self, query: Query = None, drive_id: str = None, fields: str = None,
+                   page_size: int = 1000, prefetch: bool = True) -> typing.Generator[dict, None, None]:
         """
-        Returns a list of items from Google Drive based on the given query.
+        Yields items from Google Drive based on the given query as each page arrives.
+        `fields` is the field mask of a file, e.g. `id, name, mimeType, md5Checksum`.
+        The next page is fetched in the background while the current one is consumed when the
+        client is thread safe, so at most two pages are held in memory. Breaking out of the loop
+        stops the listing. Queries longer than `Query.max_length` are split into several listings
+        and every item is yielded once.
         """
-        items = list()
-        page_token = None
-        corpora = None
-        query = None
-
-        if query:
-            query = f"{query}"
+        queries = self._split_query(query)
+        if len(queries) > 1:
+            yield from self._unique(item for sub_query in queries
+                                    for item in self.iter_items(sub_query, drive_id, fields=self._with_id(fields),
+                                                                page_size=page_size, prefetch=prefetch))
+            return
 
+        fields = f"nextPageToken, files({fields if fields else self.default_item_fields})"
+        params = {"q": f"{query}" if query else None, "spaces": "drive", "fields": fields, "pageSize": page_size}
         if drive_id:
-            corpora = 'drive'
+            params.update(corpora="drive", driveId=drive_id, includeItemsFromAllDrives=True, supportsAllDrives=True)
 
-        while True:
-            response = self.service.files().list(q=query, corpora=corpora,
-                                    drive_id=drive_id, spaces='drive',
-                                    fields='nextPageToken, files(id, name, parents)',
-                                    pageSize=1000, pageToken=page_token).execute()
+        for page in self._iter_pages(lambda page_token: self.service.files().list(pageToken=page_token, **params),
+                                     prefetch=prefetch):
+            yield from page.get('files', [])
 
-            for file_ in response.get('files', []):
-                items.append(file_)
+    # pylint: disable=too-many-arguments
+    def iter_children(self, folder_id: str, query: Query = None, drive_id: str = None, fields: str = None,
+                      page_size: int = 1000, prefetch: bool = True) -> typing.Generator[dict, None, None]:
+        """
+        Yields the items that are not trashed inside a folder, optionally narrowed by `query`.
+        """
+        children_query = Query().VALUE(folder_id).IN.FIELD(QueryFields.PARENTS).AND.FIELD(QueryFields.TRASHED).EQUALS.VALUE(False)
+        query = children_query.AND.GROUP(query) if query else children_query
+        return self.iter_items(query, drive_id, fields=fields, page_size=page_size, prefetch=prefetch)
 
-            page_token = response.get('nextPageToken', None)
+    def walk(self, root_id: str, max_depth: int = None, mime_types: list = None, fields: str = None,
+             max_workers: int = 16, drive_id: str = None) -> typing.Generator[typing.Tuple[str, dict], None, None]:
+        """
+        Yields `(path, file)` for every item in the folder tree below `root_id`, listing up to
+        `max_workers` folders concurrently. See `FolderCrawler.walk`.
+        """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.drive.v3.crawler import FolderCrawler
+        crawler = FolderCrawler(self, max_workers=max_workers, drive_id=drive_id)
+        return crawler.walk(root_id, max_depth=max_depth, mime_types=mime_types, fields=fields)
 
-            if page_token is None:
-                break
-        return items
+    def iter_changes(self, name: str = "default", drive_id: str = None, fields: str = None,
+                     store: 'PageTokenStore' = None, start_fresh: bool = False) -> typing.Generator[dict, None, None]:
+        """
+        Yields the changes to items since the last call with the same feed `name` and stores the
+        new position on disk. The first call passes `start_fresh=True` and only records the position.
+        See `ChangeFeed.sync`.
+        """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.drive.v3.changes import ChangeFeed
+        return ChangeFeed(self, name=name, drive_id=drive_id, fields=fields, store=store).sync(start_fresh)
 
-    def list_folders(self, query: Query = None, drive_id: str = None) -> list:
+    def _iter_pages(self, list_request: typing.Callable[[typing.Union[str, None]], object],
+                    prefetch: bool = True) -> typing.Generator[dict, None, None]:
         """
-        Returns a list of folder resources in Google Drive.
+        Yields the responses of a paginated list request built by `list_request(page_token)`.
+        Pages are only prefetched when requests check out pooled transports, because a plain
+        `httplib2` transport cannot be shared with a background thread.
         """
-        # pylint: disable=not-callable
-        default_query = Query().FIELD(QueryFields.MIME_TYPE).EQUALS(MimeType.FOLDER.value)
-        if query:
-            query = f"{default_query} {Operator.AND} {query}"
-        else:
-            query = default_query
+        request = list_request(None)
+        if not prefetch or not uses_pool(self.service):
+            while request is not None:
+                response = request.execute()
+                yield response
+                page_token = response.get('nextPageToken', None)
+                request = list_request(page_token) if page_token else None
+            return
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gutils-prefetch")
+        try:
+            future = executor.submit(request.execute)
+            while future is not None:
+                response = future.result()
+                page_token = response.get('nextPageToken', None)
+                future = executor.submit(list_request(page_token).execute) if page_token else None
+                yield response
+        finally:
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def _split_query(query: typing.Union[Query, str, None]) -> list:
+        """
+        Splits a query longer than `Query.max_length`, which Drive rejects, into shorter queries that
+        together match the same items.
+        """
+        if query is None or len(f"{query}") <= Query.max_length:
+            return [query]
+        return as_expression(query).split(Query.max_length)
 
-        return self.list_items(query, drive_id)
+    @staticmethod
+    def _with_id(fields: typing.Union[str, None]) -> typing.Union[str, None]:
+        """
+        Adds the `id` to a field mask, it is needed to merge the items of split queries.
+        """
+        if not fields or "id" in [field.strip() for field in fields.split(",")]:
+            return fields
+        return f"id, {fields}"
+
+    @staticmethod
+    def _unique(items: typing.Iterable[dict]) -> typing.Generator[dict, None, None]:
+        seen = set()
+        for item in items:
+            if item.get('id') in seen:
+                continue
+            seen.add(item.get('id'))
+            yield item
 
-    def list_files(self, query: Query = None, drive_id: str = None) -> list:
+    def list_items(self, query: Query = None, drive_id: str = None, fields: str = None) -> list:
+        """
+        Returns a list of items from Google Drive based on the given query.
+        A query longer than `Query.max_length` is split into several queries, which are listed
+        concurrently when the client is thread safe, and items matched by more than one are returned once.
+        """
+        queries = self._split_query(query)
+        if len(queries) == 1 or not uses_pool(self.service):
+            return list(self.iter_items(query, drive_id, fields=fields))
+        fields = self._with_id(fields)
+        with ThreadPoolExecutor(max_workers=min(len(queries), self.max_query_workers), thread_name_prefix="gutils-query") as executor:
+            listings = list(executor.map(lambda sub_query: list(self.iter_items(sub_query, drive_id, fields=fields, prefetch=False)),
+                                         queries))
+        return list(self._unique(itertools.chain.from_iterable(listings)))
+
+    def list_folders(self, query: Query = None, drive_id: str = None, fields: str = None) -> list:
+        """
+        Returns a list of folder resources in Google Drive.
+        """
+        default_query = Query().FIELD(QueryFields.MIME_TYPE).EQUALS.VALUE(MimeType.APPLICATION_GDRIVE_FOLDER.value)
+        query = default_query.AND.GROUP(query) if query else default_query
+        return self.list_items(query, drive_id, fields=fields)
+
+    def list_files(self, query: Query = None, drive_id: str = None, fields: str = None) -> list:
         """
         Returns a list of file resources in Google Drive.
         """
+        default_query = Query().FIELD(QueryFields.MIME_TYPE).NOT_EQUALS.VALUE(MimeType.APPLICATION_GDRIVE_FOLDER.value).AND.FIELD(QueryFields.MIME_TYPE).NOT_EQUALS.VALUE(MimeType.APPLICATION_GDRIVE_SHORTCUT.value)
+        query = default_query.AND.GROUP(query) if query else default_query
+        return self.list_items(query, drive_id, fields=fields)
 
-        default_query = Query().FIELD(QueryFields.MIME_TYPE).NOT_EQUALS.VALUE(MimeType.FOLDER.value).AND.FIELD(QueryFields.MIME_TYPE).NOT_EQUALS.VALUE(MimeType.APPLICATION_GDRIVE_SHORTCUT.value)
-        if query:
-            query = f"{default_query} {Operator.AND} {query}"
-        else:
-            query = default_query
+    # pylint: disable=too-many-arguments
+    def download(self, file_id: str, download_mime_type: MimeType = None, output_file: str = None,
+                 chunk_size: int = None, resume: bool = True,
+                 progress: typing.Callable[[int, typing.Union[int, None]], None] = None,
+                 metadata: dict = None) -> str:
+        """
+        Downloads a file from Google Drive and returns the path it was written to.
+        Google Workspace files are exported as `download_mime_type`, other files are downloaded as is.
+        The file is streamed to `<output_file>.<version>.part` in chunks of `chunk_size` bytes and
+        renamed once complete. With `resume`, a part file left by an interrupted download of the
+        same file version is continued with a range request instead of starting over.
+        `metadata` with the `name`, `mimeType` and `modifiedTime` of the file saves a request when known.
+        """
+        if metadata is None:
+            metadata = self.service.files().get(fileId=file_id, fields="id, name, mimeType, modifiedTime",
+                                                supportsAllDrives=True).execute()
+        output_file = output_file if output_file else metadata.get("name")
+        version = hashlib.sha256(f"{file_id}:{metadata.get('modifiedTime')}:{download_mime_type}".encode()).hexdigest()[:12]
+        part_file = f"{output_file}.{version}.part"
+        # Only part files with a version of their own, `<output_file>.*.part` also matches the part
+        # files of other downloads, e.g. of `<output_file>.csv`.
+        for stale_part_file in glob.glob(f"{glob.escape(output_file)}.{'[0-9a-f]' * 12}.part"):
+            if stale_part_file != part_file:
+                os.remove(stale_part_file)
 
-        return self.list_items(query, drive_id)
+        start = os.path.getsize(part_file) if resume and os.path.exists(part_file) else 0
+        with open(part_file, "ab" if start else "wb") as file_:
+            self.download_to(file_id, file_, download_mime_type=download_mime_type, chunk_size=chunk_size,
+                             start=start, progress=progress, metadata=metadata)
+        os.replace(part_file, output_file)
+        return output_file
 
-    def download(self, file_id: str, download_mime_type: MimeType, output_file: str = None) -> str:
+    def download_many(self, files: typing.Union[typing.Iterable[str], Query, str], target_dir: str,
+                      max_workers: int = 8, chunk_size: int = None,
+                      progress: typing.Callable[[str, int, typing.Union[int, None]], None] = None) -> 'DownloadReport':
         """
-        Downloads a file from Google Drive.
+        Downloads the files with the given IDs or matching the given query into `target_dir` with up
+        to `max_workers` downloads in flight, skipping files whose local copy is up to date.
+        Returns a report with the result of every file. See `BulkDownloader`.
         """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.drive.v3.downloads import BulkDownloader
+        downloader = BulkDownloader(self, target_dir, max_workers=max_workers, chunk_size=chunk_size)
+        return downloader.download(files, progress=progress)
 
-        if not output_file:
-            output_file = self.get(file_id).get("name")
+    # pylint: disable=too-many-arguments,too-many-locals
+    def download_to(self, file_id: str, sink: typing.BinaryIO, download_mime_type: MimeType = None,
+                    chunk_size: int = None, start: int = 0,
+                    progress: typing.Callable[[int, typing.Union[int, None]], None] = None,
+                    metadata: dict = None) -> int:
+        """
+        Streams a file from Google Drive into `sink`, any object with a `write(bytes)` method, and
+        returns the number of bytes written. At most one chunk of `chunk_size` bytes is held in memory.
+        Binary files are fetched directly with range requests starting at byte `start`. Google
+        Workspace files are exported as `download_mime_type` in a single response.
+        """
+        if metadata is None:
+            metadata = self.service.files().get(fileId=file_id, fields="id, mimeType", supportsAllDrives=True).execute()
+        chunk_size = chunk_size if chunk_size else self.default_chunk_size
+        if metadata.get("mimeType", "").startswith(self.google_apps_mime_type_prefix):
+            if not download_mime_type:
+                raise ValueError(f"Google Workspace file {file_id} of type {metadata.get('mimeType')} requires a download_mime_type to export to.")
+            request = self.service.files().export_media(fileId=file_id, mimeType=getattr(download_mime_type, "value", download_mime_type))
+        else:
+            request = self.service.files().get_media(fileId=file_id, supportsAllDrives=True)
 
-        request = self.service.files().export_media(fileId=file_id,
-                                             mimeType=f'{download_mime_type}')
-        file_object = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_object, request)
-        done = False
-        while done is False:
-            _, done = downloader.next_chunk()
-        file_object.seek(0)
-        with open(output_file, 'wb') as file_:
-            shutil.copyfileobj(file_object, file_)
+        response_headers = dict()
+        request.add_response_callback(response_headers.update)
+        offset, total, written = start, None, 0
+        while total is None or offset < total:
+            request.headers["range"] = f"bytes={offset}-{offset + chunk_size - 1}"
+            response_headers.clear()
+            try:
+                content = request.execute()
+            except HttpError as exception:
+                # The requested range starts at the end of the file, i.e. it is complete or empty.
+                if exception.resp.status == 416:
+                    break
+                raise
+            if "content-range" in response_headers:
+                total = int(response_headers["content-range"].rsplit("/", 1)[1])
+            else:
+                # The whole file was returned, e.g. by an export that does not support ranges.
+                total = len(content)
+                content = content[offset:]
+            if not content:
+                break
+            sink.write(content)
+            offset += len(content)
+            written += len(content)
+            if progress:
+                progress(offset, total)
+        return written
 
     def move_to_folder(self, file_id: str, folder_id: str):
         """
         Moves a file to a given folder in Google Drive.
         Note: All previous occurances of the same file in various parent folders will be removed.
         """
-        file_ = self.service.files().get(fileId=file_id).execute()
-        previous_parents = ",".join(file_.get('parents'))
+        file_ = self.service.files().get(fileId=file_id, fields="parents").execute()
+        previous_parents = ",".join(file_.get('parents', []))
         self.service.files().update(fileId=file_id,
                                     addParents=folder_id,
                                     removeParents=previous_parents).execute()
+        if self._path_resolver is not None:
+            self._path_resolver.forget(file_id)
 
     def copy_to_folder(self, file_id: str, folder_id: str):
         """
@@ -186,3 +517,56 @@ class Drive:
         """
         self.service.files().update(fileId=file_id,
                                     addParents=folder_id).execute()
+
+    def batch(self, batch_size: int = 100) -> Batch:
+        """
+        Returns a batching context that sends requests of this service as multipart batch requests.
+        """
+        return Batch(self.service, batch_size=batch_size)
+
+    def get_files(self, file_ids: list, fields: str = None, return_exceptions: bool = False) -> dict:
+        """
+        Returns the metadata of many files keyed by file id, fetched with batch requests.
+        """
+        with self.batch() as batch:
+            for file_id in file_ids:
+                batch.add(self.service.files().get(fileId=file_id, fields=fields), key=file_id)
+        return self._batch_results(file_ids, batch.results, return_exceptions)
+
+    def move_files_to_folder(self, file_ids: list, folder_id: str, return_exceptions: bool = False) -> dict:
+        """
+        Moves many files to a given folder in Google Drive with batch requests.
+        Note: All previous occurances of the same files in various parent folders will be removed.
+        """
+        files = self.get_files(file_ids, fields="id, parents", return_exceptions=True)
+        with self.batch() as batch:
+            for file_id, file_ in files.items():
+                if isinstance(file_, Exception):
+                    continue
+                batch.add(self.service.files().update(fileId=file_id, addParents=folder_id,
+                                                      removeParents=",".join(file_.get('parents', []))), key=file_id)
+        if self._path_resolver is not None:
+            for file_id in file_ids:
+                self._path_resolver.forget(file_id)
+        return self._batch_results(file_ids, {**files, **batch.results}, return_exceptions)
+
+    def copy_files_to_folder(self, file_ids: list, folder_id: str, return_exceptions: bool = False) -> dict:
+        """
+        Copies many files to a given folder in Google Drive with batch requests.
+        """
+        with self.batch() as batch:
+            for file_id in file_ids:
+                batch.add(self.service.files().update(fileId=file_id, addParents=folder_id), key=file_id)
+        return self._batch_results(file_ids, batch.results, return_exceptions)
+
+    @staticmethod
+    def _batch_results(file_ids: list, results: dict, return_exceptions: bool) -> dict:
+        """
+        Orders batch results by the given file ids and raises the first failure unless asked not to.
+        """
+        ordered = {file_id: results.get(file_id) for file_id in file_ids}
+        if not return_exceptions:
+            for result in ordered.values():
+                if isinstance(result, Exception):
+                    raise result
+        return ordered
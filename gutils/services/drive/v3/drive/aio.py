@@ -0,0 +1,142 @@
+"""
+Asyncio variant of the Drive resource. Media uploads and downloads remain on `Drive`.
+"""
+import urllib.parse
+
+# pylint: disable=wildcard-import
+# pylint: disable=unused-wildcard-import
+from gutils.services.drive.v3.query import Query, as_expression
+from gutils.services.enums import *
+
+
+# pylint: disable=line-too-long
+class AsyncDrive:
+    """
+    Mirrors the `Drive` class with coroutines that share one `AsyncSession`.
+    """
+    service_name = "drive"
+    resource_name = "drive"
+    version = "v3"
+
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+    async def list_drives(self) -> list:
+        """
+        Returns a list of all drive resources.
+        """
+        drives = list()
+        page_token = None
+        while True:
+            response = await self.session.request(self.service_name, "GET", "drives", method_id="drive.drives.list",
+                            params={"fields": "nextPageToken, drives(id, name)",
+                                    "pageSize": 100, "pageToken": page_token})
+            drives.extend(response.get('drives', []))
+            page_token = response.get('nextPageToken', None)
+            if page_token is None:
+                break
+        return drives
+
+    async def create_folder(self, folder_name: str, parent_folder_id: str = None,
+                            ignore_duplicates: bool = False) -> dict:
+        """
+        Creates a new folder in Google Drive. Optionally supports to ignore duplicate folders.
+        Unless duplicates are ignored, an existing folder of the same name in the parent folder is returned instead.
+        """
+        if ignore_duplicates is False:
+            query = (Query().VALUE(parent_folder_id if parent_folder_id else "root").IN.FIELD(QueryFields.PARENTS)
+                     .AND.FIELD(QueryFields.TRASHED).EQUALS.VALUE(False)
+                     .AND.FIELD(QueryFields.NAME).EQUALS.VALUE(folder_name))
+            files = await self.list_folders(query)
+            if files:
+                return files[0]
+
+        meta_body = {
+            'name': folder_name,
+            'mimeType': MimeType.APPLICATION_GDRIVE_FOLDER.value,
+            'parents': [parent_folder_id] if parent_folder_id else None
+        }
+        meta_body = {k: v for k, v in meta_body.items() if v is not None}
+        return await self.session.request(self.service_name, "POST", "files", body=meta_body,
+                                          method_id="drive.files.create")
+
+    async def get_file(self, file_id: str) -> dict:
+        """
+        Returns a files's metadata.
+        """
+        return await self.session.request(self.service_name, "GET", f"files/{urllib.parse.quote(file_id, safe='')}",
+                                          method_id="drive.files.get")
+
+    async def list_items(self, query: Query = None, drive_id: str = None) -> list:
+        """
+        Returns a list of items from Google Drive based on the given query.
+        A query longer than `Query.max_length` is split into several queries that are listed concurrently.
+        """
+        if query is not None and len(f"{query}") > Query.max_length:
+            # pylint: disable=import-outside-toplevel
+            import asyncio
+            listings = await asyncio.gather(*[self.list_items(sub_query, drive_id)
+                                              for sub_query in as_expression(query).split(Query.max_length)])
+            items, seen = list(), set()
+            for item in (item for listing in listings for item in listing):
+                if item.get('id') not in seen:
+                    seen.add(item.get('id'))
+                    items.append(item)
+            return items
+
+        items = list()
+        page_token = None
+        params = {
+            "q": f"{query}" if query else None,
+            "spaces": "drive",
+            "fields": "nextPageToken, files(id, name, parents)",
+            "pageSize": 1000,
+        }
+        if drive_id:
+            params.update(corpora="drive", driveId=drive_id,
+                          includeItemsFromAllDrives=True, supportsAllDrives=True)
+        while True:
+            params["pageToken"] = page_token
+            response = await self.session.request(self.service_name, "GET", "files", params=params,
+                                                  method_id="drive.files.list")
+            items.extend(response.get('files', []))
+            page_token = response.get('nextPageToken', None)
+            if page_token is None:
+                break
+        return items
+
+    async def list_folders(self, query: Query = None, drive_id: str = None) -> list:
+        """
+        Returns a list of folder resources in Google Drive.
+        """
+        default_query = Query().FIELD(QueryFields.MIME_TYPE).EQUALS.VALUE(MimeType.APPLICATION_GDRIVE_FOLDER.value)
+        query = default_query.AND.GROUP(query) if query else default_query
+        return await self.list_items(query, drive_id)
+
+    async def list_files(self, query: Query = None, drive_id: str = None) -> list:
+        """
+        Returns a list of file resources in Google Drive.
+        """
+        default_query = Query().FIELD(QueryFields.MIME_TYPE).NOT_EQUALS.VALUE(MimeType.APPLICATION_GDRIVE_FOLDER.value).AND.FIELD(QueryFields.MIME_TYPE).NOT_EQUALS.VALUE(MimeType.APPLICATION_GDRIVE_SHORTCUT.value)
+        query = default_query.AND.GROUP(query) if query else default_query
+        return await self.list_items(query, drive_id)
+
+    async def move_to_folder(self, file_id: str, folder_id: str) -> dict:
+        """
+        Moves a file to a given folder in Google Drive.
+        Note: All previous occurances of the same file in various parent folders will be removed.
+        """
+        path = f"files/{urllib.parse.quote(file_id, safe='')}"
+        file_ = await self.session.request(self.service_name, "GET", path, params={"fields": "parents"},
+                                             method_id="drive.files.get")
+        previous_parents = ",".join(file_.get('parents', []))
+        return await self.session.request(self.service_name, "PATCH", path,
+                        params={"addParents": folder_id, "removeParents": previous_parents}, body={},
+                        method_id="drive.files.update")
+
+    async def copy_to_folder(self, file_id: str, folder_id: str) -> dict:
+        """
+        Copies a file to a given folder in Google Drive.
+        """
+        return await self.session.request(self.service_name, "PATCH", f"files/{urllib.parse.quote(file_id, safe='')}",
+                        params={"addParents": folder_id}, body={}, method_id="drive.files.update")
@@ -1,33 +1,39 @@
 """
 Some helper functions for Google Drive that isn't part of the API functionality.
 """
+import hashlib
 from typing import Union
 
 from gutils.services.drive.v3.drive import Drive
+from gutils.services.drive.v3.paths import folder_name_query
 
 
 def create_nested_drive_folders(drive: Drive, folder_paths: str) -> list:
     """
     Creates a new folder paths in Google Drive.
+    Existing folders of the path are reused and resolved folders are cached by `drive.paths`.
     """
+    return drive.paths.ensure(folder_paths)
 
-    folders = list()
-    folder_paths = folder_paths.split('/')
-    next_parent = None
-    for folder_path in folder_paths:
-        folder = drive.create_folder(folder_path, parent_folder_id=next_parent)
-        next_parent = folder.get('id')
-        folders.append(folder)
-    return folders
 
-#TODO: This method needs to be tested
 def get_drive_folder_id(drive: Drive, folder_name: str) -> Union[str, None]:
     """
-    Returns the id of the folder with the given name.
+    Returns the id of the folder with the given name or slash separated path from the My Drive root.
     """
-    folders = drive.list_folders()
-    if folders:
-        for folder in folders:
-            if folder_name == folder.get('name'):
-                return folder.get('id')
-    return None
+    folder_id = drive.paths.resolve(folder_name)
+    if folder_id is None and "/" not in folder_name:
+        # Folders outside of the My Drive root, e.g. shared ones, are still matched by name.
+        for folder in drive.iter_items(folder_name_query(folder_name), fields="id", page_size=1, prefetch=False):
+            return folder.get('id')
+    return folder_id
+
+
+def md5_checksum(path: str) -> str:
+    """
+    Returns the MD5 checksum of a local file in the hex form of Drive's `md5Checksum`, read in blocks.
+    """
+    md5 = hashlib.md5()
+    with open(path, "rb") as file_:
+        for block in iter(lambda: file_.read(1024 * 1024), b""):
+            md5.update(block)
+    return md5.hexdigest()
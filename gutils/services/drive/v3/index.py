@@ -0,0 +1,292 @@
+"""
+This module contains a local SQLite index of Drive metadata, queried with Drive query semantics.
+"""
+import datetime
+import functools
+import os
+import sqlite3
+import threading
+import typing
+
+from gutils.creds.locking import owned, private_dir, user_cache_dir
+from gutils.services.drive.v3.drive import Drive
+from gutils.services.drive.v3.query import And, Comparison, Expression, Membership, Not, Or, Query, Text, parse_query
+from gutils.services.enums import MimeType, Operator
+
+_COLUMNS = {"name": "name", "mimeType": "mime_type", "modifiedTime": "modified_time",
+            "trashed": "trashed", "md5Checksum": "md5_checksum"}
+_SQL_OPERATORS = {Operator.EQUALS: "=", Operator.NOT_EQUALS: "!=", Operator.LESS_THAN: "<",
+                  Operator.LESS_THAN_EQUALS: "<=", Operator.GREATER_THAN: ">", Operator.GREATER_THAN_EQUALS: ">="}
+
+
+def _sql(expression: Expression, params: list) -> str:
+    """
+    Translates a query expression into an SQL condition on the `files` table. Supports `and`, `or`,
+    `not`, comparisons of `name`, `mimeType`, `modifiedTime`, `trashed` and `md5Checksum` and
+    `'<id>' in parents`.
+    """
+    if isinstance(expression, Query):
+        expression = expression.expression
+    if isinstance(expression, Text):
+        expression = parse_query(expression.text)
+    if isinstance(expression, (And, Or)):
+        joined = f" {expression.operator.value.upper()} ".join(_sql(operand, params) for operand in expression.operands)
+        return f"({joined})"
+    if isinstance(expression, Not):
+        return f"NOT {_sql(expression.operand, params)}"
+    if isinstance(expression, Membership):
+        if expression.field != "parents":
+            raise ValueError(f"'in {expression.field}' is not supported by the metadata index.")
+        if expression.value == "root":
+            # Like the Drive API, `'root' in parents` refers to the My Drive root, which listings
+            # only return by ID. It is looked up in the settings when the query runs.
+            return ("EXISTS (SELECT 1 FROM parents WHERE parents.file_id = files.id AND parents.parent_id = "
+                    "COALESCE((SELECT value FROM settings WHERE key = 'root_id'), 'root'))")
+        params.append(f"{expression.value}")
+        return "EXISTS (SELECT 1 FROM parents WHERE parents.file_id = files.id AND parents.parent_id = ?)"
+    if not isinstance(expression, Comparison) or expression.field not in _COLUMNS:
+        raise ValueError(f"{expression} is not supported by the metadata index.")
+    column = _COLUMNS[expression.field]
+    value = getattr(expression.value, "value", expression.value)
+    if expression.operator == Operator.CONTAINS and expression.field in ("name", "mimeType"):
+        params.append(f"{value}")
+        return f"instr(lower({column}), lower(?)) > 0"
+    if expression.operator not in _SQL_OPERATORS:
+        raise ValueError(f"Operator {expression.operator.value} is not supported for {expression.field} by the metadata index.")
+    operator = _SQL_OPERATORS[expression.operator]
+    if expression.field == "trashed":
+        params.append(1 if value is True or value == "true" else 0)
+        return f"{column} {operator} ?"
+    if expression.field == "modifiedTime":
+        params.append(value.strftime("%Y-%m-%dT%H:%M:%S") if isinstance(value, datetime.datetime) else f"{value}")
+        # Drive returns times with milliseconds, queries usually compare whole seconds.
+        return f"substr({column}, 1, 19) {operator} substr(?, 1, 19)"
+    params.append(f"{value}")
+    return f"{column} {operator} ?"
+
+
+@functools.lru_cache(maxsize=256)
+def compile_query(query: str) -> typing.Tuple[str, tuple]:
+    """
+    Returns the SQL condition and parameters of a Drive query.
+    """
+    expression = parse_query(query)
+    if expression is None:
+        return "1", tuple()
+    params = list()
+    condition = _sql(expression, params)
+    return condition, tuple(params)
+
+
+class _IndexPageTokenStore:
+    """
+    Keeps change feed page tokens in the index database, next to the metadata they describe.
+    """
+    def __init__(self, index: 'MetadataIndex') -> None:
+        self.index = index
+
+    def get(self, key: str) -> typing.Union[str, None]:
+        return self.index.get_setting(f"page_token:{key}")
+
+    def put(self, key: str, page_token: str) -> None:
+        self.index.set_setting(f"page_token:{key}", page_token)
+
+    def remove(self, key: str) -> None:
+        self.index.set_setting(f"page_token:{key}", None)
+
+
+# pylint: disable=line-too-long
+class MetadataIndex:
+    """
+    A local SQLite index of the id, name, parents, mimeType, modifiedTime and md5Checksum of Drive
+    items. It is filled from a listing and kept current from the changes feed, after which name,
+    parent and query lookups need no requests. Attach it to a Drive resource with `drive.index = index`
+    to answer folder lookups of `find_folder`, `create_folder` and `drive.paths` from the index.
+    Without a `path` the index is kept in `~/.cache/gutils/drive`, readable by the current user only.
+
+    index = MetadataIndex("drive.sqlite3")
+    index.refresh(drive)
+    index.query(Query().FIELD(QueryFields.NAME).CONTAINS.VALUE("report"))
+    """
+    _default_path = user_cache_dir("drive/index.sqlite3")
+    fields = "id, name, mimeType, parents, modifiedTime, md5Checksum, size, trashed"
+    _schema = """
+        CREATE TABLE IF NOT EXISTS files (
+            id TEXT PRIMARY KEY, name TEXT, mime_type TEXT, modified_time TEXT,
+            md5_checksum TEXT, size INTEGER, trashed INTEGER NOT NULL DEFAULT 0);
+        CREATE INDEX IF NOT EXISTS files_name ON files (name);
+        CREATE TABLE IF NOT EXISTS parents (
+            parent_id TEXT NOT NULL, file_id TEXT NOT NULL, PRIMARY KEY (parent_id, file_id));
+        CREATE INDEX IF NOT EXISTS parents_file_id ON parents (file_id);
+        CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);
+    """
+    _select = """
+        SELECT id, name, mime_type, modified_time, md5_checksum, size, trashed,
+               (SELECT group_concat(parent_id) FROM parents WHERE parents.file_id = files.id)
+        FROM files
+    """
+
+    def __init__(self, path: str = None) -> None:
+        self.path = path if path else self._default_path
+        if not path:
+            # The index lists the user's files and answers folder lookups of uploads, the default
+            # one is kept in a private directory and not opened when another user created it.
+            private_dir(os.path.dirname(self.path))
+            if os.path.exists(self.path) and not owned(self.path):
+                raise PermissionError(f"'{self.path}' is owned by another user. Remove it or pass another path.")
+        elif self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.executescript(self._schema)
+        self._lock = threading.Lock()
+        self.page_tokens = _IndexPageTokenStore(self)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> 'MetadataIndex':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def get_setting(self, key: str) -> typing.Union[str, None]:
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_setting(self, key: str, value: typing.Union[str, None]) -> None:
+        with self._lock, self._connection:
+            if value is None:
+                self._connection.execute("DELETE FROM settings WHERE key = ?", (key,))
+            else:
+                self._connection.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+
+    def upsert(self, files: typing.Iterable[dict]) -> int:
+        """
+        Adds or replaces items given as Drive file resources and returns how many were written.
+        """
+        count = 0
+        with self._lock, self._connection:
+            for file_ in files:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO files (id, name, mime_type, modified_time, md5_checksum, size, trashed) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (file_.get("id"), file_.get("name"), file_.get("mimeType"), file_.get("modifiedTime"),
+                     file_.get("md5Checksum"), int(file_["size"]) if file_.get("size") is not None else None,
+                     1 if file_.get("trashed") else 0))
+                if "parents" in file_:
+                    self._connection.execute("DELETE FROM parents WHERE file_id = ?", (file_.get("id"),))
+                    self._connection.executemany("INSERT OR IGNORE INTO parents (parent_id, file_id) VALUES (?, ?)",
+                                                 [(parent_id, file_.get("id")) for parent_id in file_.get("parents") or []])
+                count += 1
+        return count
+
+    def remove(self, file_ids: typing.Iterable[str]) -> None:
+        with self._lock, self._connection:
+            for file_id in file_ids:
+                self._connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                self._connection.execute("DELETE FROM parents WHERE file_id = ?", (file_id,))
+
+    def clear(self) -> None:
+        """
+        Removes all items and stored change feed positions.
+        """
+        with self._lock, self._connection:
+            self._connection.executescript("DELETE FROM files; DELETE FROM parents; DELETE FROM settings;")
+
+    def apply_changes(self, changes: typing.Iterable[dict]) -> int:
+        """
+        Applies entries of the changes feed and returns how many were applied.
+        """
+        count = 0
+        for change in changes:
+            if change.get("removed", False) or "file" not in change:
+                self.remove([change.get("fileId")])
+            else:
+                self.upsert([change.get("file")])
+            count += 1
+        return count
+
+    def populate(self, drive: Drive, query: typing.Union[Query, str] = None, drive_id: str = None) -> int:
+        """
+        Adds every item of a listing, optionally narrowed by `query`, and returns how many were added.
+        """
+        self._remember_root(drive, drive_id)
+        return self.upsert(drive.iter_items(query, drive_id, fields=self.fields))
+
+    def refresh(self, drive: Drive, name: str = "index", drive_id: str = None) -> int:
+        """
+        Brings the index up to date and returns the number of items written. The first refresh of
+        a feed `name` records the position of the changes feed and lists everything, later ones
+        only apply the changes since the last refresh.
+        """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.drive.v3.changes import ChangeFeed
+        feed = ChangeFeed(drive, name=name, drive_id=drive_id, fields=self.fields, store=self.page_tokens)
+        if self.page_tokens.get(feed.key) is None:
+            # The position is taken before listing, so changes made during the listing are applied next time.
+            page_token = feed.start_page_token()
+            count = self.populate(drive, drive_id=drive_id)
+            self.page_tokens.put(feed.key, page_token)
+            return count
+        return self.apply_changes(feed.sync())
+
+    def _remember_root(self, drive: Drive, drive_id: str = None) -> None:
+        """
+        Stores the ID of the My Drive root, which listings only return by ID but lookups address as `root`.
+        """
+        if drive_id is None and self.get_setting("root_id") is None:
+            root = drive.service.files().get(fileId="root", fields="id").execute()
+            self.set_setting("root_id", root.get("id"))
+
+    def _parent_id(self, parent_id: str) -> str:
+        if parent_id != "root":
+            return parent_id
+        return self.get_setting("root_id") or parent_id
+
+    @staticmethod
+    def _file(row: tuple) -> dict:
+        file_ = {"id": row[0], "name": row[1], "mimeType": row[2], "modifiedTime": row[3],
+                 "md5Checksum": row[4], "size": f"{row[5]}" if row[5] is not None else None,
+                 "trashed": bool(row[6]), "parents": row[7].split(",") if row[7] else []}
+        return {key: value for key, value in file_.items() if value is not None}
+
+    def get(self, file_id: str) -> typing.Union[dict, None]:
+        with self._lock:
+            row = self._connection.execute(f"{self._select} WHERE id = ?", (file_id,)).fetchone()
+        return self._file(row) if row else None
+
+    def query(self, query: typing.Union[Query, str] = None, limit: int = None) -> typing.List[dict]:
+        """
+        Returns the items matching a Drive query. Like the Drive API, `'root' in parents` refers to the My Drive root.
+        """
+        condition, params = compile_query(f"{query}" if query else "")
+        sql = f"{self._select} WHERE {condition} ORDER BY name"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        return [self._file(row) for row in rows]
+
+    def children(self, parent_id: str, name: str = None, mime_type: typing.Union[MimeType, str] = None) -> typing.List[dict]:
+        """
+        Returns the items that are not trashed inside a folder, optionally of the given name and mime type.
+        """
+        sql = f"{self._select} WHERE trashed = 0 AND id IN (SELECT file_id FROM parents WHERE parent_id = ?)"
+        params = [self._parent_id(parent_id)]
+        if name is not None:
+            sql += " AND name = ?"
+            params.append(name)
+        if mime_type is not None:
+            sql += " AND mime_type = ?"
+            params.append(f"{getattr(mime_type, 'value', mime_type)}")
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        return [self._file(row) for row in rows]
+
+    def find_folder(self, folder_name: str, parent_folder_id: str = "root") -> typing.Union[dict, None]:
+        """
+        Returns the first folder with the given name inside the parent folder or None.
+        """
+        folders = self.children(parent_folder_id, folder_name, MimeType.APPLICATION_GDRIVE_FOLDER)
+        return folders[0] if folders else None
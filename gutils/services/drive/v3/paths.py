@@ -0,0 +1,122 @@
+"""
+This module contains the resolver that maps slash separated folder paths to Drive folder IDs.
+"""
+import threading
+import time
+import typing
+
+from gutils.services.drive.v3.query import Comparison, Expression
+from gutils.services.enums import MimeType, Operator, QueryFields
+
+
+def folder_name_query(name: str) -> Expression:
+    """
+    Returns the query expression that matches folders named `name`.
+    """
+    return (Comparison(QueryFields.NAME, Operator.EQUALS, name)
+            & Comparison(QueryFields.MIME_TYPE, Operator.EQUALS, MimeType.APPLICATION_GDRIVE_FOLDER))
+
+
+# pylint: disable=line-too-long
+class FolderPathResolver:
+    """
+    Resolves paths such as `a/b/c` to folder IDs, looking every segment up under its actual parent.
+    Resolved segments are cached for `ttl` seconds, so repeated lookups of the same paths need no
+    requests. Paths are relative to `root_id`, which is the My Drive root unless a folder or shared
+    drive ID is given.
+    """
+    def __init__(self, drive: object, ttl: float = 300, root_id: str = "root", drive_id: str = None) -> None:
+        self.drive = drive
+        self.ttl = ttl
+        self.root_id = root_id
+        self.drive_id = drive_id
+        self._folders = dict()
+        self._lock = threading.Lock()
+        self._create_lock = threading.Lock()
+
+    @staticmethod
+    def split(path: str) -> typing.List[str]:
+        return [segment for segment in path.split("/") if segment]
+
+    def remember(self, parent_id: str, name: str, folder_id: str) -> None:
+        """
+        Caches the ID of the folder `name` inside `parent_id`.
+        """
+        with self._lock:
+            self._folders[(parent_id, name)] = (folder_id, time.monotonic() + self.ttl)
+
+    def forget(self, folder_id: str) -> None:
+        """
+        Drops a folder and everything cached below it, e.g. after it was moved, renamed or deleted.
+        """
+        with self._lock:
+            stale = {folder_id}
+            removed = True
+            while removed:
+                removed = False
+                for key, (cached_id, _) in list(self._folders.items()):
+                    if cached_id in stale or key[0] in stale:
+                        stale.add(cached_id)
+                        del self._folders[key]
+                        removed = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._folders.clear()
+
+    def _cached(self, parent_id: str, name: str) -> typing.Union[str, None]:
+        with self._lock:
+            entry = self._folders.get((parent_id, name))
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self._folders[(parent_id, name)]
+                return None
+            return entry[0]
+
+    def _lookup(self, parent_id: str, name: str) -> typing.Union[str, None]:
+        folder_id = self._cached(parent_id, name)
+        if folder_id:
+            return folder_id
+        index = getattr(self.drive, "index", None)
+        if index is not None:
+            folder = index.find_folder(name, parent_id)
+            if folder is not None:
+                self.remember(parent_id, name, folder.get('id'))
+            return folder.get('id') if folder else None
+        for folder in self.drive.iter_children(parent_id, query=folder_name_query(name), drive_id=self.drive_id,
+                                               fields="id, name", page_size=1, prefetch=False):
+            self.remember(parent_id, name, folder.get('id'))
+            return folder.get('id')
+        return None
+
+    def resolve(self, path: str) -> typing.Union[str, None]:
+        """
+        Returns the ID of the folder at `path` or None when a segment does not exist.
+        """
+        folder_id = self.root_id
+        for name in self.split(path):
+            folder_id = self._lookup(folder_id, name)
+            if folder_id is None:
+                return None
+        return folder_id
+
+    def ensure(self, path: str) -> typing.List[dict]:
+        """
+        Creates the missing folders of `path` and returns the `id` and `name` of every segment.
+        """
+        folders = list()
+        parent_id = self.root_id
+        for name in self.split(path):
+            folder_id = self._lookup(parent_id, name)
+            if folder_id is None:
+                # Concurrent callers creating the same path must not create the folder twice.
+                with self._create_lock:
+                    folder_id = self._cached(parent_id, name)
+                    if folder_id is None:
+                        folder_id = self.drive.create_folder(name, parent_folder_id=parent_id,
+                                                             ignore_duplicates=True).get('id')
+                        self.remember(parent_id, name, folder_id)
+            folders.append({"id": folder_id, "name": name})
+            parent_id = folder_id
+        return folders
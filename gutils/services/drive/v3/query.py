@@ -1,144 +1,515 @@
 """
 This module contains the query builder for the Drive API.
 """
-import typing
+import abc
 import datetime
+import enum
+import functools
+import re
+import typing
 import warnings
 
 from gutils.services.enums import QueryFields, Operator, MimeType
 
+# `properties has { key='a' and value='b' }` clauses are read as one opaque token, they can not be split.
+_TOKEN = re.compile(r"\s*(?:([A-Za-z_][\w.]*\s+has\s*\{(?:[^{}']|'(?:[^'\\]|\\.)*')*\})|('(?:[^'\\]|\\.)*')|(\(|\))|(!=|<=|>=|=|<|>)|([A-Za-z_][\w.]*)|(-?\d+(?:\.\d+)?)|(\S))")
+_KEYWORDS = {operator.value: operator for operator in (Operator.AND, Operator.OR, Operator.NOT, Operator.IN,
+                                                         Operator.CONTAINS, Operator.HAS)}
+_COMPARISONS = {operator.value: operator for operator in (Operator.EQUALS, Operator.NOT_EQUALS, Operator.LESS_THAN,
+                                                            Operator.LESS_THAN_EQUALS, Operator.GREATER_THAN,
+                                                            Operator.GREATER_THAN_EQUALS)}
+
+
+def escape_value(value: str) -> str:
+    """
+    Escapes a string for use inside a quoted query value.
+    """
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+class Literal(str):
+    """
+    A value that is written to the query as is, e.g. a number.
+    """
+
+
+def render_value(value: typing.Union[str, int, float, bool, datetime.datetime, enum.Enum]) -> str:
+    """
+    Returns a value in query syntax. Strings are quoted and escaped, booleans are written bare.
+    """
+    if isinstance(value, Literal):
+        return f"{value}"
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, datetime.datetime):
+        value = value.strftime("%Y-%m-%dT%H:%M:%S")
+    if isinstance(value, enum.Enum):
+        value = value.value
+    return f"'{escape_value(f'{value}')}'"
+
+
+def _field_name(field: typing.Union[QueryFields, str]) -> str:
+    return field.value if isinstance(field, QueryFields) else f"{field}"
+
+
+# pylint: disable=line-too-long
+class Expression(abc.ABC):
+    """
+    A node of a query expression tree. Nodes compile to the Drive query syntax once and cache the
+    result. They are combined with `&`, `|` and `~`.
+    """
+    precedence = 4
+
+    def compile(self) -> str:
+        """
+        Returns the query string of the expression.
+        """
+        compiled = getattr(self, "_compiled", None)
+        if compiled is None:
+            compiled = self._compile()
+            self._compiled = compiled # pylint: disable=attribute-defined-outside-init
+        return compiled
+
+    @abc.abstractmethod
+    def _compile(self) -> str:
+        """
+        Returns the query string of the expression, see `compile`.
+        """
+
+    def _operand(self, operand: 'Expression') -> str:
+        compiled = operand.compile()
+        return f"({compiled})" if operand.precedence < self.precedence else compiled
+
+    def __str__(self) -> str:
+        return self.compile()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.compile()!r})"
+
+    def __len__(self) -> int:
+        return len(self.compile())
+
+    def __and__(self, other: typing.Union['Expression', str]) -> 'Expression':
+        return And(self, other)
+
+    def __or__(self, other: typing.Union['Expression', str]) -> 'Expression':
+        return Or(self, other)
+
+    def __invert__(self) -> 'Expression':
+        return Not(self)
+
+    def split(self, max_length: int) -> typing.List['Expression']:
+        """
+        Splits the expression into sub-expressions of at most `max_length` characters that together
+        match the same items, by distributing its largest `or` over the rest of the expression.
+        """
+        if len(self) <= max_length:
+            return [self]
+        return self._split(max_length)
+
+    def _split(self, max_length: int) -> typing.List['Expression']:
+        raise ValueError(f"Query can not be split into parts of {max_length} characters: {self.compile()[:100]}...")
+
+
+class Comparison(Expression):
+    """
+    Compares a field to a value, e.g. `name = 'report'` or `name contains 'report'`.
+    """
+    def __init__(self, field: typing.Union[QueryFields, str], operator: Operator, value: typing.Any) -> None:
+        self.field = _field_name(field)
+        self.operator = operator
+        self.value = value
+
+    def _compile(self) -> str:
+        return f"{self.field} {self.operator.value} {render_value(self.value)}"
+
+
+class Membership(Expression):
+    """
+    Checks if a value is in a collection field, e.g. `'<id>' in parents`.
+    """
+    def __init__(self, value: typing.Any, field: typing.Union[QueryFields, str]) -> None:
+        self.value = value
+        self.field = _field_name(field)
+
+    def _compile(self) -> str:
+        return f"{render_value(self.value)} {Operator.IN.value} {self.field}"
+
+
+class Text(Expression):
+    """
+    A query given as text that is used as is.
+    """
+    def __init__(self, text: str) -> None:
+        self.text = text.strip()
+
+    precedence = 0
+
+    def _compile(self) -> str:
+        return self.text
+
+    def _split(self, max_length: int) -> typing.List[Expression]:
+        expression = parse_query(self.text)
+        if isinstance(expression, Clause):
+            # A clause such as `properties has { ... }` has nothing to split.
+            return super()._split(max_length)
+        return expression.split(max_length)
+
+
+class Clause(Text):
+    """
+    A clause the parser keeps as is, e.g. `properties has { key='a' and value='b' }`.
+    """
+    precedence = 4
+
+
+class Not(Expression):
+    """
+    Negates an expression.
+    """
+    precedence = 3
+
+    def __init__(self, operand: typing.Union[Expression, str]) -> None:
+        self.operand = as_expression(operand)
+
+    def _compile(self) -> str:
+        return f"{Operator.NOT.value} {self._operand(self.operand)}"
+
+
+class _Junction(Expression):
+    operator = None
+
+    def __init__(self, *operands: typing.Union[Expression, str]) -> None:
+        self.operands = list()
+        for operand in operands:
+            operand = as_expression(operand)
+            if isinstance(operand, Query):
+                operand = operand.expression
+            if operand is None:
+                continue
+            # Nested junctions of the same kind are flattened, (a or b) or c is a or b or c.
+            self.operands.extend(operand.operands if isinstance(operand, type(self)) else [operand])
+
+    def _compile(self) -> str:
+        return f" {self.operator.value} ".join(self._operand(operand) for operand in self.operands)
+
+
+class Or(_Junction):
+    """
+    Matches items that match any of the operands.
+    """
+    precedence = 1
+    operator = Operator.OR
+
+    def _split(self, max_length: int) -> typing.List[Expression]:
+        separator = len(f" {self.operator.value} ")
+        parts, current, length = list(), list(), 0
+        for operand in self.operands:
+            for part in operand.split(max_length - 2 if operand.precedence < self.precedence else max_length):
+                part_length = len(self._operand(part))
+                if current and length + separator + part_length > max_length:
+                    parts.append(Or(*current))
+                    current, length = list(), 0
+                length += part_length + (separator if current else 0)
+                current.append(part)
+        if current:
+            parts.append(Or(*current))
+        return [part.operands[0] if len(part.operands) == 1 else part for part in parts]
+
+
+class And(_Junction):
+    """
+    Matches items that match all of the operands.
+    """
+    precedence = 2
+    operator = Operator.AND
+
+    def _split(self, max_length: int) -> typing.List[Expression]:
+        # The largest operand is split, every part keeps the other operands.
+        index = max(range(len(self.operands)), key=lambda position: len(self.operands[position]))
+        operand = self.operands[index]
+        budget = max_length - (len(self) - len(self._operand(operand)))
+        if operand.precedence < self.precedence:
+            budget -= 2
+        if budget <= 0:
+            return super()._split(max_length)
+        parts = [And(*self.operands[:index], part, *self.operands[index + 1:]) for part in operand.split(budget)]
+        if any(len(part) > max_length for part in parts):
+            return super()._split(max_length)
+        return parts
+
+
+def as_expression(query: typing.Union[Expression, str, None]) -> typing.Union[Expression, None]:
+    """
+    Returns a query as an expression, text is kept as is until it has to be split.
+    """
+    if query is None or isinstance(query, Expression):
+        return query
+    text = f"{query}".strip()
+    return Text(text) if text else None
+
+
+def any_in(values: typing.Iterable[typing.Any], field: typing.Union[QueryFields, str]) -> Or:
+    """
+    Matches items where any of the values is in the collection field, e.g. items in any of many parents.
+    Long disjunctions are split into several requests when listed.
+    """
+    return Or(*[Membership(value, field) for value in values])
+
+
+def any_of(field: typing.Union[QueryFields, str], operator: Operator, values: typing.Iterable[typing.Any]) -> Or:
+    """
+    Matches items where the field compares to any of the values, e.g. any of many names.
+    """
+    return Or(*[Comparison(field, operator, value) for value in values])
+
+
+class _Parser:
+    """
+    Builds an expression tree from query tokens. Tokens are `(kind, value)` pairs of kind `field`,
+    `operator`, `value`, `expression` or `paren`.
+    """
+    def __init__(self, tokens: list, query: str) -> None:
+        self.tokens = tokens
+        self.query = query
+        self.position = 0
+
+    def _peek(self) -> tuple:
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def _next(self, kind: str) -> typing.Any:
+        token_kind, token_value = self._peek()
+        if token_kind != kind:
+            raise ValueError(f"Expected a {kind} at {token_value!r} in query {self.query!r}.")
+        self.position += 1
+        return token_value
+
+    def parse(self) -> typing.Union[Expression, None]:
+        if not self.tokens:
+            return None
+        expression = self._or()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Unexpected {self._peek()[1]!r} in query {self.query!r}.")
+        return expression
+
+    def _or(self) -> Expression:
+        operands = [self._and()]
+        while self._peek() == ("operator", Operator.OR):
+            self.position += 1
+            operands.append(self._and())
+        return operands[0] if len(operands) == 1 else Or(*operands)
+
+    def _and(self) -> Expression:
+        operands = [self._not()]
+        while self._peek() == ("operator", Operator.AND):
+            self.position += 1
+            operands.append(self._not())
+        return operands[0] if len(operands) == 1 else And(*operands)
+
+    def _not(self) -> Expression:
+        kind, value = self._peek()
+        if (kind, value) == ("operator", Operator.NOT):
+            self.position += 1
+            return Not(self._not())
+        if (kind, value) == ("paren", "("):
+            self.position += 1
+            expression = self._or()
+            if self._next("paren") != ")":
+                raise ValueError(f"Expected ')' in query {self.query!r}.")
+            return expression
+        if kind == "expression":
+            self.position += 1
+            return value
+        if kind == "value":
+            value = self._next("value")
+            if self._next("operator") != Operator.IN:
+                raise ValueError(f"Expected 'in' after {value!r} in query {self.query!r}.")
+            return Membership(value, self._next("field"))
+        field = self._next("field")
+        operator = self._next("operator")
+        if operator in (Operator.AND, Operator.OR, Operator.NOT, Operator.IN):
+            raise ValueError(f"Expected a comparison after {field} in query {self.query!r}.")
+        return Comparison(field, operator, self._next("value"))
+
+
+@functools.lru_cache(maxsize=256)
+def parse_query(query: str) -> typing.Union[Expression, None]:
+    """
+    Parses a query string into an expression tree.
+    """
+    tokens = list()
+    for match in _TOKEN.finditer(query):
+        clause, string, paren, comparison, word, number, other = match.groups()
+        if other:
+            raise ValueError(f"Unexpected {other!r} in query {query!r}.")
+        if clause:
+            tokens.append(("expression", Clause(clause)))
+        elif string:
+            tokens.append(("value", re.sub(r"\\(.)", r"\1", string[1:-1])))
+        elif number:
+            tokens.append(("value", Literal(number)))
+        elif word in ("true", "false"):
+            tokens.append(("value", word == "true"))
+        elif word and word.lower() in _KEYWORDS:
+            tokens.append(("operator", _KEYWORDS[word.lower()]))
+        elif word:
+            tokens.append(("field", word))
+        elif paren:
+            tokens.append(("paren", paren))
+        else:
+            tokens.append(("operator", _COMPARISONS[comparison]))
+    return _Parser(tokens, query).parse()
+
+
 # pylint: disable=invalid-name
-class Query:
+class Query(Expression):
     """
-    Query builder class for the Drive API.
+    Query builder class for the Drive API. The builder records fields, operators and values and
+    compiles them into an expression tree in which `and` binds stronger than `or`.
+    Queries longer than `max_length` are split into several requests by `Drive.list_items`.
     """
-    def __init__(self) -> None:
+    max_length = 2000
+
+    def __init__(self, query: typing.Union[Expression, str] = None) -> None:
         self.data = list()
+        if query is not None:
+            self.GROUP(query)
+
+    def _append(self, kind: str, value: typing.Any) -> 'Query':
+        self.data.append((kind, value))
+        self._compiled = None # pylint: disable=attribute-defined-outside-init
+        self._expression = None # pylint: disable=attribute-defined-outside-init
+        return self
+
+    @property
+    def expression(self) -> typing.Union[Expression, None]:
+        """
+        Returns the expression tree of the query.
+        """
+        expression = getattr(self, "_expression", None)
+        if expression is None and self.data:
+            expression = _Parser(self.data, " ".join(f"{value}" for _, value in self.data)).parse()
+            self._expression = expression # pylint: disable=attribute-defined-outside-init
+        return expression
+
+    @property
+    def precedence(self) -> int:
+        expression = self.expression
+        return expression.precedence if expression is not None else 4
+
+    def _compile(self) -> str:
+        expression = self.expression
+        return expression.compile() if expression is not None else ""
+
+    def _split(self, max_length: int) -> typing.List[Expression]:
+        return self.expression.split(max_length)
 
     def FIELD(self, field: typing.Union[QueryFields, str]) -> 'Query':
         """
         The field name to be queried for
         """
-        self.data.append(f"{field}")
-        return self
+        return self._append("field", _field_name(field))
 
     @property
     def EQUALS(self) -> 'Query':
         """
         Operator equals (=)
         """
-        self.data.append(f"{Operator.EQUALS}")
-        return self
+        return self._append("operator", Operator.EQUALS)
 
     @property
     def NOT_EQUALS(self) -> 'Query':
         """
         Operator not equals (!=)
         """
-        self.data.append(f"{Operator.NOT_EQUALS}")
-        return self
+        return self._append("operator", Operator.NOT_EQUALS)
 
     @property
     def CONTAINS(self) -> 'Query':
         """
         Operators contains (is in)
         """
-        self.data.append(f"{Operator.CONTAINS}")
-        return self
+        return self._append("operator", Operator.CONTAINS)
 
     @property
     def NOT(self) -> 'Query':
         """
         Operator not (!)
         """
-        self.data.append(f"{Operator.NOT}")
-        return self
+        return self._append("operator", Operator.NOT)
 
     @property
     def IN(self) -> 'Query':
         """
         Operator in (inside of)
         """
-        self.data.append(f"{Operator.IN}")
-        return self
+        return self._append("operator", Operator.IN)
 
     @property
     def AND(self) -> 'Query':
         """
         Operator and (&&)
         """
-        self.data.append(f"{Operator.AND}")
-        return self
+        return self._append("operator", Operator.AND)
 
     @property
     def OR(self) -> 'Query':
         """
         Operator or (||)
         """
-        self.data.append(f"{Operator.OR}")
-        return self
+        return self._append("operator", Operator.OR)
 
     @property
     def HAS(self) -> 'Query':
         """
         Operator has (has a value)
         """
-        self.data.append(f"{Operator.HAS}")
-        return self
+        return self._append("operator", Operator.HAS)
 
     @property
     def LESS_THAN(self) -> 'Query':
         """
         Operator less than (<)
         """
-        self.data.append(f"{Operator.LESS_THAN}")
-        return self
+        return self._append("operator", Operator.LESS_THAN)
 
     @property
     def LESS_THAN_EQUALS(self) -> 'Query':
         """
         Operator less than or equals (<=)
         """
-        self.data.append(f"{Operator.LESS_THAN_EQUALS}")
-        return self
+        return self._append("operator", Operator.LESS_THAN_EQUALS)
 
     @property
     def GREATER_THAN(self) -> 'Query':
         """
         Operator greater than (>)
         """
-        self.data.append(f"{Operator.GREATER_THAN}")
-        return self
+        return self._append("operator", Operator.GREATER_THAN)
 
     @property
     def GREATER_THAN_EQUALS(self) -> 'Query':
         """
         Operator greater than or equals (>=)
         """
-        self.data.append(f"{Operator.GREATER_THAN_EQUALS}")
-        return self
+        return self._append("operator", Operator.GREATER_THAN_EQUALS)
 
-    def VALUE(self, value: typing.Union[str, int, float, datetime.datetime, MimeType]) -> 'Query':
+    def VALUE(self, value: typing.Union[str, int, float, bool, datetime.datetime, MimeType]) -> 'Query':
         """
-        The value to search for
+        The value to search for, strings are escaped
         """
         if isinstance(value, datetime.datetime):
             warnings.warn("Timezone for Datetime objects should be in UTC",
                           UserWarning, stacklevel=2)
-            value = value.strftime("%Y-%m-%dT%H:%M:%S")
-        if isinstance(value, bool):
-            value = str(value).lower()
-        self.data.append(f"'{value}'")
-        return self
+        return self._append("value", value)
 
-    def __str__(self) -> str:
+    def GROUP(self, query: typing.Union[Expression, str]) -> 'Query':
         """
-        Returns the query as a string.
+        A nested query or expression, which is parenthesized when needed
         """
-        return ''.join(self._lines()).strip()
-
-    def _lines(self) -> typing.Generator[str, None, None]:
-        for item in self.data:
-            if not item:
-                continue
-            yield " " + item
+        expression = as_expression(query)
+        if isinstance(expression, Query):
+            expression = expression.expression
+        if expression is None:
+            return self
+        return self._append("expression", expression)
@@ -0,0 +1,238 @@
+"""
+This module contains the one-way sync of local directories into Drive folders.
+"""
+import json
+import mimetypes
+import os
+import threading
+import time
+import typing
+
+from gutils.creds.locking import atomic_write, is_private_dir, owned, private_dir, user_cache_dir
+from gutils.services.drive.v3.drive import Drive
+from gutils.services.drive.v3.helpers import md5_checksum
+from gutils.services.drive.v3.paths import FolderPathResolver
+from gutils.services.enums import MimeType
+
+
+class LocalHashCache:
+    """
+    Remembers the MD5 checksum of local files by path, size and modification time, so unchanged
+    files are not read again to be compared. A cached checksum decides whether a file is uploaded,
+    so the cache is only read from a private directory and a file owned by the current user.
+    """
+    _default_cache_file = user_cache_dir("drive/hashes.json")
+
+    def __init__(self, cache_file: str = None) -> None:
+        self.cache_file = cache_file if cache_file else self._default_cache_file
+        self._hashes = None
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def _load(self) -> dict:
+        if self._hashes is None:
+            self._hashes = dict()
+            if not is_private_dir(os.path.dirname(os.path.abspath(self.cache_file))) or not owned(self.cache_file):
+                return self._hashes
+            try:
+                with open(self.cache_file, "r") as cache_file:
+                    self._hashes = json.load(cache_file)
+            except (OSError, ValueError):
+                self._hashes = dict()
+        return self._hashes
+
+    def md5(self, path: str) -> str:
+        """
+        Returns the MD5 checksum of a file, reading it only when it changed since it was last hashed.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._load().get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        checksum = md5_checksum(path)
+        with self._lock:
+            self._load()[path] = [stat.st_size, stat.st_mtime_ns, checksum]
+            self._dirty = True
+        return checksum
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                private_dir(os.path.dirname(os.path.abspath(self.cache_file)))
+                atomic_write(self.cache_file, json.dumps(self._hashes))
+                self._dirty = False
+            except OSError:
+                pass
+
+
+class SyncResult:
+    """
+    The outcome of syncing one file. `status` is one of `uploaded`, `updated`, `skipped` or `failed`.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, path: str, status: str, file_id: str = None, size: int = 0,
+                 error: Exception = None, reason: str = None) -> None:
+        self.path = path
+        self.status = status
+        self.file_id = file_id
+        self.size = size
+        self.error = error
+        self.reason = reason
+
+    def __repr__(self) -> str:
+        return f"SyncResult(path={self.path!r}, status={self.status!r}, file_id={self.file_id!r})"
+
+
+class SyncReport:
+    """
+    Per file results and totals of a directory sync.
+    """
+    def __init__(self, results: typing.List[SyncResult], seconds: float) -> None:
+        self.results = results
+        self.seconds = seconds
+
+    def _with_status(self, status: str) -> typing.List[SyncResult]:
+        return [result for result in self.results if result.status == status]
+
+    @property
+    def uploaded(self) -> typing.List[SyncResult]:
+        return self._with_status("uploaded")
+
+    @property
+    def updated(self) -> typing.List[SyncResult]:
+        return self._with_status("updated")
+
+    @property
+    def skipped(self) -> typing.List[SyncResult]:
+        return self._with_status("skipped")
+
+    @property
+    def failed(self) -> typing.List[SyncResult]:
+        return self._with_status("failed")
+
+    @property
+    def total_bytes(self) -> int:
+        """
+        Bytes sent to Drive by uploads and updates.
+        """
+        return sum(result.size for result in self.uploaded + self.updated)
+
+    def __repr__(self) -> str:
+        return (f"SyncReport(uploaded={len(self.uploaded)}, updated={len(self.updated)}, skipped={len(self.skipped)}, "
+                f"failed={len(self.failed)}, bytes={self.total_bytes}, seconds={self.seconds:.2f})")
+
+
+# pylint: disable=line-too-long
+class DirectorySync:
+    """
+    Mirrors a local directory into a Drive folder. The remote tree is read with one concurrent
+    crawl, then every local file is compared to the remote file at the same path by size and MD5
+    checksum and uploaded, updated in place or skipped. Local checksums are cached by size and
+    modification time, so syncing an unchanged tree costs a metadata pass and no reads or uploads.
+    Existing folders are reused and missing ones created once. Nothing is deleted in Drive.
+
+    report = DirectorySync(drive, max_workers=8).sync("exports", folder_id)
+    """
+    remote_fields = "id, name, mimeType, md5Checksum, size"
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, drive: Drive, max_workers: int = 4, chunk_size: int = None,
+                 hash_cache: LocalHashCache = None, crawl_workers: int = 16) -> None:
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1. {max_workers} was provided.")
+        self.drive = drive
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.hash_cache = hash_cache if hash_cache else LocalHashCache()
+        self.crawl_workers = crawl_workers
+
+    def _remote_tree(self, folder_id: str, resolver: FolderPathResolver) -> typing.Dict[str, dict]:
+        """
+        Returns the remote files below the folder by relative path and caches the IDs of its folders.
+        """
+        files = dict()
+        folder_ids = {"": folder_id}
+        for path, file_ in self.drive.walk(folder_id, fields=self.remote_fields, max_workers=self.crawl_workers):
+            if file_.get("mimeType") == MimeType.APPLICATION_GDRIVE_FOLDER.value:
+                parent_path, _, name = path.rpartition("/")
+                if parent_path in folder_ids:
+                    resolver.remember(folder_ids[parent_path], name, file_.get("id"))
+                folder_ids.setdefault(path, file_.get("id"))
+            else:
+                # Drive allows several files of the same name, the first one found is synced.
+                files.setdefault(path, file_)
+        return files
+
+    @staticmethod
+    def _local_files(local_dir: str) -> typing.Generator[typing.Tuple[str, str], None, None]:
+        for directory, _, filenames in os.walk(local_dir):
+            for filename in sorted(filenames):
+                path = os.path.join(directory, filename)
+                if os.path.isfile(path):
+                    yield os.path.relpath(path, local_dir).replace(os.sep, "/"), path
+
+    def plan(self, local_dir: str, remote: typing.Dict[str, dict]) -> typing.Tuple[typing.List[SyncResult], typing.List[typing.Tuple[str, str, typing.Union[dict, None]]]]:
+        """
+        Compares the local files to the remote ones. Returns the skipped files and the
+        `(relative_path, local_path, remote_file)` of every file to upload or update.
+        """
+        skipped, transfers = list(), list()
+        for relative_path, path in self._local_files(local_dir):
+            remote_file = remote.get(relative_path)
+            if remote_file is None:
+                transfers.append((relative_path, path, None))
+                continue
+            if remote_file.get("mimeType", "").startswith(self.drive.google_apps_mime_type_prefix):
+                skipped.append(SyncResult(relative_path, "skipped", remote_file.get("id"),
+                                          reason=f"remote file is a Google Workspace file of type {remote_file.get('mimeType')}"))
+                continue
+            size = os.path.getsize(path)
+            if (remote_file.get("size") is not None and int(remote_file.get("size")) == size
+                    and remote_file.get("md5Checksum") == self.hash_cache.md5(path)):
+                skipped.append(SyncResult(relative_path, "skipped", remote_file.get("id"), reason="up to date"))
+            else:
+                transfers.append((relative_path, path, remote_file))
+        return skipped, transfers
+
+    def sync(self, local_dir: str, folder_id: str,
+             progress: typing.Callable[[str, int, int], None] = None) -> SyncReport:
+        """
+        Syncs the local directory into the Drive folder and returns a report of every file.
+        Failures are reported per file instead of being raised.
+        """
+        started = time.perf_counter()
+        resolver = FolderPathResolver(self.drive, ttl=float("inf"), root_id=folder_id)
+        remote = self._remote_tree(folder_id, resolver)
+        results, transfers = self.plan(local_dir, remote)
+        self.hash_cache.save()
+
+        uploads, pending = list(), list()
+        for relative_path, path, remote_file in transfers:
+            directory, _, name = relative_path.rpartition("/")
+            mime_type = mimetypes.guess_type(name)[0] or MimeType.APPLICATION_BINARY.value
+            upload = dict(filename=path, title=name, input_mime_type=mime_type, upload_mime_type=mime_type,
+                          fields="id, name, md5Checksum, size")
+            if remote_file is not None:
+                upload["file_id"] = remote_file.get("id")
+            else:
+                try:
+                    upload["parent_folder_id"] = resolver.ensure(directory)[-1]["id"] if directory else folder_id
+                except Exception as exception: # pylint: disable=broad-except
+                    results.append(SyncResult(relative_path, "failed", error=exception))
+                    continue
+            uploads.append(upload)
+            pending.append((relative_path, path, remote_file))
+
+        responses = self.drive.upload_many(uploads, max_workers=self.max_workers, chunk_size=self.chunk_size,
+                                           progress=progress, return_exceptions=True)
+        for (relative_path, path, remote_file), response in zip(pending, responses):
+            if isinstance(response, Exception):
+                results.append(SyncResult(relative_path, "failed", remote_file.get("id") if remote_file else None, error=response))
+            else:
+                results.append(SyncResult(relative_path, "updated" if remote_file else "uploaded",
+                                          response.get("id"), size=os.path.getsize(path)))
+        return SyncReport(results, time.perf_counter() - started)
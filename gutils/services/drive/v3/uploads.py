@@ -0,0 +1,79 @@
+"""
+This module persists resumable upload sessions so that uploads survive process restarts.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import time
+import typing
+
+from gutils.creds.locking import atomic_write, is_private_dir, owned, private_dir, user_cache_dir
+
+
+# pylint: disable=line-too-long
+class UploadSessionStore:
+    """
+    Keeps the session URI of unfinished resumable uploads on disk, keyed by the local file and the
+    metadata of the Drive file it is uploaded to. A new upload of the same, unmodified file resumes
+    from the bytes the server already received. Drive keeps upload sessions for about a week, older
+    entries are ignored.
+    The next chunk of an upload is sent to its session URI with the user's credentials, so sessions
+    are kept in a private directory of the current user and files owned by other users are ignored.
+    """
+    _default_cache_dir = user_cache_dir("drive/uploads")
+
+    def __init__(self, cache_dir: str = None, max_age: float = 6 * 24 * 60 * 60) -> None:
+        self.cache_dir = cache_dir if cache_dir else self._default_cache_dir
+        self.max_age = max_age
+
+    @staticmethod
+    def key(filename: str, meta_body: dict) -> str:
+        """
+        Returns the key of an upload, which changes when the local file is modified.
+        """
+        stat = os.stat(filename)
+        identity = [os.path.abspath(filename), stat.st_size, stat.st_mtime_ns, meta_body]
+        return hashlib.sha256(json.dumps(identity, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> typing.Union[str, None]:
+        """
+        Returns the session URI of an unfinished upload or None.
+        """
+        path = self._path(key)
+        if not is_private_dir(self.cache_dir) or not owned(path):
+            return None
+        try:
+            with open(path, "r") as session_file:
+                session = json.load(session_file)
+        except (OSError, ValueError):
+            return None
+        if time.time() - session.get("created", 0) > self.max_age:
+            self.remove(key)
+            return None
+        return session.get("uri")
+
+    def put(self, key: str, uri: str) -> None:
+        try:
+            private_dir(self.cache_dir)
+            atomic_write(self._path(key), json.dumps({"uri": uri, "created": time.time()}))
+        except OSError:
+            pass
+
+    def remove(self, key: str) -> None:
+        with contextlib.suppress(OSError):
+            os.remove(self._path(key))
+
+    def clear(self) -> None:
+        """
+        Removes all stored sessions.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+        for content in os.scandir(self.cache_dir):
+            if content.is_file() and content.name.endswith(".json"):
+                with contextlib.suppress(OSError):
+                    os.remove(content.path)
@@ -0,0 +1,161 @@
+"""
+This module contains the instrumentation hooks every request of a client passes through.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+import typing
+
+
+# pylint: disable=too-many-instance-attributes
+class RequestEvent:
+    """
+    Measurements of one executed request, or of the model built from its response when `kind` is `model`.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, method_id: str, http_method: str = None, kind: str = "request") -> None:
+        self.kind = kind
+        self.method_id = method_id or "unknown"
+        self.http_method = http_method
+        self.status = None
+        self.latency = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retries = 0
+        self.model_seconds = 0.0
+        self.error = None
+
+    def __repr__(self) -> str:
+        return f"RequestEvent({', '.join(f'{k}={v!r}' for k, v in self.__dict__.items())})"
+
+
+class Instrumentation:
+    """
+    Dispatches request events to the registered sinks. A sink is any callable taking a `RequestEvent`.
+    Nothing is measured while no sink is registered.
+    """
+    def __init__(self, sinks: typing.Iterable[typing.Callable] = None) -> None:
+        self.sinks = list(sinks or [])
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sinks)
+
+    def add_sink(self, sink: typing.Callable[[RequestEvent], None]) -> None:
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink: typing.Callable[[RequestEvent], None]) -> None:
+        self.sinks.remove(sink)
+
+    def emit(self, event: RequestEvent) -> None:
+        for sink in self.sinks:
+            sink(event)
+
+
+# The last request executed by the current thread or task, used to attribute model construction time.
+_last_request: contextvars.ContextVar = contextvars.ContextVar("gutils_last_request", default=None)
+
+
+def set_last_request(instrumentation: Instrumentation, method_id: str) -> None:
+    _last_request.set((instrumentation, method_id))
+
+
+def build_model(model: typing.Callable, response: dict) -> typing.Any:
+    """
+    Builds a pydantic model from a response and reports the construction time against the
+    request that returned it.
+    """
+    last_request = _last_request.get()
+    if last_request is None:
+        return model(**response)
+    started = time.perf_counter()
+    result = model(**response)
+    instrumentation, method_id = last_request
+    event = RequestEvent(method_id, kind="model")
+    event.model_seconds = time.perf_counter() - started
+    _last_request.set(None)
+    instrumentation.emit(event)
+    return result
+
+
+class HistogramCollector:
+    """
+    In memory sink that keeps latency histograms and totals per method.
+    """
+    default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, buckets: typing.Iterable[float] = None) -> None:
+        self.buckets = tuple(sorted(buckets)) if buckets else self.default_buckets
+        self._lock = threading.Lock()
+        self._methods = dict()
+
+    def __call__(self, event: RequestEvent) -> None:
+        with self._lock:
+            stats = self._methods.get(event.method_id)
+            if stats is None:
+                stats = self._methods[event.method_id] = {
+                    "count": 0, "errors": 0, "retries": 0, "latency_seconds": 0.0,
+                    "request_bytes": 0, "response_bytes": 0, "model_seconds": 0.0,
+                    "statuses": dict(), "histogram": [0] * (len(self.buckets) + 1),
+                }
+            if event.kind == "model":
+                stats["model_seconds"] += event.model_seconds
+                return
+            stats["count"] += 1
+            stats["errors"] += 1 if event.error else 0
+            stats["retries"] += event.retries
+            stats["latency_seconds"] += event.latency
+            stats["request_bytes"] += event.request_bytes
+            stats["response_bytes"] += event.response_bytes
+            stats["statuses"][event.status] = stats["statuses"].get(event.status, 0) + 1
+            stats["histogram"][bisect.bisect_left(self.buckets, event.latency)] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Returns a copy of the collected statistics per method. Histogram counts line up with
+        `buckets`, the last count holds the requests slower than the last bucket.
+        """
+        with self._lock:
+            return {method_id: {**stats, "statuses": dict(stats["statuses"]), "histogram": list(stats["histogram"])}
+                    for method_id, stats in self._methods.items()}
+
+    def percentile(self, method_id: str, percentile: float) -> typing.Union[float, None]:
+        """
+        Returns the upper bucket bound of the given latency percentile of a method.
+        """
+        with self._lock:
+            stats = self._methods.get(method_id)
+            if not stats or not stats["count"]:
+                return None
+            rank = stats["count"] * percentile / 100
+            seen = 0
+            for index, count in enumerate(stats["histogram"]):
+                seen += count
+                if seen >= rank:
+                    return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods.clear()
+
+
+class LoggingSink:
+    """
+    Sink that writes every event to a logger.
+    """
+    def __init__(self, logger: logging.Logger = None, level: int = logging.DEBUG) -> None:
+        self.logger = logger if logger else logging.getLogger("gutils.requests")
+        self.level = level
+
+    def __call__(self, event: RequestEvent) -> None:
+        if not self.logger.isEnabledFor(self.level):
+            return
+        if event.kind == "model":
+            self.logger.log(self.level, "%s model=%.2fms", event.method_id, event.model_seconds * 1000)
+            return
+        self.logger.log(self.level, "%s %s status=%s latency=%.2fms retries=%d sent=%dB received=%dB%s",
+                        event.http_method, event.method_id, event.status, event.latency * 1000, event.retries,
+                        event.request_bytes, event.response_bytes, f" error={event.error}" if event.error else "")
@@ -0,0 +1,114 @@
+"""
+This module contains the client side rate limiter that keeps requests within the API quotas.
+"""
+import threading
+import time
+import typing
+
+
+# pylint: disable=line-too-long
+class TokenBucket:
+    """
+    A thread safe token bucket. Reservations may overdraw the bucket, in which case callers
+    wait in the order they reserved.
+    """
+    def __init__(self, rate: float, capacity: float) -> None:
+        if rate <= 0 or capacity < 1:
+            raise ValueError(f"Token bucket requires a positive rate and a capacity of at least 1. {rate}, {capacity} was provided.")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Takes tokens from the bucket and returns the seconds to wait before they are available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Blocks until the tokens are available and returns the time waited.
+        """
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """
+        Waits without blocking the event loop until the tokens are available.
+        """
+        delay = self.reserve(tokens)
+        if delay:
+            # pylint: disable=import-outside-toplevel
+            import asyncio
+            await asyncio.sleep(delay)
+        return delay
+
+
+class RateLimiter:
+    """
+    Separate read and write token buckets per API, shared by every resource created from a client.
+    Limits are given in requests per minute. The bucket capacity and refill rate are derived so that
+    no rolling minute ever exceeds the limit, which keeps sustained throughput just under the quota.
+    """
+    default_limits = {
+        "sheets": {"read": 60, "write": 60},
+        "drive": {"read": 12000, "write": 180},
+    }
+    read_methods = frozenset([
+        "sheets.spreadsheets.getByDataFilter",
+        "sheets.spreadsheets.developerMetadata.search",
+        "sheets.spreadsheets.values.batchGetByDataFilter",
+    ])
+
+    def __init__(self, limits: dict = None, burst_ratio: float = 0.1) -> None:
+        self.limits = {api: dict(kinds) for api, kinds in self.default_limits.items()}
+        for api, kinds in (limits or {}).items():
+            self.limits.setdefault(api, dict()).update(kinds)
+        self.burst_ratio = burst_ratio
+        self._buckets = dict()
+        self._lock = threading.Lock()
+
+    def kind(self, method_id: str, http_method: str) -> str:
+        """
+        Classifies a request as a `read` or a `write`.
+        """
+        return "read" if http_method == "GET" or method_id in self.read_methods else "write"
+
+    def bucket(self, method_id: str, http_method: str) -> typing.Union[TokenBucket, None]:
+        """
+        Returns the bucket a request draws from or None when its API is not limited.
+        """
+        api = (method_id or "").split(".")[0]
+        key = (api, self.kind(method_id, http_method))
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            limit = self.limits.get(api, {}).get(key[1])
+            if not limit:
+                return None
+            with self._lock:
+                capacity = max(1.0, limit * self.burst_ratio)
+                bucket = self._buckets.setdefault(key, TokenBucket(rate=max(limit - capacity, 1.0) / 60, capacity=capacity))
+        return bucket
+
+    def acquire(self, method_id: str, http_method: str) -> float:
+        """
+        Blocks until the request may be sent and returns the time waited.
+        """
+        bucket = self.bucket(method_id, http_method)
+        return bucket.acquire() if bucket else 0.0
+
+    async def acquire_async(self, method_id: str, http_method: str) -> float:
+        """
+        Waits without blocking the event loop until the request may be sent.
+        """
+        bucket = self.bucket(method_id, http_method)
+        return await bucket.acquire_async() if bucket else 0.0
@@ -0,0 +1,200 @@
+"""
+This module contains the retry policy applied to every request executed through a client.
+"""
+import email.utils
+import json
+import random
+import socket
+import sys
+import threading
+import time
+import typing
+
+from googleapiclient.errors import HttpError
+
+
+class RetryMetrics:
+    """
+    Thread safe counters of the retries performed by a `RetryPolicy`.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._methods = dict()
+
+    def record(self, method_id: str, retried: bool = False, backoff: float = 0.0, gave_up: bool = False) -> None:
+        """
+        Records a single attempt of a method.
+        """
+        with self._lock:
+            counters = self._methods.setdefault(method_id or "unknown",
+                                                {"attempts": 0, "retries": 0, "backoff_seconds": 0.0, "failures": 0})
+            counters["attempts"] += 1
+            counters["retries"] += 1 if retried else 0
+            counters["backoff_seconds"] += backoff
+            counters["failures"] += 1 if gave_up else 0
+
+    def snapshot(self) -> dict:
+        """
+        Returns the totals and the per method counters.
+        """
+        with self._lock:
+            methods = {name: dict(counters) for name, counters in self._methods.items()}
+        totals = {"attempts": 0, "retries": 0, "backoff_seconds": 0.0, "failures": 0}
+        for counters in methods.values():
+            for key in totals:
+                totals[key] += counters[key]
+        return {**totals, "methods": methods}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods.clear()
+
+
+def _is_loaded_transport_error(exception: Exception) -> bool:
+    """
+    Checks for `httplib2` and `asyncio` transport errors without importing either module, since
+    their errors can only be raised once they were loaded.
+    """
+    httplib2 = sys.modules.get("httplib2")
+    if httplib2 is not None and isinstance(exception, httplib2.HttpLib2Error):
+        return True
+    asyncio = sys.modules.get("asyncio")
+    return asyncio is not None and isinstance(exception, asyncio.TimeoutError)
+
+
+# pylint: disable=too-many-instance-attributes
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter that honors `Retry-After` and gives up after a total deadline.
+    Methods that are not idempotent, e.g. `Values.append`, are only retried when the server rejected
+    the request without applying it, i.e. on 429 responses.
+    """
+    retry_statuses = frozenset([429, 500, 502, 503, 504])
+    rate_limit_reasons = frozenset(["rateLimitExceeded", "userRateLimitExceeded"])
+    transport_errors = (socket.timeout, ConnectionError)
+    non_idempotent_methods = frozenset([
+        "drive.drives.create",
+        "drive.files.copy",
+        "drive.files.create",
+        "drive.permissions.create",
+        "sheets.spreadsheets.batchUpdate",
+        "sheets.spreadsheets.create",
+        "sheets.spreadsheets.sheets.copyTo",
+        "sheets.spreadsheets.values.append",
+    ])
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, max_attempts: int = 5, initial_backoff: float = 1.0, max_backoff: float = 32.0,
+                 multiplier: float = 2.0, deadline: float = 120.0,
+                 non_idempotent_methods: typing.Iterable[str] = None) -> None:
+        if max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1. {max_attempts} was provided.")
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.multiplier = multiplier
+        self.deadline = deadline
+        if non_idempotent_methods is not None:
+            self.non_idempotent_methods = frozenset(non_idempotent_methods)
+        self.metrics = RetryMetrics()
+
+    def is_idempotent(self, method_id: str) -> bool:
+        return method_id not in self.non_idempotent_methods
+
+    @staticmethod
+    def parse_retry_after(value: typing.Union[str, None]) -> typing.Union[float, None]:
+        """
+        Parses a `Retry-After` header given either in seconds or as an HTTP date.
+        """
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    def _status(self, exception: HttpError) -> int:
+        """
+        Returns the status of an error, treating rate limited 403 responses as 429.
+        """
+        status = exception.resp.status
+        if status == 403:
+            try:
+                errors = json.loads(exception.content).get("error", {}).get("errors", [])
+            except (ValueError, AttributeError):
+                errors = list()
+            if any(error.get("reason") in self.rate_limit_reasons for error in errors):
+                return 429
+        return status
+
+    def next_delay(self, exception: Exception, method_id: str, attempt: int, started: float,
+                   idempotent: bool = None) -> typing.Union[float, None]:
+        """
+        Returns the seconds to wait before the next attempt or None when the error should be raised.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        idempotent = self.is_idempotent(method_id) if idempotent is None else idempotent
+        retry_after = None
+        if isinstance(exception, HttpError):
+            status = self._status(exception)
+            if status not in self.retry_statuses or (status != 429 and not idempotent):
+                return None
+            retry_after = self.parse_retry_after(exception.resp.get("retry-after"))
+        elif not (isinstance(exception, self.transport_errors) or _is_loaded_transport_error(exception)) or not idempotent:
+            return None
+        delay = random.uniform(0, min(self.max_backoff, self.initial_backoff * self.multiplier ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if time.monotonic() - started + delay > self.deadline:
+            return None
+        return delay
+
+    def call(self, func: typing.Callable, method_id: str = None, idempotent: bool = None) -> typing.Any:
+        """
+        Calls `func` until it succeeds or the policy gives up.
+        """
+        started = time.monotonic()
+        attempt = 1
+        backoff = 0.0
+        while True:
+            try:
+                result = func()
+            except Exception as exception:
+                delay = self.next_delay(exception, method_id, attempt, started, idempotent)
+                self.metrics.record(method_id, retried=attempt > 1, backoff=backoff, gave_up=delay is None)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt, backoff = attempt + 1, delay
+                continue
+            self.metrics.record(method_id, retried=attempt > 1, backoff=backoff)
+            return result
+
+    async def call_async(self, func: typing.Callable[[], typing.Awaitable], method_id: str = None,
+                         idempotent: bool = None) -> typing.Any:
+        """
+        Awaits `func()` until it succeeds or the policy gives up.
+        """
+        started = time.monotonic()
+        attempt = 1
+        backoff = 0.0
+        while True:
+            try:
+                result = await func()
+            except Exception as exception:
+                delay = self.next_delay(exception, method_id, attempt, started, idempotent)
+                self.metrics.record(method_id, retried=attempt > 1, backoff=backoff, gave_up=delay is None)
+                if delay is None:
+                    raise
+                # pylint: disable=import-outside-toplevel
+                import asyncio
+                await asyncio.sleep(delay)
+                attempt, backoff = attempt + 1, delay
+                continue
+            self.metrics.record(method_id, retried=attempt > 1, backoff=backoff)
+            return result
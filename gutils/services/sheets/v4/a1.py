@@ -0,0 +1,51 @@
+"""
+Helpers to build ranges in A1 notation.
+"""
+import typing
+
+
+def quote_sheet_name(sheet_name: str) -> str:
+    """
+    Quotes a sheet name for use in a range, e.g. `My Sheet` becomes `'My Sheet'`.
+    """
+    return "'" + sheet_name.replace("'", "''") + "'"
+
+
+def column_letter(index: int) -> str:
+    """
+    Returns the letters of a column from its 1-based index, e.g. 28 becomes `AB`.
+    """
+    if index < 1:
+        raise ValueError(f"Column index must be at least 1. {index} was provided.")
+    letters = ""
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def column_index(letters: str) -> int:
+    """
+    Returns the 1-based index of a column from its letters, e.g. `AB` becomes 28.
+    """
+    if not letters or not letters.isalpha():
+        raise ValueError(f"{letters!r} is not a column.")
+    index = 0
+    for letter in letters.upper():
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index
+
+
+def a1_range(sheet_name: str, first_row: int = None, last_row: int = None,
+             first_column: typing.Union[int, str] = None, last_column: typing.Union[int, str] = None) -> str:
+    """
+    Returns the A1 notation of a range of a sheet. Rows are 1-based, columns are 1-based indexes
+    or letters. Without columns the range spans all columns, e.g. `'Sheet1'!1:1000`.
+    """
+    first_column = column_letter(first_column) if isinstance(first_column, int) else first_column or ""
+    last_column = column_letter(last_column) if isinstance(last_column, int) else last_column or ""
+    start = f"{first_column}{first_row if first_row is not None else ''}"
+    end = f"{last_column}{last_row if last_row is not None else ''}"
+    if not start and not end:
+        return quote_sheet_name(sheet_name)
+    return f"{quote_sheet_name(sheet_name)}!{start}:{end}"
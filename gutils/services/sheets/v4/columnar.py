@@ -0,0 +1,219 @@
+"""
+Conversion of sheet values to NumPy arrays, Arrow tables and pandas DataFrames, and of DataFrames
+back to a `ValueRange`. Requires the optional `numpy`, `pyarrow` and `pandas` dependencies,
+`pip install gutils-python[dataframe]`.
+
+Columns are typed from the values of their cells, which is exact for values read with
+`ValueRenderOption.UNFORMATTED_VALUE`: numbers become `int64` or `float64`, booleans `bool` and
+text `str`. Dates read with `DateTimeRenderOption.SERIAL_NUMBER` are numbers, the columns listed
+in `date_columns` are converted to `datetime64[ms]`. Empty cells are missing values.
+"""
+import importlib
+import typing
+
+from gutils.services.sheets.v4.a1 import column_letter
+from gutils.services.sheets.v4.objects.others import ValueRange
+
+if typing.TYPE_CHECKING:
+    import numpy
+    import pandas
+    import pyarrow
+
+# Sheets counts dates in days since 1899-12-30.
+SERIAL_EPOCH = "1899-12-30"
+_MILLISECONDS_PER_DAY = 86400000
+
+
+def _require(name: str) -> typing.Any:
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        raise ImportError(f"Converting sheet values requires `{name}`. Install it with `pip install gutils-python[dataframe]`") from None
+
+
+def serial_to_datetime(serials: typing.Any) -> 'numpy.ndarray':
+    """
+    Converts Sheets serial numbers to `datetime64[ms]`, to the nearest millisecond. NaN becomes NaT.
+    """
+    np = _require("numpy")
+    milliseconds = np.rint(np.asarray(serials, dtype="float64") * _MILLISECONDS_PER_DAY)
+    missing = np.isnan(milliseconds)
+    result = np.datetime64(SERIAL_EPOCH, "ms") + np.where(missing, 0, milliseconds).astype("int64").astype("timedelta64[ms]")
+    result[missing] = np.datetime64("NaT")
+    return result
+
+
+def datetime_to_serial(datetimes: typing.Any) -> 'numpy.ndarray':
+    """
+    Converts `datetime64` values to Sheets serial numbers. NaT becomes NaN.
+    """
+    np = _require("numpy")
+    datetimes = np.asarray(datetimes, dtype="datetime64[ms]")
+    return (datetimes - np.datetime64(SERIAL_EPOCH, "ms")) / np.timedelta64(1, "D")
+
+
+def _values(values: typing.Union[ValueRange, typing.List[list]]) -> typing.List[list]:
+    return values.values if isinstance(values, ValueRange) else values
+
+
+def _column_names(header: list, width: int) -> typing.List[str]:
+    """
+    Names columns after the header row. Columns without a name are named after their letter,
+    repeated names get a `.1`, `.2`, ... suffix.
+    """
+    names, seen = list(), dict()
+    for index in range(width):
+        name = header[index] if index < len(header) else None
+        name = column_letter(index + 1) if name is None or name == "" else str(name)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _grid(values: typing.List[list], header: bool) -> typing.Tuple[typing.List[str], 'numpy.ndarray']:
+    """
+    Returns the column names and the rows as a 2D object array padded with `None`.
+    """
+    np = _require("numpy")
+    names, rows = (values[0] if values else list(), values[1:]) if header else (list(), values)
+    lengths = np.fromiter(map(len, rows), dtype="int64", count=len(rows))
+    width = max(int(lengths.max()) if len(rows) else 0, len(names))
+    grid = np.full((len(rows), width), None, dtype=object)
+    # Sheets leaves out trailing empty cells, rows are copied in groups of the same length so short
+    # rows are padded without building a padded copy of each.
+    for length in np.unique(lengths):
+        if length:
+            indexes = np.flatnonzero(lengths == length)
+            grid[indexes, :length] = rows if len(indexes) == len(rows) else [rows[index] for index in indexes]
+    return _column_names(names, width), grid
+
+
+def _parse(column: 'numpy.ndarray', as_date: bool) -> typing.Tuple[str, 'numpy.ndarray', 'numpy.ndarray']:
+    """
+    Returns the kind, the typed data and the missing value mask of a column of the grid.
+    The kind is one of `int`, `float`, `bool`, `datetime`, `str`, `object` or `empty`.
+    """
+    np = _require("numpy")
+    missing = (column == None) | (column == "") # pylint: disable=singleton-comparison
+    present = column[~missing]
+    kinds = set(map(type, present))
+    if not kinds:
+        return "empty", column, missing
+    if kinds <= {int, float}:
+        if as_date:
+            data = np.full(len(column), np.nan)
+            data[~missing] = present.astype("float64")
+            return "datetime", serial_to_datetime(data), missing
+        if kinds == {int} and not missing.any():
+            return "int", column.astype("int64"), missing
+        data = np.full(len(column), np.nan)
+        data[~missing] = present.astype("float64")
+        return "float", data, missing
+    data = column.copy()
+    data[missing] = None
+    if kinds == {bool}:
+        return "bool", np.where(missing, False, data).astype(bool), missing
+    return ("str" if kinds == {str} else "object"), data, missing
+
+
+def _columns(values: typing.Union[ValueRange, typing.List[list]], header: bool,
+             date_columns: typing.Iterable[str]) -> typing.Generator[typing.Tuple[str, str, 'numpy.ndarray', 'numpy.ndarray'], None, None]:
+    names, grid = _grid(_values(values), header)
+    date_columns = set(date_columns) if date_columns else set()
+    unknown = date_columns - set(names)
+    if unknown:
+        raise ValueError(f"Date columns {sorted(unknown)} are not in the values. Columns are {names}.")
+    for index, name in enumerate(names):
+        yield (name, *_parse(grid[:, index], name in date_columns))
+
+
+def to_numpy(values: typing.Union[ValueRange, typing.List[list]], header: bool = False,
+             dtype: typing.Any = None) -> 'numpy.ndarray':
+    """
+    Returns the values as a 2D array padded to the widest row, without the first row when `header`
+    is set. Cells are Python objects, unless a `dtype` is given, then empty cells are NaN for
+    floating point types.
+    """
+    np = _require("numpy")
+    _, grid = _grid(_values(values), header)
+    if dtype is None:
+        return grid
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.floating):
+        grid[(grid == None) | (grid == "")] = np.nan # pylint: disable=singleton-comparison
+    return grid.astype(dtype)
+
+
+def to_pandas(values: typing.Union[ValueRange, typing.List[list]], header: bool = True,
+              date_columns: typing.Iterable[str] = None) -> 'pandas.DataFrame':
+    """
+    Returns the values as a DataFrame with typed columns, named after the first row when `header`
+    is set and after the column letters otherwise. Integer columns with empty cells are `float64`,
+    boolean ones use the nullable `boolean` type.
+    """
+    pd = _require("pandas")
+    columns = dict()
+    for name, kind, data, missing in _columns(values, header, date_columns):
+        if kind == "bool" and missing.any():
+            data = pd.arrays.BooleanArray(data, missing)
+        columns[name] = data
+    return pd.DataFrame(columns)
+
+
+def to_arrow(values: typing.Union[ValueRange, typing.List[list]], header: bool = True,
+             date_columns: typing.Iterable[str] = None) -> 'pyarrow.Table':
+    """
+    Returns the values as an Arrow table with typed columns, named after the first row when
+    `header` is set and after the column letters otherwise. Empty cells are nulls, columns of
+    mixed types are converted to strings.
+    """
+    pa = _require("pyarrow")
+    names, arrays = list(), list()
+    for name, kind, data, missing in _columns(values, header, date_columns):
+        if kind == "empty":
+            array = pa.nulls(len(data))
+        elif kind == "str":
+            array = pa.array(data, type=pa.string())
+        elif kind == "object":
+            array = pa.array(data.astype(str), mask=missing, type=pa.string())
+        else:
+            array = pa.array(data, mask=missing if missing.any() else None)
+        names.append(name)
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def from_pandas(frame: 'pandas.DataFrame', header: bool = True, index: bool = False,
+                date_format: str = None) -> ValueRange:
+    """
+    Returns the rows of a DataFrame as a `ValueRange`, preceded by the column names when `header`
+    is set. Columns are converted as a whole: dates become serial numbers, or strings formatted with
+    `date_format`, durations become days and missing values empty cells.
+    """
+    np = _require("numpy")
+    pd = _require("pandas")
+    if index:
+        frame = frame.reset_index()
+    columns = list()
+    for _, column in frame.items():
+        if pd.api.types.is_datetime64_any_dtype(column.dtype):
+            if getattr(column.dtype, "tz", None) is not None:
+                column = column.dt.tz_localize(None)
+            if date_format:
+                cells = column.dt.strftime(date_format).to_numpy(dtype=object, copy=True)
+            else:
+                cells = datetime_to_serial(column.to_numpy(dtype="datetime64[ms]")).astype(object)
+        elif pd.api.types.is_timedelta64_dtype(column.dtype):
+            cells = (column / pd.Timedelta(days=1)).to_numpy(dtype=object, copy=True)
+        else:
+            cells = column.to_numpy(dtype=object, copy=True)
+        cells[column.isna().to_numpy()] = ""
+        columns.append(cells)
+    rows = np.column_stack(columns).tolist() if columns else [list() for _ in range(len(frame))]
+    if header:
+        rows.insert(0, [str(name) for name in frame.columns])
+    return ValueRange(values=rows)
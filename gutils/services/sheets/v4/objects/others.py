@@ -9,6 +9,11 @@ from gutils.services.sheets.v4.types import (DataFilter, DateTimeRenderOption,
                                              ValueInputOption,
                                              ValueRenderOption)
 
+if typing.TYPE_CHECKING:
+    import numpy
+    import pandas
+    import pyarrow
+
 
 class DataFilters(BaseModel):
     dataFilters: typing.List[DataFilter]
@@ -20,6 +25,40 @@ class MatchedDeveloperMetadata(BaseModel):
 class ValueRange(BaseModel):
     values: list
 
+    def to_numpy(self, header: bool = False, dtype: typing.Any = None) -> 'numpy.ndarray':
+        """
+        Returns the values as a 2D array. See `gutils.services.sheets.v4.columnar.to_numpy`.
+        """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.sheets.v4.columnar import to_numpy
+        return to_numpy(self, header, dtype)
+
+    def to_arrow(self, header: bool = True, date_columns: typing.Iterable[str] = None) -> 'pyarrow.Table':
+        """
+        Returns the values as an Arrow table with typed columns. See `gutils.services.sheets.v4.columnar.to_arrow`.
+        """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.sheets.v4.columnar import to_arrow
+        return to_arrow(self, header, date_columns)
+
+    def to_pandas(self, header: bool = True, date_columns: typing.Iterable[str] = None) -> 'pandas.DataFrame':
+        """
+        Returns the values as a DataFrame with typed columns. See `gutils.services.sheets.v4.columnar.to_pandas`.
+        """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.sheets.v4.columnar import to_pandas
+        return to_pandas(self, header, date_columns)
+
+    @classmethod
+    def from_pandas(cls, frame: 'pandas.DataFrame', header: bool = True, index: bool = False,
+                    date_format: str = None) -> 'ValueRange':
+        """
+        Returns the rows of a DataFrame as a `ValueRange`. See `gutils.services.sheets.v4.columnar.from_pandas`.
+        """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.sheets.v4.columnar import from_pandas
+        return from_pandas(frame, header, index, date_format)
+
 class DataFilterValueRange(BaseModel):
     dataFilter: DataFilter
     majorDimension: Dimension
@@ -1,12 +1,32 @@
-# pylint: disable=wildcard-import
-# pylint: disable=unused-wildcard-import
-from gutils.services.sheets.v4.objects.others import *
-from gutils.services.sheets.v4.objects.spreadsheets import Spreadsheet
-from gutils.services.sheets.v4.types import *
-from gutils.services.sheets.v4.spreadsheets.developer_metadata import DeveloperMetadata
-from gutils.services.sheets.v4.spreadsheets.sheets import Sheets
-from gutils.services.sheets.v4.spreadsheets.values import Values
+"""
+The Spreadsheets module loads its sub-resources and the spreadsheet models on first use, so
+scripts that only read values do not pay for importing every Sheets model.
+"""
+import typing
+from importlib import import_module
 
+from gutils.services.instrumentation import build_model
+
+if typing.TYPE_CHECKING:
+    from gutils.services.sheets.v4.objects.spreadsheets import Spreadsheet
+    from gutils.services.sheets.v4.spreadsheets.developer_metadata import DeveloperMetadata
+    from gutils.services.sheets.v4.spreadsheets.sheets import Sheets
+    from gutils.services.sheets.v4.spreadsheets.values import Values
+
+# Models and types that used to be re-exported from here through wildcard imports.
+_reexported_modules = (
+    "gutils.services.sheets.v4.objects.others",
+    "gutils.services.sheets.v4.objects.spreadsheets",
+    "gutils.services.sheets.v4.types",
+)
+
+
+def __getattr__(name: str) -> typing.Any:
+    for module_name in _reexported_modules:
+        module = import_module(module_name)
+        if hasattr(module, name):
+            return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # pylint: disable=line-too-long
@@ -23,31 +43,41 @@ class Spreadsheets:
         self.service = service
 
     @property
-    def developer_metadata(self) -> DeveloperMetadata:
+    def developer_metadata(self) -> 'DeveloperMetadata':
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.sheets.v4.spreadsheets.developer_metadata import DeveloperMetadata
         return DeveloperMetadata(self.service)
 
     @property
-    def sheets(self) -> Sheets:
+    def sheets(self) -> 'Sheets':
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.sheets.v4.spreadsheets.sheets import Sheets
         return Sheets(self.service)
 
     @property
-    def values(self) -> Values:
-        return Values(self.values)
+    def values(self) -> 'Values':
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.sheets.v4.spreadsheets.values import Values
+        return Values(self.service)
 
-    def create(self, body: Spreadsheet) -> Spreadsheet:
+    def create(self, body: 'Spreadsheet') -> 'Spreadsheet':
         """
         Creates a new Google Sheet with the given title.
         """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.sheets.v4.objects.spreadsheets import Spreadsheet
         response = self.service.spreadsheets().create(body=body.dict()).execute()
-        return Spreadsheet(**response)
+        return build_model(Spreadsheet, response)
 
-    def get(self, spreadsheet_id: str, ranges: list, include_grid_data: bool = None) -> Spreadsheet:
+    def get(self, spreadsheet_id: str, ranges: list, include_grid_data: bool = None) -> 'Spreadsheet':
         """
         Retrive a Google Sheet info with the Sheet ID.
         """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.sheets.v4.objects.spreadsheets import Spreadsheet
         response = self.service.spreadsheets().get(spreadsheetId=spreadsheet_id, ranges=ranges,
                                                includeGridData=include_grid_data).execute()
-        return Spreadsheet(**response)
+        return build_model(Spreadsheet, response)
 
     def get_by_data_filter(self, spreadsheet_id: str, body: dict = None):
         """
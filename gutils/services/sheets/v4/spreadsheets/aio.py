@@ -0,0 +1,158 @@
+"""
+Asyncio variants of the Spreadsheets and Values resources.
+"""
+import typing
+import urllib.parse
+
+# pylint: disable=wildcard-import
+# pylint: disable=unused-wildcard-import
+from gutils.services.instrumentation import build_model
+from gutils.services.sheets.v4.objects.others import *
+from gutils.services.sheets.v4.types import *
+
+if typing.TYPE_CHECKING:
+    from gutils.services.sheets.v4.objects.spreadsheets import Spreadsheet
+
+
+def _quote(value: str) -> str:
+    return urllib.parse.quote(value, safe='')
+
+
+# pylint: disable=line-too-long
+class AsyncValues:
+    """
+    Mirrors the `Values` class with coroutines that share one `AsyncSession`.
+    """
+    service_name = "sheets"
+    resource_name = "spreadsheets.values"
+    version = "v4"
+
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+    def _path(self, spreadsheet_id: str, suffix: str) -> str:
+        return f"spreadsheets/{_quote(spreadsheet_id)}/values{suffix}"
+
+    # pylint: disable=too-many-arguments
+    async def get(self, spreadsheet_id: str, sheet_range: str,
+        dimension: Dimension = Dimension.ROWS,
+        value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE,
+        datetime_render_option: DateTimeRenderOption = DateTimeRenderOption.SERIAL_NUMBER) -> ValueRange:
+        """
+        Reads a given range of data from a Google Sheet.
+        """
+        response = await self.session.request(self.service_name, "GET", self._path(spreadsheet_id, f"/{_quote(sheet_range)}"),
+                        params={"majorDimension": dimension.value,
+                                "valueRenderOption": value_render_option.value,
+                                "dateTimeRenderOption": datetime_render_option.value},
+                        method_id="sheets.spreadsheets.values.get")
+        return build_model(ValueRange, response)
+
+    async def update(self, spreadsheet_id: str, body: ValueRange, sheet_range: str,
+        input_option: ValueInputOption = ValueInputOption.RAW,
+        response_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE,
+        response_datetime_render_option: DateTimeRenderOption = DateTimeRenderOption.SERIAL_NUMBER) -> UpdateValuesResponse:
+        """
+        Writes or updates a given range of data to a Google Sheet.
+        """
+        response = await self.session.request(self.service_name, "PUT", self._path(spreadsheet_id, f"/{_quote(sheet_range)}"),
+                        params={"valueInputOption": input_option.value,
+                                "responseValueRenderOption": response_render_option.value,
+                                "responseDateTimeRenderOption": response_datetime_render_option.value},
+                        body=body.dict(), method_id="sheets.spreadsheets.values.update")
+        return build_model(UpdateValuesResponse, response)
+
+    async def append(self, spreadsheet_id: str, body: ValueRange, sheet_range: str,
+        input_option: ValueInputOption = ValueInputOption.RAW,
+        insert_data_option: InsertDataOption = InsertDataOption.OVERWRITE,
+        response_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE,
+        response_datetime_render_option: DateTimeRenderOption = DateTimeRenderOption.SERIAL_NUMBER) -> AppendValueResponse:
+        """
+        Appends a given list of values to a Google Sheet.
+        """
+        response = await self.session.request(self.service_name, "POST", self._path(spreadsheet_id, f"/{_quote(sheet_range)}:append"),
+                        params={"valueInputOption": input_option.value,
+                                "insertDataOption": insert_data_option.value,
+                                "responseValueRenderOption": response_render_option.value,
+                                "responseDateTimeRenderOption": response_datetime_render_option.value},
+                        body=body.dict(), method_id="sheets.spreadsheets.values.append")
+        return build_model(AppendValueResponse, response)
+
+    async def clear(self, spreadsheet_id: str, sheet_range: str) -> ClearValuesResponse:
+        """
+        Clears a spreadsheet for the given reange.
+        """
+        response = await self.session.request(self.service_name, "POST",
+                        self._path(spreadsheet_id, f"/{_quote(sheet_range)}:clear"), body={},
+                        method_id="sheets.spreadsheets.values.clear")
+        return build_model(ClearValuesResponse, response)
+
+    async def batch_get(self, spreadsheet_id: str, ranges: list,
+        dimension: Dimension = Dimension.ROWS,
+        date_time_render_option: DateTimeRenderOption = DateTimeRenderOption.SERIAL_NUMBER,
+        value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE) -> BatchGetValuesResponse:
+        """
+        Reads a given set of ranges and returns the values
+        """
+        response = await self.session.request(self.service_name, "GET", self._path(spreadsheet_id, ":batchGet"),
+                        params={"ranges": list(ranges),
+                                "majorDimension": dimension.value,
+                                "valueRenderOption": value_render_option.value,
+                                "dateTimeRenderOption": date_time_render_option.value},
+                        method_id="sheets.spreadsheets.values.batchGet")
+        return build_model(BatchGetValuesResponse, response)
+
+    async def batch_update(self, spreadsheet_id: str, body: BatchUpdateValuesRequest) -> BatchUpdateValuesResponse:
+        """
+        Updates a set of values for the given set of ranges
+        """
+        response = await self.session.request(self.service_name, "POST",
+                        self._path(spreadsheet_id, ":batchUpdate"), body=body.dict(),
+                        method_id="sheets.spreadsheets.values.batchUpdate")
+        return build_model(BatchUpdateValuesResponse, response)
+
+    async def batch_clear(self, spreadsheet_id: str, body: BatchClearValuesRequest) -> BatchClearValuesResponse:
+        """
+        Clears a sheet for the given set of ranges.
+        """
+        response = await self.session.request(self.service_name, "POST",
+                        self._path(spreadsheet_id, ":batchClear"), body=body.dict(),
+                        method_id="sheets.spreadsheets.values.batchClear")
+        return build_model(BatchClearValuesResponse, response)
+
+
+class AsyncSpreadsheets:
+    """
+    Mirrors the `Spreadsheets` class with coroutines that share one `AsyncSession`.
+    """
+    service_name = "sheets"
+    resource_name = "spreadsheets"
+    version = "v4"
+
+    def __init__(self, session: object) -> None:
+        self.session = session
+
+    @property
+    def values(self) -> AsyncValues:
+        return AsyncValues(self.session)
+
+    async def create(self, body: 'Spreadsheet') -> 'Spreadsheet':
+        """
+        Creates a new Google Sheet with the given title.
+        """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.sheets.v4.objects.spreadsheets import Spreadsheet
+        response = await self.session.request(self.service_name, "POST", "spreadsheets", body=body.dict(),
+                        method_id="sheets.spreadsheets.create")
+        return build_model(Spreadsheet, response)
+
+    async def get(self, spreadsheet_id: str, ranges: list, include_grid_data: bool = None) -> 'Spreadsheet':
+        """
+        Retrive a Google Sheet info with the Sheet ID.
+        """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.sheets.v4.objects.spreadsheets import Spreadsheet
+        response = await self.session.request(self.service_name, "GET", f"spreadsheets/{_quote(spreadsheet_id)}",
+                        params={"ranges": ranges, "includeGridData": include_grid_data},
+                        method_id="sheets.spreadsheets.get")
+        return build_model(Spreadsheet, response)
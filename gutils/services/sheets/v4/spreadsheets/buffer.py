@@ -0,0 +1,243 @@
+"""
+This module contains the write-behind buffer that batches rows into `values.append` requests.
+"""
+import atexit
+import threading
+import time
+import typing
+
+from gutils.services.sheets.v4.objects.general import Dimension
+from gutils.services.sheets.v4.spreadsheets.bulk import row_size
+from gutils.services.sheets.v4.types import InsertDataOption, ValueInputOption
+
+if typing.TYPE_CHECKING:
+    from gutils.services.sheets.v4.spreadsheets.values import Values
+
+
+class AppendStats:
+    """
+    Totals of an append buffer. `failed` holds the `(rows, exception)` of batches that were not written.
+    """
+    def __init__(self) -> None:
+        self.appended = 0
+        self.requests = 0
+        self.rows = 0
+        self.bytes = 0
+        self.blocked_seconds = 0.0
+        self.failed = list()
+
+    def __repr__(self) -> str:
+        return (f"AppendStats(appended={self.appended}, requests={self.requests}, rows={self.rows}, "
+                f"failed={len(self.failed)}, blocked_seconds={self.blocked_seconds:.2f})")
+
+
+# pylint: disable=line-too-long,too-many-instance-attributes
+class AppendBuffer:
+    """
+    Collects rows in memory and appends them to a sheet from a background thread, one
+    `values.append` request per batch instead of one per row. A batch is sent once `max_rows` rows
+    or `max_bytes` bytes are buffered, or once the oldest buffered row is `flush_interval` seconds
+    old. Buffered rows are sent on `flush`, `close`, leaving a `with` block and at interpreter exit.
+    When `max_buffered_rows` rows are waiting, `append` blocks until the flusher catches up.
+    Requests are made from the flusher thread, create the client with `thread_safe=True` if it is
+    used by other threads at the same time.
+
+    with values.append_buffer(spreadsheet_id, "Events!A:D") as buffer:
+        for event in events:
+            buffer.append([event.time, event.name, event.user, event.value])
+    """
+    # Google recommends request bodies of at most 2 MB.
+    default_max_bytes = 2 * 1024 * 1024
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, values: 'Values', spreadsheet_id: str, sheet_range: str,
+                 max_rows: int = 500, max_bytes: int = None, flush_interval: float = 5.0,
+                 max_buffered_rows: int = None,
+                 input_option: ValueInputOption = ValueInputOption.RAW,
+                 insert_data_option: InsertDataOption = InsertDataOption.INSERT_ROWS,
+                 on_error: typing.Callable[[typing.List[list], Exception], None] = None) -> None:
+        if max_rows < 1:
+            raise ValueError(f"max_rows must be at least 1. {max_rows} was provided.")
+        if flush_interval <= 0:
+            raise ValueError(f"flush_interval must be positive. {flush_interval} was provided.")
+        self.values = values
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet_range = sheet_range
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes if max_bytes else self.default_max_bytes
+        self.flush_interval = flush_interval
+        self.max_buffered_rows = max(max_buffered_rows if max_buffered_rows else 10 * max_rows, max_rows)
+        self.input_option = input_option
+        self.insert_data_option = insert_data_option
+        self.on_error = on_error
+        self.stats = AppendStats()
+
+        self._rows = list()
+        self._sizes = list()
+        self._bytes = 0
+        self._oldest = None
+        # Rows appended and rows settled (sent or failed) so far, `flush` waits for the latter to
+        # catch up with the former.
+        self._appended = 0
+        self._settled = 0
+        self._flush_target = 0
+        self._errors = list()
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="gutils-append-buffer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self) -> 'AppendBuffer':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """
+        Number of rows waiting to be sent.
+        """
+        with self._condition:
+            return len(self._rows)
+
+    def append(self, row: list, timeout: float = None) -> None:
+        """
+        Buffers a row. Blocks while the buffer is full, raising `TimeoutError` after `timeout` seconds.
+        """
+        self.extend([row], timeout)
+
+    def extend(self, rows: typing.Iterable[list], timeout: float = None) -> None:
+        """
+        Buffers several rows. Blocks while the buffer is full, raising `TimeoutError` after `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for row in rows:
+            row = list(row)
+            size = row_size(row)
+            with self._condition:
+                if self._closed:
+                    raise ValueError("The append buffer is closed.")
+                if len(self._rows) >= self.max_buffered_rows:
+                    self._wait_for_room(deadline)
+                first = not self._rows
+                if first:
+                    self._oldest = time.monotonic()
+                self._rows.append(row)
+                self._sizes.append(size)
+                self._bytes += size
+                self._appended += 1
+                self.stats.appended += 1
+                # The flusher is woken by the first row to start the `flush_interval` timer and by
+                # a full batch, not by every row.
+                if first or len(self._rows) == self.max_rows or self._bytes >= self.max_bytes:
+                    self._condition.notify_all()
+
+    def _wait_for_room(self, deadline: typing.Union[float, None]) -> None:
+        blocked = time.monotonic()
+        self._condition.notify_all()
+        try:
+            while len(self._rows) >= self.max_buffered_rows and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"The append buffer stayed full with {len(self._rows)} rows.")
+                self._condition.wait(remaining)
+        finally:
+            self.stats.blocked_seconds += time.monotonic() - blocked
+        if self._closed:
+            raise ValueError("The append buffer is closed.")
+
+    def flush(self, timeout: float = None) -> None:
+        """
+        Sends the rows buffered so far and waits until they are written. Raises the first error
+        of a batch that failed since the last flush, unless `on_error` handles them.
+        """
+        with self._condition:
+            target = self._appended
+            self._flush_target = max(self._flush_target, target)
+            self._condition.notify_all()
+            if not self._condition.wait_for(lambda: self._settled >= target or not self._thread.is_alive(), timeout):
+                raise TimeoutError(f"{target - self._settled} rows were not flushed within {timeout} seconds.")
+            errors, self._errors = self._errors, list()
+        if errors:
+            raise errors[0]
+
+    def close(self, timeout: float = None) -> None:
+        """
+        Sends the buffered rows and stops the flusher thread. Closing twice has no effect.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        atexit.unregister(self.close)
+        self._thread.join(timeout)
+        with self._condition:
+            errors, self._errors = self._errors, list()
+        if errors:
+            raise errors[0]
+
+    def _due(self) -> bool:
+        if not self._rows:
+            return False
+        return (self._closed or len(self._rows) >= self.max_rows or self._bytes >= self.max_bytes
+                or self._flush_target > self._settled
+                or time.monotonic() - self._oldest >= self.flush_interval)
+
+    def _take(self) -> typing.Tuple[typing.List[list], int]:
+        """
+        Removes the next batch and its size from the buffer, bounded by `max_rows` and `max_bytes`.
+        """
+        count, size = 0, 0
+        for row_size in self._sizes[:self.max_rows]:
+            if count and size + row_size > self.max_bytes:
+                break
+            count += 1
+            size += row_size
+        batch = self._rows[:count]
+        del self._rows[:count]
+        del self._sizes[:count]
+        self._bytes -= size
+        self._oldest = time.monotonic() if self._rows else None
+        return batch, size
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._due():
+                    if self._closed and not self._rows:
+                        return
+                    wait = None if self._oldest is None else self._oldest + self.flush_interval - time.monotonic()
+                    self._condition.wait(wait)
+                batch, size = self._take()
+                # Appenders blocked on a full buffer may continue.
+                self._condition.notify_all()
+            self._send(batch, size)
+            with self._condition:
+                self._settled += len(batch)
+                self._condition.notify_all()
+
+    def _send(self, batch: typing.List[list], size: int) -> None:
+        body = {"range": self.sheet_range, "majorDimension": Dimension.ROWS.value, "values": batch}
+        try:
+            self.values.resource.append(spreadsheetId=self.spreadsheet_id, range=self.sheet_range,
+                                        valueInputOption=self.input_option.value,
+                                        insertDataOption=self.insert_data_option.value,
+                                        includeValuesInResponse=False, body=body).execute()
+        except Exception as exception: # pylint: disable=broad-except
+            with self._condition:
+                self.stats.failed.append((batch, exception))
+                if self.on_error is None:
+                    self._errors.append(exception)
+            if self.on_error is not None:
+                try:
+                    self.on_error(batch, exception)
+                except Exception as error: # pylint: disable=broad-except
+                    with self._condition:
+                        self._errors.append(error)
+            return
+        with self._condition:
+            self.stats.requests += 1
+            self.stats.rows += len(batch)
+            self.stats.bytes += size
@@ -0,0 +1,173 @@
+"""
+This module contains the bulk writer that splits large datasets into bounded `values.batchUpdate` requests.
+"""
+import json
+import time
+import typing
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from gutils.services.sheets.v4.a1 import a1_range, column_letter
+from gutils.services.sheets.v4.objects.general import Dimension
+from gutils.services.sheets.v4.types import ValueInputOption
+
+if typing.TYPE_CHECKING:
+    from gutils.services.sheets.v4.spreadsheets.values import Values
+
+
+def row_size(row: list) -> int:
+    """
+    Returns the bytes a row adds to a request body, serialized with the separators `googleapiclient` uses.
+    """
+    return len(json.dumps(row)) + 2
+
+
+class BulkWriteReport:
+    """
+    Totals of a bulk write. `failed` holds the `(range, exception)` of chunks that were not written.
+    """
+    def __init__(self) -> None:
+        self.requests = 0
+        self.rows = 0
+        self.cells = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.failed = list()
+
+    @property
+    def cells_per_second(self) -> float:
+        return self.cells / self.seconds if self.seconds else 0.0
+
+    def __repr__(self) -> str:
+        return (f"BulkWriteReport(requests={self.requests}, rows={self.rows}, cells={self.cells}, "
+                f"failed={len(self.failed)}, seconds={self.seconds:.2f}, cells_per_second={self.cells_per_second:.0f})")
+
+
+# pylint: disable=line-too-long
+class BulkWriter:
+    """
+    Writes a 2D dataset of any size to a sheet. Rows are grouped into chunks whose request body
+    stays below `max_request_bytes` and, when given, `max_request_cells`. Every chunk is sent as one
+    `values.batchUpdate` request for its own A1 range, with up to `max_workers` requests in flight.
+    Rows may be a generator, at most `max_workers + 1` chunks are held in memory.
+    Concurrent requests require a client created with `thread_safe=True`, otherwise chunks are
+    written one at a time.
+
+    report = BulkWriter(values, max_workers=4).write(spreadsheet_id, "Sheet1", rows)
+    print(report.cells, report.cells_per_second)
+    """
+    # Google recommends request bodies of at most 2 MB.
+    default_max_request_bytes = 2 * 1024 * 1024
+    _envelope_bytes = 512
+
+    def __init__(self, values: 'Values', max_workers: int = 4, max_request_bytes: int = None,
+                 max_request_cells: int = None) -> None:
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1. {max_workers} was provided.")
+        self.values = values
+        self.max_workers = max_workers
+        self.max_request_bytes = max_request_bytes if max_request_bytes else self.default_max_request_bytes
+        self.max_request_cells = max_request_cells
+
+    def chunks(self, rows: typing.Iterable[list], start_row: int = 1) -> typing.Generator[typing.Tuple[int, typing.List[list], int], None, None]:
+        """
+        Yields the first row, the rows and the estimated body size of every chunk.
+        A single row larger than the limits is sent on its own.
+        """
+        chunk, size, cells, first_row = list(), self._envelope_bytes, 0, start_row
+        for row in rows:
+            row = list(row)
+            size_of_row = row_size(row)
+            row_cells = len(row)
+            if chunk and (size + size_of_row > self.max_request_bytes
+                          or (self.max_request_cells and cells + row_cells > self.max_request_cells)):
+                yield first_row, chunk, size
+                first_row += len(chunk)
+                chunk, size, cells = list(), self._envelope_bytes, 0
+            chunk.append(row)
+            size += size_of_row
+            cells += row_cells
+        if chunk:
+            yield first_row, chunk, size
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def write(self, spreadsheet_id: str, sheet_name: str, rows: typing.Iterable[list], start_row: int = 1,
+              start_column: int = 1, input_option: ValueInputOption = ValueInputOption.RAW,
+              progress: typing.Callable[[BulkWriteReport], None] = None,
+              return_exceptions: bool = False) -> BulkWriteReport:
+        """
+        Writes the rows to the sheet starting at the 1-based `start_row` and `start_column` and
+        returns a report of the requests, rows and cells written. `progress(report)` is called after
+        every chunk. A failed chunk stops the write and is raised once the requests in flight
+        complete, unless `return_exceptions` is set, then it is recorded in `report.failed`.
+        """
+        report = BulkWriteReport()
+        started = time.perf_counter()
+        resource = self.values.resource
+
+        def request(first_row, chunk):
+            width = max((len(row) for row in chunk), default=1) or 1
+            sheet_range = a1_range(sheet_name, first_row, first_row + len(chunk) - 1,
+                                   column_letter(start_column), column_letter(start_column + width - 1))
+            body = {"valueInputOption": input_option.value, "includeValuesInResponse": False,
+                    "data": [{"range": sheet_range, "majorDimension": Dimension.ROWS.value, "values": chunk}]}
+            return sheet_range, resource.batchUpdate(spreadsheetId=spreadsheet_id, body=body)
+
+        def completed(sheet_range, chunk, size, result):
+            try:
+                response = result()
+            except Exception as exception: # pylint: disable=broad-except
+                if not return_exceptions:
+                    raise
+                report.failed.append((sheet_range, exception))
+                return
+            report.requests += 1
+            report.rows += len(chunk)
+            report.cells += response.get("totalUpdatedCells", 0)
+            report.bytes += size
+            report.seconds = time.perf_counter() - started
+            if progress:
+                progress(report)
+
+        chunks = self.chunks(rows, start_row)
+        first = next(chunks, None)
+        if first is None:
+            return report
+        sheet_range, current = request(*first[:2])
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.transport import uses_pool
+        max_workers = self.max_workers if uses_pool(current) else 1
+
+        if max_workers == 1:
+            chunk = first
+            while chunk is not None:
+                completed(sheet_range, chunk[1], chunk[2], current.execute)
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    sheet_range, current = request(*chunk[:2])
+            report.seconds = time.perf_counter() - started
+            return report
+
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gutils-bulk-write")
+        running = {executor.submit(current.execute): (sheet_range, first[1], first[2])}
+        error = None
+        try:
+            for first_row, chunk, size in chunks:
+                while len(running) >= max_workers:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        completed(*running.pop(future), future.result)
+                sheet_range, current = request(first_row, chunk)
+                running[executor.submit(current.execute)] = (sheet_range, chunk, size)
+        except Exception as exception: # pylint: disable=broad-except
+            error = exception
+        finally:
+            for future in running:
+                try:
+                    completed(*running[future], future.result)
+                except Exception as exception: # pylint: disable=broad-except
+                    error = error if error else exception
+            executor.shutdown(wait=True)
+        report.seconds = time.perf_counter() - started
+        if error:
+            raise error
+        return report
@@ -1,5 +1,6 @@
 # pylint: disable=wildcard-import
 # pylint: disable=unused-wildcard-import
+from gutils.services.instrumentation import build_model
 from gutils.services.sheets.v4.objects.developer_metadata import \
     DeveloperMetadata
 from gutils.services.sheets.v4.objects.others import *
@@ -20,7 +21,7 @@ class DeveloperMetadata:
     def get_developer_metadata(self, spreadsheet_id: str, metadata_id: str) -> DeveloperMetadata:
         response = self.service.spreadsheets().developerMetadata().get(
             spreadsheetId=spreadsheet_id, metadataId=metadata_id).execute()
-        return DeveloperMetadata(**response)
+        return build_model(DeveloperMetadata, response)
 
     def search_developer_metadata(self, spreadsheet_id: str, body: DataFilters) -> MatchedDeveloperMetadata:
         """
@@ -28,4 +29,4 @@ class DeveloperMetadata:
         """
         response = self.service.spreadsheets().developerMetadata().search(
             spreadsheetId=spreadsheet_id, body=body.dict()).execute()
-        return MatchedDeveloperMetadata(**response)
+        return build_model(MatchedDeveloperMetadata, response)
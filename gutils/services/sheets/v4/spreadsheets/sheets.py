@@ -1,3 +1,4 @@
+from gutils.services.instrumentation import build_model
 from gutils.services.sheets.v4.objects.sheets import SheetProperties
 
 # pylint: disable=line-too-long
@@ -19,4 +20,4 @@ class Sheets:
         }
         resposne = self.service.spreadsheets().sheets().copyTo(
             spreadsheetId=spreadsheet_id, sheetId=sheet_id, body=body).execute()
-        return SheetProperties(**resposne)
+        return build_model(SheetProperties, resposne)
@@ -1,6 +1,15 @@
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+from gutils.services.instrumentation import build_model
+from gutils.services.sheets.v4.a1 import a1_range, quote_sheet_name
 from gutils.services.sheets.v4.objects.others import *
 from gutils.services.sheets.v4.types import *
 
+if typing.TYPE_CHECKING:
+    from gutils.services.sheets.v4.spreadsheets.buffer import AppendBuffer
+    from gutils.services.sheets.v4.spreadsheets.bulk import BulkWriteReport
+
 # pylint: disable=line-too-long
 # pylint: disable=no-member
 class Values:
@@ -13,6 +22,17 @@ class Values:
 
     def __init__(self, service: object) -> None:
         self.service = service
+        self._resource = None
+
+    @property
+    def resource(self) -> object:
+        """
+        The `spreadsheets().values()` resource of the service. Building it is expensive, so it is
+        built once and reused by the windowed reads, the bulk writer and the append buffer.
+        """
+        if self._resource is None:
+            self._resource = self.service.spreadsheets().values()
+        return self._resource
 
     # pylint: disable=too-many-arguments
     def get(self, spreadsheet_id: str, sheet_range: str,
@@ -26,7 +46,118 @@ class Values:
                 range=sheet_range, majorDimension=dimension.value,
                 valueRenderOption=value_render_option.value,
                 dateTimeRenderOption=datetime_render_option.value).execute()
-        return ValueRange(**response)
+        return build_model(ValueRange, response)
+
+    def _row_count(self, spreadsheet_id: str, sheet_name: str) -> int:
+        """
+        Returns the number of rows of a sheet's grid.
+        """
+        response = self.service.spreadsheets().get(spreadsheetId=spreadsheet_id, ranges=[quote_sheet_name(sheet_name)],
+                    fields="sheets(properties(title,gridProperties(rowCount)))").execute()
+        sheets = response.get("sheets", [])
+        if not sheets:
+            raise ValueError(f"Sheet {sheet_name!r} was not found in spreadsheet {spreadsheet_id}.")
+        return sheets[0].get("properties", dict()).get("gridProperties", dict()).get("rowCount", 0)
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def iter_windows(self, spreadsheet_id: str, sheet_name: str, window_rows: int = 1000,
+        columns: str = None, start_row: int = 1,
+        value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE,
+        datetime_render_option: DateTimeRenderOption = DateTimeRenderOption.SERIAL_NUMBER,
+        prefetch: bool = True, max_empty_windows: int = 3) -> typing.Generator[typing.Tuple[int, ValueRange], None, None]:
+        """
+        Reads a sheet in windows of `window_rows` rows and yields the 1-based first row and the
+        values of every window. `columns`, e.g. `A:F`, narrows the read to those columns.
+        The next window is fetched in the background while the current one is processed when the
+        client is thread safe, so at most two windows are held in memory.
+        Windows without values are skipped. Reading stops after `max_empty_windows` empty windows
+        in a row, as the rows after the last non-empty one are usually empty up to the end of the
+        grid, or at the last row of the grid. Sheets with longer runs of blank rows between values
+        need a larger `max_empty_windows`, or None to read up to the last row of the grid.
+        """
+        if window_rows < 1:
+            raise ValueError(f"window_rows must be at least 1. {window_rows} was provided.")
+        first_column, _, last_column = columns.partition(":") if columns else (None, None, None)
+        row_count = self._row_count(spreadsheet_id, sheet_name)
+
+        def request(first_row):
+            return self.resource.get(spreadsheetId=spreadsheet_id,
+                    range=a1_range(sheet_name, first_row, min(first_row + window_rows - 1, row_count),
+                                   first_column, last_column or first_column),
+                    majorDimension=Dimension.ROWS.value,
+                    valueRenderOption=value_render_option.value,
+                    dateTimeRenderOption=datetime_render_option.value)
+
+        first_rows = iter(range(start_row, row_count + 1, window_rows))
+        first_row = next(first_rows, None)
+        if first_row is None:
+            return
+        current = request(first_row)
+        empty_windows = 0
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.transport import uses_pool
+        if not prefetch or not uses_pool(current):
+            while first_row is not None:
+                response = current.execute()
+                empty_windows = 0 if response.get("values") else empty_windows + 1
+                if max_empty_windows and empty_windows >= max_empty_windows:
+                    return
+                if not empty_windows:
+                    yield first_row, build_model(ValueRange, response)
+                first_row = next(first_rows, None)
+                current = request(first_row) if first_row is not None else None
+            return
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gutils-values")
+        try:
+            future = executor.submit(current.execute)
+            while future is not None:
+                response = future.result()
+                empty_windows = 0 if response.get("values") else empty_windows + 1
+                if max_empty_windows and empty_windows >= max_empty_windows:
+                    return
+                next_row = next(first_rows, None)
+                future = executor.submit(request(next_row).execute) if next_row is not None else None
+                if not empty_windows:
+                    yield first_row, build_model(ValueRange, response)
+                first_row = next_row
+        finally:
+            executor.shutdown(wait=False)
+
+    # pylint: disable=too-many-arguments
+    def iter_rows(self, spreadsheet_id: str, sheet_name: str, window_rows: int = 1000,
+        columns: str = None, start_row: int = 1,
+        value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE,
+        datetime_render_option: DateTimeRenderOption = DateTimeRenderOption.SERIAL_NUMBER,
+        prefetch: bool = True, max_empty_windows: int = 3) -> typing.Generator[list, None, None]:
+        """
+        Yields the rows of a sheet one by one, read in windows of `window_rows` rows. Empty rows
+        before the last non-empty row are yielded as empty lists. See `iter_windows`.
+        """
+        next_row = start_row
+        for first_row, value_range in self.iter_windows(spreadsheet_id, sheet_name, window_rows, columns, start_row,
+                                                        value_render_option, datetime_render_option, prefetch,
+                                                        max_empty_windows):
+            for _ in range(first_row - next_row):
+                yield []
+            yield from value_range.values
+            next_row = first_row + len(value_range.values)
+
+    # pylint: disable=too-many-arguments
+    def bulk_write(self, spreadsheet_id: str, sheet_name: str, rows: typing.Iterable[list],
+        start_row: int = 1, start_column: int = 1,
+        input_option: ValueInputOption = ValueInputOption.RAW,
+        max_workers: int = 4, max_request_bytes: int = None, max_request_cells: int = None) -> 'BulkWriteReport':
+        """
+        Writes rows of any number to a sheet in `batch_update` calls bounded by `max_request_bytes`
+        and `max_request_cells`, with up to `max_workers` requests in flight, and returns a
+        `BulkWriteReport` of the requests, rows and cells written. See `BulkWriter`.
+        """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.sheets.v4.spreadsheets.bulk import BulkWriter
+        writer = BulkWriter(self, max_workers=max_workers, max_request_bytes=max_request_bytes,
+                            max_request_cells=max_request_cells)
+        return writer.write(spreadsheet_id, sheet_name, rows, start_row, start_column, input_option)
 
     def update(self, spreadsheet_id: str, body: ValueRange, sheet_range: str,
         input_option: ValueInputOption = ValueInputOption.RAW,
@@ -40,9 +171,9 @@ class Values:
                     responseValueRenderOption=response_render_option.value,
                     responseDateTimeRenderOption=response_datetime_render_option.value,
                     body=body.dict()).execute()
-        return UpdateValuesResponse(**response)
+        return build_model(UpdateValuesResponse, response)
 
-    def append(self, spreadsheet_id: str, body: ValueRange,
+    def append(self, spreadsheet_id: str, body: ValueRange, sheet_range: str,
         input_option: ValueInputOption = ValueInputOption.RAW,
         insert_data_option: InsertDataOption = InsertDataOption.OVERWRITE,
         response_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE,
@@ -52,12 +183,29 @@ class Values:
         """
         
         response = self.service.spreadsheets().values().append(spreadsheetId=spreadsheet_id,
-                        valueInputOption=input_option.value,
+                        range=sheet_range, valueInputOption=input_option.value,
                         insertDataOption=insert_data_option.value,
                         responseValueRenderOption=response_render_option.value,
                         responseDateTimeRenderOption=response_datetime_render_option.value,
                         body=body.dict()).execute()
-        return AppendValueResponse(**response)
+        return build_model(AppendValueResponse, response)
+
+    # pylint: disable=too-many-arguments
+    def append_buffer(self, spreadsheet_id: str, sheet_range: str,
+        max_rows: int = 500, max_bytes: int = None, flush_interval: float = 5.0,
+        max_buffered_rows: int = None,
+        input_option: ValueInputOption = ValueInputOption.RAW,
+        insert_data_option: InsertDataOption = InsertDataOption.INSERT_ROWS) -> 'AppendBuffer':
+        """
+        Returns a buffer that collects rows and appends them in batches from a background thread,
+        instead of one `append` request per row. Close it, or use it in a `with` block, to send the
+        remaining rows. See `AppendBuffer`.
+        """
+        # pylint: disable=import-outside-toplevel
+        from gutils.services.sheets.v4.spreadsheets.buffer import AppendBuffer
+        return AppendBuffer(self, spreadsheet_id, sheet_range, max_rows=max_rows, max_bytes=max_bytes,
+                            flush_interval=flush_interval, max_buffered_rows=max_buffered_rows,
+                            input_option=input_option, insert_data_option=insert_data_option)
 
     def clear(self, spreadsheet_id: str, sheet_range: str) -> ClearValuesResponse:
         """
@@ -66,7 +214,7 @@ class Values:
         """
         response = self.service.spreadsheets().values().clear(
             spreadsheetId=spreadsheet_id, range=sheet_range).execute()
-        return ClearValuesResponse(**response)
+        return build_model(ClearValuesResponse, response)
         
     def batch_get(self, spreadsheet_id: str, ranges: list, 
         dimension: Dimension = Dimension.ROWS,
@@ -79,7 +227,7 @@ class Values:
         response = self.service.spreadsheets().values().batchGet(spreadsheetId=spreadsheet_id, 
                     majorDimension=dimension, ranges=ranges, valueRenderOption=value_render_option, 
                     dateTimeRenderOption=date_time_render_option).execute()
-        return BatchGetValuesResponse(**response)
+        return build_model(BatchGetValuesResponse, response)
 
     def batch_get_by_data_filter(self, spreadsheet_id: str, 
                                         body: BatchGetValuesByDataFilterRequest) -> BatchGetValuesByDataFilterRequest:
@@ -88,7 +236,7 @@ class Values:
         """
         response = self.service.spreadsheets().values().batchGetByDataFilter(
             spreadsheetId=spreadsheet_id, body=body.dict()).execute()
-        return BatchGetValuesByDataFilterRequest(**response)
+        return build_model(BatchGetValuesByDataFilterRequest, response)
     
     def batch_update(self, spreadsheet_id: str, body: BatchUpdateValuesRequest) -> BatchUpdateValuesResponse:
         """
@@ -96,7 +244,7 @@ class Values:
         """
         response = self.service.spreadsheets().values().batchUpdate(
             spreadsheetId=spreadsheet_id, body=body.dict()).execute()
-        return BatchUpdateValuesResponse(**response)
+        return build_model(BatchUpdateValuesResponse, response)
 
     def batch_update_by_data_filter(self, spreadsheet_id: str,
                                 body: BatchUpdateValuesByDataFilterRequest) -> BatchUpdateValuesByDataFilterResponse:
@@ -105,7 +253,7 @@ class Values:
         """
         response = self.service.spreadsheets().values().batchUpdateByDataFilter(
             spreadsheetId=spreadsheet_id, body=body.dict()).execute()
-        return BatchUpdateValuesByDataFilterResponse(**response)
+        return build_model(BatchUpdateValuesByDataFilterResponse, response)
 
     def batch_clear(self, spreadsheet_id: str, body: BatchClearValuesRequest) -> BatchClearValuesResponse:
         """
@@ -114,9 +262,9 @@ class Values:
         """
         response = self.service.spreadsheets().values().batchClear(
             spreadsheetId=spreadsheet_id, body=body.dict()).execute()
-        return BatchClearValuesResponse(**response)
+        return build_model(BatchClearValuesResponse, response)
 
     def batch_clear_by_data_filter(self, spreadsheet_id: str, body: DataFilters) -> BatchClearValuesResponse:
         response = self.service.spreadsheets().values().batchClearByDataFilter(
             spreadsheetId=spreadsheet_id, body=body.dict())
-        return BatchClearValuesResponse(**response)
+        return build_model(BatchClearValuesResponse, response)
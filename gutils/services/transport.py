@@ -0,0 +1,218 @@
+"""
+This module contains the HTTP transport layer shared by every resource created from a client.
+"""
+import contextlib
+import queue
+import threading
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+import google_auth_httplib2
+import httplib2
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+
+from gutils.services.instrumentation import Instrumentation, RequestEvent, set_last_request
+from gutils.services.rate_limit import RateLimiter
+from gutils.services.retry import RetryPolicy
+
+
+# pylint: disable=line-too-long
+class TransportPool:
+    """
+    A bounded pool of authorized HTTP transports that share one credentials object.
+    `httplib2.Http` is not thread safe, so a transport is only ever used by one thread at a time.
+    """
+    def __init__(self, credentials: object, size: int = 10, timeout: int = None) -> None:
+        if size < 1:
+            raise ValueError(f"Transport pool size must be at least 1. {size} was provided.")
+        self.credentials = credentials
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _build_http(self) -> httplib2.Http:
+        http = httplib2.Http(timeout=self.timeout)
+        # Resumable uploads answer 308 without a location, same as `googleapiclient.http.build_http`.
+        http.redirect_codes = http.redirect_codes - {308}
+        return http
+
+    @contextlib.contextmanager
+    def transport(self) -> typing.Generator[google_auth_httplib2.AuthorizedHttp, None, None]:
+        """
+        Checks out a transport for the duration of the block.
+        Blocks when all transports of the pool are in use.
+        """
+        with self._slots:
+            try:
+                http = self._idle.get_nowait()
+            except queue.Empty:
+                http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=self._build_http())
+            try:
+                yield http
+            finally:
+                self._idle.put(http)
+
+
+class RequestContext:
+    """
+    Execution settings shared by every request built for a service.
+    """
+    def __init__(self, pool: TransportPool = None, retry_policy: RetryPolicy = None,
+                 rate_limiter: RateLimiter = None, instrumentation: Instrumentation = None) -> None:
+        self.pool = pool
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.instrumentation = instrumentation
+
+    def build_request(self, *args, **kwargs) -> 'ClientHttpRequest':
+        """
+        Request builder passed to `googleapiclient.discovery` so that every request of a
+        service carries this context.
+        """
+        request = ClientHttpRequest(*args, **kwargs)
+        request.context = self
+        return request
+
+    @contextlib.contextmanager
+    def transport(self, http: object = None) -> typing.Generator[object, None, None]:
+        """
+        Yields the transport a request should be sent with. An explicitly given transport
+        is used as is, otherwise one is checked out from the pool when configured.
+        """
+        if http is not None or self.pool is None:
+            yield http
+            return
+        with self.pool.transport() as pooled_http:
+            yield pooled_http
+
+    def execute(self, request: HttpRequest, send: typing.Callable, http: object = None,
+                idempotent: bool = None) -> typing.Any:
+        """
+        Sends a request through the configured rate limiter, transport and retry policy.
+        A transport is only held for the duration of an attempt, not while backing off.
+        """
+        def attempt():
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(request.methodId, request.method)
+            with self.transport(http) as transport:
+                return send(transport)
+
+        if self.instrumentation is not None and self.instrumentation.enabled:
+            return self._execute_measured(request, attempt, idempotent)
+        if self.retry_policy is None:
+            return attempt()
+        return self.retry_policy.call(attempt, method_id=request.methodId, idempotent=idempotent)
+
+    def _execute_measured(self, request: HttpRequest, attempt: typing.Callable,
+                          idempotent: bool = None) -> typing.Any:
+        """
+        Runs `attempt` like `execute` and reports the request to the instrumentation.
+        """
+        event = RequestEvent(request.methodId, request.method)
+        event.request_bytes = len(request.body) if request.body else 0
+        attempts = 0
+        postproc = request.postproc
+
+        def measured_postproc(response, content):
+            event.status = response.status
+            event.response_bytes = len(content) if content else 0
+            return postproc(response, content)
+
+        def measured_attempt():
+            nonlocal attempts
+            attempts += 1
+            return attempt()
+
+        request.postproc = measured_postproc
+        started = time.perf_counter()
+        try:
+            if self.retry_policy is None:
+                return measured_attempt()
+            return self.retry_policy.call(measured_attempt, method_id=request.methodId, idempotent=idempotent)
+        except HttpError as exception:
+            event.status = exception.resp.status
+            event.response_bytes = len(exception.content) if exception.content else 0
+            event.error = type(exception).__name__
+            raise
+        except Exception as exception:
+            event.error = type(exception).__name__
+            raise
+        finally:
+            request.postproc = postproc
+            event.latency = time.perf_counter() - started
+            event.retries = max(attempts - 1, 0)
+            self.instrumentation.emit(event)
+            set_last_request(self.instrumentation, event.method_id)
+
+
+class ClientHttpRequest(HttpRequest):
+    """
+    A `googleapiclient` request that is executed through its client's `RequestContext`.
+    """
+    context: RequestContext = None
+
+    def execute(self, http=None, num_retries=0):
+        if self.context is None:
+            return super().execute(http=http, num_retries=num_retries)
+        if self.resumable:
+            # Every chunk goes through `next_chunk`, which applies the context on its own.
+            body = None
+            while body is None:
+                _, body = self.next_chunk(http=http, num_retries=num_retries)
+            return body
+        parent = super()
+        return self.context.execute(self, lambda transport: parent.execute(http=transport, num_retries=num_retries), http)
+
+    def next_chunk(self, http=None, num_retries=0):
+        if self.context is None:
+            return super().next_chunk(http=http, num_retries=num_retries)
+        parent = super()
+        # Chunks of a resumable session may be resent safely.
+        return self.context.execute(self, lambda transport: parent.next_chunk(http=transport, num_retries=num_retries),
+                                    http, idempotent=True)
+
+    def to_json(self):
+        context = self.__dict__.pop("context", None)
+        try:
+            return super().to_json()
+        finally:
+            if context is not None:
+                self.context = context
+
+
+def uses_pool(target: object) -> bool:
+    """
+    Checks if requests of a service, resource or request check out pooled transports, which makes
+    them safe to run on several threads. True for clients created with `thread_safe=True`.
+    """
+    context = getattr(target, "context", None)
+    if context is None:
+        # Services and resources keep the request builder they were built with.
+        request_builder = getattr(target, "_requestBuilder", None)
+        context = getattr(request_builder, "__self__", None)
+    return isinstance(context, RequestContext) and context.pool is not None
+
+
+def execute_many(requests: typing.Iterable[typing.Union[HttpRequest, typing.Callable]],
+                 max_workers: int = 10, return_exceptions: bool = False) -> list:
+    """
+    Executes requests concurrently and returns their results in the given order.
+    Each item is either a request object with an `execute()` method or a callable,
+    e.g. `lambda: drive.get_file(file_id)`.
+    When `return_exceptions` is set, failures are returned in place of their result
+    instead of being raised.
+    """
+    def run(request):
+        try:
+            return request.execute() if hasattr(request, "execute") else request()
+        except Exception as exception: # pylint: disable=broad-except
+            if return_exceptions:
+                return exception
+            raise
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run, request) for request in requests]
+        return [future.result() for future in futures]